@@ -0,0 +1,81 @@
+"""
+Pages per second a single worker gets from the sync fixture path vs the async one.
+
+Each "visit" opens a fresh context, loads the storefront home page and reads a few
+header elements through the page objects, which is roughly what a smoke test does.
+The sync path runs the visits one after another; the async path runs up to
+--concurrency of them at once on a single event loop.
+
+Usage:
+    python -m benchmarks.async_throughput --visits 20 --concurrency 5
+"""
+import argparse
+import asyncio
+import os
+import time
+from playwright.sync_api import sync_playwright
+from playwright.async_api import async_playwright
+from components.home.homepage import HomePage
+from components.home.async_homepage import AsyncHomePage
+
+BASE_URL = os.getenv("BASE_URL", "https://magento.softwaretestingboard.com/")
+
+
+def run_sync(browser_name: str, visits: int) -> float:
+    with sync_playwright() as p:
+        browser = getattr(p, browser_name).launch()
+        start = time.perf_counter()
+        for _ in range(visits):
+            context = browser.new_context()
+            page = context.new_page()
+            page.goto(BASE_URL)
+            home = HomePage(page)
+            home.get_title()
+            home.is_logo_visible()
+            home.is_cart_icon_visible()
+            context.close()
+        elapsed = time.perf_counter() - start
+        browser.close()
+    return elapsed
+
+
+async def run_async(browser_name: str, visits: int, concurrency: int) -> float:
+    async with async_playwright() as p:
+        browser = await getattr(p, browser_name).launch()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def visit():
+            async with semaphore:
+                context = await browser.new_context()
+                page = await context.new_page()
+                await page.goto(BASE_URL)
+                home = AsyncHomePage(page)
+                await home.get_title()
+                await home.is_logo_visible()
+                await home.is_cart_icon_visible()
+                await context.close()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(visit() for _ in range(visits)))
+        elapsed = time.perf_counter() - start
+        await browser.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--browser", default="chromium")
+    parser.add_argument("--visits", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=5)
+    args = parser.parse_args()
+
+    sync_elapsed = run_sync(args.browser, args.visits)
+    async_elapsed = asyncio.run(run_async(args.browser, args.visits, args.concurrency))
+    print(f"{'path':<8}{'visits':>8}{'seconds':>10}{'pages/s':>10}")
+    print(f"{'sync':<8}{args.visits:>8}{sync_elapsed:>10.2f}{args.visits / sync_elapsed:>10.2f}")
+    print(f"{'async':<8}{args.visits:>8}{async_elapsed:>10.2f}{args.visits / async_elapsed:>10.2f}")
+    print(f"speedup x{sync_elapsed / async_elapsed:.2f} (concurrency {args.concurrency})")
+
+
+if __name__ == "__main__":
+    main()
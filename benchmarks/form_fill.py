@@ -0,0 +1,86 @@
+"""
+Time to fill the checkout shipping form one field at a time vs in one batched script.
+
+Each round reloads the checkout page and fills the same address both ways, so
+network and rendering cost stay out of the numbers; what is left is the protocol
+round trips and the per-field re-validation the batch saves. Runs against a local
+Magento stand-in unless --base-url is given; --latency adds its artificial delay.
+
+Usage:
+    python -m benchmarks.form_fill --rounds 10
+"""
+import argparse
+import statistics
+import time
+from playwright.sync_api import sync_playwright
+from components.checkout.checkout_page import CheckoutPage
+from service.cart_service import CartService
+from service.csv_service import CSVService
+from service.magento_stub import MagentoStubServer
+
+ADDRESS = {
+    "email": "bench.user@example.com",
+    "first_name": "Bench",
+    "last_name": "User",
+    "street": "123 Test St",
+    "city": "Test City",
+    "region_id": "12",
+    "zip_code": "90001",
+    "country_id": "US",
+    "phone": "1234567890",
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--browser", default="chromium")
+    parser.add_argument("--base-url", help="Storefront to use instead of the local stand-in")
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--latency", type=int, default=0, help="Stand-in latency in ms per request")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        server = MagentoStubServer()
+        base_url = server.start()
+    try:
+        with sync_playwright() as p:
+            browser = getattr(p, args.browser).launch()
+            context = browser.new_context()
+            if server is not None:
+                context.request.post(f"{base_url}__stub/latency", data={"page": args.latency, "ajax": args.latency})
+            CartService(context, base_url).seed(CSVService.read_csv("cart_products.csv")[:1])
+            page = context.new_page()
+            checkout = CheckoutPage(page)
+            timings = {"per-field": [], "batched": []}
+            fallbacks = 0
+            for _ in range(args.rounds):
+                for mode in timings:
+                    page.goto(f"{base_url}checkout/")
+                    checkout.email_input.wait_for(state="visible")
+                    if mode == "batched":
+                        result = checkout.fill_shipping_information(**ADDRESS)
+                        timings[mode].append(result.elapsed)
+                        fallbacks += len(result.fallback)
+                    else:
+                        start = time.perf_counter()
+                        checkout.fill_shipping_information(**ADDRESS, batch=False)
+                        timings[mode].append(time.perf_counter() - start)
+            browser.close()
+    finally:
+        if server is not None:
+            server.stop()
+
+    per_field = statistics.median(timings["per-field"])
+    batched = statistics.median(timings["batched"])
+    print(f"{'mode':<11}{'median ms':>11}{'min ms':>9}{'max ms':>9}")
+    for mode, values in timings.items():
+        median, low, high = statistics.median(values) * 1000, min(values) * 1000, max(values) * 1000
+        print(f"{mode:<11}{median:>11.1f}{low:>9.1f}{high:>9.1f}")
+    print(f"batched saves {(per_field - batched) * 1000:.1f} ms per form (x{per_field / batched:.1f}); "
+          f"{fallbacks} field fallbacks over {args.rounds} rounds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Evaluate payload size and latency of the preloaded __taf helpers vs shipping them inline.
+
+"bundled" is what page objects do now: the helpers are installed once per context
+(service/js_bundle.py) and each call sends a short dispatcher plus its arguments.
+"inline" sends the helper library with every call and has the page parse and run
+it again, which is the cost the per-call scripts this replaced paid for their own
+code. Both run on the same product page of the local Magento stand-in (or
+--base-url), each on its own tab so they do not share page-side state.
+
+Usage:
+    python -m benchmarks.js_bundle --rounds 50
+"""
+import argparse
+import json
+import statistics
+import time
+from playwright.sync_api import sync_playwright
+from components.product.product_page import ProductPage
+from components.product.product_snapshot import SNAPSHOT_LOCATORS
+from service import js_bundle
+from service.csv_service import CSVService
+from service.magento_stub import MagentoStubServer
+
+# Runs the whole library in the page on every call, then dispatches like CALL_JS
+INLINE_JS = ("([version, name, args]) => {\n    delete window.__taf;\n" + js_bundle.BUNDLE_JS
+             + "\n    return (" + js_bundle.CALL_JS.strip() + ")([version, name, args]);\n}")
+
+
+def _helpers():
+    """(name, args) of the read-only helpers timed; the cart ones would change the page"""
+    selectors = ProductPage.selectors()
+    fields = {field: selectors[name] for field, name in SNAPSHOT_LOCATORS.items()}
+    return [
+        ("minicart.state", []),
+        ("product.snapshot", [fields, 5000]),
+        ("mutations.fired", ["benchmark"]),
+    ]
+
+
+def _payload_bytes(script: str, name: str, args) -> int:
+    return len(script.encode()) + len(json.dumps([js_bundle.BUNDLE_VERSION, name, args]).encode())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--browser", default="chromium")
+    parser.add_argument("--base-url", help="Storefront to use instead of the local stand-in")
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    helpers = _helpers()
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        server = MagentoStubServer()
+        base_url = server.start()
+    product_url = base_url + CSVService.read_csv("cart_products.csv")[0]["product_path"]
+    timings = {(name, mode): [] for name, _ in helpers for mode in ("inline", "bundled")}
+    try:
+        with sync_playwright() as p:
+            browser = getattr(p, args.browser).launch()
+            context = browser.new_context()
+            js_bundle.install(context)
+            pages = {}
+            for mode in ("inline", "bundled"):
+                pages[mode] = context.new_page()
+                pages[mode].goto(product_url, wait_until="domcontentloaded")
+                ProductPage(pages[mode]).snapshot()
+            for _ in range(args.rounds):
+                for name, call_args in helpers:
+                    start = time.perf_counter()
+                    pages["inline"].evaluate(INLINE_JS, [js_bundle.BUNDLE_VERSION, name, call_args])
+                    timings[(name, "inline")].append(time.perf_counter() - start)
+                    start = time.perf_counter()
+                    js_bundle.call(pages["bundled"], name, *call_args)
+                    timings[(name, "bundled")].append(time.perf_counter() - start)
+            browser.close()
+    finally:
+        if server is not None:
+            server.stop()
+
+    print(f"bundle {js_bundle.BUNDLE_VERSION}: {len(js_bundle.BUNDLE_JS.encode())} bytes, sent once per document")
+    print(f"{'helper':<18}{'mode':<9}{'bytes/call':>11}{'median ms':>11}{'p95 ms':>9}")
+    for name, call_args in helpers:
+        for mode, script in (("inline", INLINE_JS), ("bundled", js_bundle.CALL_JS)):
+            values = sorted(timings[(name, mode)])
+            p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+            print(f"{name:<18}{mode:<9}{_payload_bytes(script, name, call_args):>11}"
+                  f"{statistics.median(values) * 1000:>11.2f}{p95 * 1000:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Construction cost and memory of page objects with lazy locators vs building them all.
+
+"eager" constructs the page object and reads every declared locator, which is what
+the old __init__ did; "lazy" constructs it and reads only --touch of them, which is
+what a typical test does. Locators are client-side objects, so one blank page is
+enough and the numbers do not depend on the storefront.
+
+Usage:
+    python -m benchmarks.locator_construction --instances 2000 --touch 2
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from playwright.sync_api import sync_playwright
+from components.checkout.checkout_page import CheckoutPage
+from components.product.product_page import ProductPage
+
+
+def build(cls, page, instances: int, touch: int):
+    names = list(cls.selectors())[:touch]
+    objects = []
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(instances):
+        obj = cls(page)
+        for name in names:
+            getattr(obj, name)
+        objects.append(obj)
+    elapsed = time.perf_counter() - start
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, current / instances
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--browser", default="chromium")
+    parser.add_argument("--instances", type=int, default=2000)
+    parser.add_argument("--touch", type=int, default=2, help="Locators a lazy page object reads")
+    args = parser.parse_args()
+
+    with sync_playwright() as p:
+        browser = getattr(p, args.browser).launch()
+        page = browser.new_page()
+        print(f"{'page object':<14}{'mode':<7}{'locators':>9}{'us/object':>11}{'KiB/object':>12}")
+        for cls in (ProductPage, CheckoutPage):
+            declared = len(cls.selectors())
+            results = {}
+            for mode, touch in (("eager", declared), ("lazy", args.touch)):
+                elapsed, per_object = build(cls, page, args.instances, touch)
+                results[mode] = (elapsed, per_object)
+                print(f"{cls.__name__:<14}{mode:<7}{touch:>9}{elapsed / args.instances * 1e6:>11.1f}"
+                      f"{per_object / 1024:>12.2f}")
+            (eager_s, eager_b), (lazy_s, lazy_b) = results["eager"], results["lazy"]
+            print(f"{cls.__name__:<14}lazy is x{eager_s / lazy_s:.1f} faster, x{eager_b / lazy_b:.1f} smaller")
+        browser.close()
+
+
+if __name__ == "__main__":
+    main()
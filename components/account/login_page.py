@@ -0,0 +1,34 @@
+from urllib.parse import urljoin
+from playwright.sync_api import Page
+from components.form_fill import FormFiller
+from components.locators import PageComponent, css
+
+class LoginPage(PageComponent):
+    """Component representing the customer login page"""
+    __slots__ = ()
+
+    page_title = css('.page-title span.base')
+    email_input = css('#email')
+    password_input = css('#pass')
+    sign_in_button = css('#send2')
+    error_message = css('.message-error')
+
+    def __init__(self, page: Page):
+        super().__init__(page)
+
+    def navigate(self, base_url: str):
+        """Navigate to the customer login page"""
+        self.page.goto(urljoin(base_url, 'customer/account/login/'))
+
+    def login(self, email: str, password: str):
+        """Submit the login form and wait until the customer sections are reloaded
+
+        Magento refreshes the `customer` section into localStorage right after the
+        redirect, so waiting for it makes the saved storage state complete.
+        """
+        # A plain HTML form: there is no Knockout model to check the values against
+        FormFiller(self, verify=False).fill({'email_input': email, 'password_input': password})
+        with self.page.expect_response(lambda r: 'customer/section/load' in r.url, timeout=15000):
+            self.sign_in_button.click()
+        if self.error_message.is_visible():
+            raise RuntimeError(f"Login failed for {email}: {self.error_message.text_content().strip()}")
@@ -0,0 +1,200 @@
+from typing import Optional
+from playwright.async_api import Page
+from service.wait_service import AsyncWaitService
+from components.form_fill import AsyncFormFiller
+from components.locators import PageComponent, css
+from components.checkout.checkout_page import SIGNED_IN_EMAIL_JS
+from service.storage_state_cache import StorageStateCache, account_key
+
+class AsyncCheckoutPage(PageComponent):
+    """playwright.async_api twin of CheckoutPage"""
+    __slots__ = ('waits',)
+
+    # Page title and header
+    page_title = css('.page-title span.base')
+
+    # Progress bar
+    progress_bar = css('.opc-progress-bar')
+    progress_bar_items = css('.opc-progress-bar-item')
+
+    # Estimated total
+    estimated_total_label = css('.estimated-label')
+    estimated_total_price = css('.estimated-price')
+
+    # Authentication
+    authentication_wrapper = css('.authentication-wrapper')
+    sign_in_button = css('.action-auth-toggle')
+    login_email = css('#login-email')
+    login_password = css('#login-password')
+    login_button = css('.action.action-login')
+    forgot_password_link = css('.action.action-remind')
+
+    # Email section
+    email_input = css('#checkout-step-shipping #customer-email')
+    email_tooltip = css('#customer-email-fieldset .field-tooltip-content')
+
+    # Shipping address form
+    shipping_address_title = css('#shipping .step-title')
+    first_name_input = css('input[name="firstname"]')
+    last_name_input = css('input[name="lastname"]')
+    company_input = css('input[name="company"]')
+    street_input = css('input[name="street[0]"]')
+    street2_input = css('input[name="street[1]"]')
+    street3_input = css('input[name="street[2]"]')
+    city_input = css('input[name="city"]')
+    region_dropdown = css('select[name="region_id"]')
+    region_input = css('input[name="region"]')
+    zip_input = css('input[name="postcode"]')
+    country_dropdown = css('select[name="country_id"]')
+    phone_input = css('input[name="telephone"]')
+    phone_tooltip = css('.field[name="shippingAddress.telephone"] .field-tooltip-content')
+
+    # Shipping methods section
+    shipping_methods_title = css('#opc-shipping_method .step-title')
+    shipping_methods_table = css('.table-checkout-shipping-method')
+    shipping_methods = css('.table-checkout-shipping-method input[type="radio"]')
+    shipping_method_flatrate = css('input[value="flatrate_flatrate"]')
+    shipping_method_tablerate = css('input[value="tablerate_bestway"]')
+    shipping_method_rows = css('.table-checkout-shipping-method tbody tr.row')
+    shipping_method_prices = css('.table-checkout-shipping-method .col-price .price')
+
+    # Next button in shipping methods
+    next_button = css('button.action.continue.primary')
+
+    # Payment section
+    payment_section = css('#payment')
+    payment_section_title = css('#payment .step-title')
+    payment_methods_list = css('#checkout-payment-method-load')
+    payment_methods = css('.payment-method')
+    payment_method_check = css('#checkmo')
+    payment_method_radio_buttons = css('input[name="payment[method]"]')
+
+    # Billing address section
+    billing_address_same_as_shipping = css('input[id^="billing-address-same-as-shipping"]')
+    billing_address_details = css('.billing-address-details')
+    billing_address_edit_button = css('.action.action-edit-address')
+
+    # Discount code section
+    discount_code_section = css('.payment-option.discount-code')
+    discount_code_toggle = css('#block-discount-heading')
+    discount_code_input = css('#discount-code')
+    apply_discount_button = css('.action.action-apply')
+
+    # Order summary
+    order_summary = css('.opc-block-summary')
+    order_summary_title = css('.opc-block-summary .title')
+    items_in_cart = css('.block.items-in-cart')
+    cart_items = css('.minicart-items .product-item')
+    cart_item_options = css('.product.options')
+    cart_item_options_toggle = css('.product.options .toggle')
+    cart_item_price = css('.subtotal .price')
+    order_total = css('.grand.totals .price')
+
+    # Place order button
+    place_order_button = css('.action.primary.checkout')
+
+    # Order success
+    order_success_message = css('.checkout-success')
+    order_number = css('.checkout-success p span')
+
+    def __init__(self, page: Page):
+        super().__init__(page)
+        self.waits = AsyncWaitService.for_page(page)
+        
+    async def fill_shipping_information(self, email: Optional[str], first_name: str, last_name: str,
+                                        street: str, city: str, region_id: str,
+                                        zip_code: str, country_id: str = 'US', phone: str = '1234567890',
+                                        batch: bool = True):
+        """Fill in the shipping information form
+
+        With `batch` (the default) every field is set in one script and checked against the
+        Knockout model; `batch=False` keeps the one-call-per-field path. A signed-in customer's
+        checkout has no email field: pass email=None.
+        """
+        if batch:
+            values = {
+                'email_input': email,
+                'first_name_input': first_name,
+                'last_name_input': last_name,
+                'street_input': street,
+                'city_input': city,
+                # Country first: changing it rebuilds the region options
+                'country_dropdown': country_id,
+                'region_dropdown': region_id,
+                'zip_input': zip_code,
+                'phone_input': phone,
+            }
+            if email is None:
+                del values['email_input']
+            return await AsyncFormFiller(self).fill(values)
+        if email is not None:
+            await self.email_input.fill(email)
+        await self.first_name_input.fill(first_name)
+        await self.last_name_input.fill(last_name)
+        await self.street_input.fill(street)
+        await self.city_input.fill(city)
+        await self.region_dropdown.select_option(region_id)
+        await self.zip_input.fill(zip_code)
+        await self.country_dropdown.select_option(country_id)
+        await self.phone_input.fill(phone)
+        
+    async def select_shipping_method(self, method_index: int = 0):
+        """Select a shipping method by index"""
+        await self.shipping_methods.nth(method_index).click()
+        
+    async def proceed_to_payment(self):
+        """Proceed to payment step"""
+        await self.next_button.click()
+        # Wait for payment methods to be visible
+        await self.page.wait_for_selector('.payment-method', state='visible', timeout=10000)
+        
+    async def select_payment_method(self, method_index: int = 0):
+        """Select a payment method by index"""
+        await self.payment_method_radio_buttons.nth(method_index).click()
+        
+    async def use_same_billing_address(self, same_as_shipping: bool = True):
+        """Set whether billing address is same as shipping"""
+        current_state = await self.billing_address_same_as_shipping.is_checked()
+        if current_state != same_as_shipping:
+            await self.billing_address_same_as_shipping.click()
+            
+    async def apply_discount_code(self, code: str):
+        """Apply a discount code"""
+        await self.discount_code_toggle.click()
+        await self.discount_code_input.fill(code)
+        await self.apply_discount_button.click()
+        
+    async def get_order_total(self) -> str:
+        """Get the order total amount"""
+        return (await self.order_total.text_content()).strip()
+    
+    async def place_order(self):
+        """Place the order"""
+        await self.place_order_button.click()
+        # Wait for success message
+        await self.order_success_message.wait_for(state='visible', timeout=15000)
+        
+    async def get_order_number(self) -> str:
+        """Get the order number from success page"""
+        return (await self.order_number.text_content()).strip()
+    
+    async def is_order_successful(self) -> bool:
+        """Check if order was placed successfully"""
+        return await self.order_success_message.is_visible()
+        
+    async def signed_in_email(self) -> Optional[str]:
+        """Email of the signed-in customer according to window.checkoutConfig, None for a guest"""
+        return await self.page.evaluate(SIGNED_IN_EMAIL_JS)
+
+    async def login_during_checkout(self, email: str, password: str,
+                                    state_cache: Optional[StorageStateCache] = None):
+        """Login during checkout process (see CheckoutPage.login_during_checkout)"""
+        if await self.signed_in_email() == email.lower():
+            return
+        await self.sign_in_button.click()
+        await AsyncFormFiller(self).fill({'login_email': email, 'login_password': password})
+        async with self.waits.endpoint('checkout_reload', name="checkout:login-reload"):
+            async with self.waits.endpoint('checkout_login'):
+                await self.login_button.click()
+        if state_cache is not None:
+            state_cache.put(account_key(email, self.page.url), await self.page.context.storage_state())
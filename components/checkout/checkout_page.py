@@ -1,103 +1,140 @@
-from playwright.sync_api import Page, Locator
+from typing import Optional
+from playwright.sync_api import Page
+from service.wait_service import WaitService
+from components.form_fill import FormFiller
+from components.locators import PageComponent, css
+from service.storage_state_cache import StorageStateCache, account_key
 
-class CheckoutPage:
+SIGNED_IN_EMAIL_JS = """
+    () => {
+        const config = window.checkoutConfig;
+        return config && config.isCustomerLoggedIn ? (config.customerData.email || '').toLowerCase() : null;
+    }
+"""
+
+class CheckoutPage(PageComponent):
     """Component representing the checkout page"""
-    
+    __slots__ = ('waits',)
+
+    # Page title and header
+    page_title = css('.page-title span.base')
+
+    # Progress bar
+    progress_bar = css('.opc-progress-bar')
+    progress_bar_items = css('.opc-progress-bar-item')
+
+    # Estimated total
+    estimated_total_label = css('.estimated-label')
+    estimated_total_price = css('.estimated-price')
+
+    # Authentication
+    authentication_wrapper = css('.authentication-wrapper')
+    sign_in_button = css('.action-auth-toggle')
+    login_email = css('#login-email')
+    login_password = css('#login-password')
+    login_button = css('.action.action-login')
+    forgot_password_link = css('.action.action-remind')
+
+    # Email section
+    email_input = css('#checkout-step-shipping #customer-email')
+    email_tooltip = css('#customer-email-fieldset .field-tooltip-content')
+
+    # Shipping address form
+    shipping_address_title = css('#shipping .step-title')
+    first_name_input = css('input[name="firstname"]')
+    last_name_input = css('input[name="lastname"]')
+    company_input = css('input[name="company"]')
+    street_input = css('input[name="street[0]"]')
+    street2_input = css('input[name="street[1]"]')
+    street3_input = css('input[name="street[2]"]')
+    city_input = css('input[name="city"]')
+    region_dropdown = css('select[name="region_id"]')
+    region_input = css('input[name="region"]')
+    zip_input = css('input[name="postcode"]')
+    country_dropdown = css('select[name="country_id"]')
+    phone_input = css('input[name="telephone"]')
+    phone_tooltip = css('.field[name="shippingAddress.telephone"] .field-tooltip-content')
+
+    # Shipping methods section
+    shipping_methods_title = css('#opc-shipping_method .step-title')
+    shipping_methods_table = css('.table-checkout-shipping-method')
+    shipping_methods = css('.table-checkout-shipping-method input[type="radio"]')
+    shipping_method_flatrate = css('input[value="flatrate_flatrate"]')
+    shipping_method_tablerate = css('input[value="tablerate_bestway"]')
+    shipping_method_rows = css('.table-checkout-shipping-method tbody tr.row')
+    shipping_method_prices = css('.table-checkout-shipping-method .col-price .price')
+
+    # Next button in shipping methods
+    next_button = css('button.action.continue.primary')
+
+    # Payment section
+    payment_section = css('#payment')
+    payment_section_title = css('#payment .step-title')
+    payment_methods_list = css('#checkout-payment-method-load')
+    payment_methods = css('.payment-method')
+    payment_method_check = css('#checkmo')
+    payment_method_radio_buttons = css('input[name="payment[method]"]')
+
+    # Billing address section
+    billing_address_same_as_shipping = css('input[id^="billing-address-same-as-shipping"]')
+    billing_address_details = css('.billing-address-details')
+    billing_address_edit_button = css('.action.action-edit-address')
+
+    # Discount code section
+    discount_code_section = css('.payment-option.discount-code')
+    discount_code_toggle = css('#block-discount-heading')
+    discount_code_input = css('#discount-code')
+    apply_discount_button = css('.action.action-apply')
+
+    # Order summary
+    order_summary = css('.opc-block-summary')
+    order_summary_title = css('.opc-block-summary .title')
+    items_in_cart = css('.block.items-in-cart')
+    cart_items = css('.minicart-items .product-item')
+    cart_item_options = css('.product.options')
+    cart_item_options_toggle = css('.product.options .toggle')
+    cart_item_price = css('.subtotal .price')
+    order_total = css('.grand.totals .price')
+
+    # Place order button
+    place_order_button = css('.action.primary.checkout')
+
+    # Order success
+    order_success_message = css('.checkout-success')
+    order_number = css('.checkout-success p span')
+
     def __init__(self, page: Page):
-        self.page = page
-        
-        # Page title and header
-        self.page_title = page.locator('.page-title span.base')
-        
-        # Progress bar
-        self.progress_bar = page.locator('.opc-progress-bar')
-        self.progress_bar_items = page.locator('.opc-progress-bar-item')
-        
-        # Estimated total
-        self.estimated_total_label = page.locator('.estimated-label')
-        self.estimated_total_price = page.locator('.estimated-price')
-        
-        # Authentication
-        self.authentication_wrapper = page.locator('.authentication-wrapper')
-        self.sign_in_button = page.locator('.action-auth-toggle')
-        self.login_email = page.locator('#login-email')
-        self.login_password = page.locator('#login-password')
-        self.login_button = page.locator('.action.action-login')
-        self.forgot_password_link = page.locator('.action.action-remind')
-        
-        # Email section
-        self.email_input = page.locator('#checkout-step-shipping #customer-email')
-        self.email_tooltip = page.locator('#customer-email-fieldset .field-tooltip-content')
-        
-        # Shipping address form
-        self.shipping_address_title = page.locator('#shipping .step-title')
-        self.first_name_input = page.locator('input[name="firstname"]')
-        self.last_name_input = page.locator('input[name="lastname"]')
-        self.company_input = page.locator('input[name="company"]')
-        self.street_input = page.locator('input[name="street[0]"]')
-        self.street2_input = page.locator('input[name="street[1]"]')
-        self.street3_input = page.locator('input[name="street[2]"]')
-        self.city_input = page.locator('input[name="city"]')
-        self.region_dropdown = page.locator('select[name="region_id"]')
-        self.region_input = page.locator('input[name="region"]')
-        self.zip_input = page.locator('input[name="postcode"]')
-        self.country_dropdown = page.locator('select[name="country_id"]')
-        self.phone_input = page.locator('input[name="telephone"]')
-        self.phone_tooltip = page.locator('.field[name="shippingAddress.telephone"] .field-tooltip-content')
-        
-        # Shipping methods section
-        self.shipping_methods_title = page.locator('#opc-shipping_method .step-title')
-        self.shipping_methods_table = page.locator('.table-checkout-shipping-method')
-        self.shipping_methods = page.locator('.table-checkout-shipping-method input[type="radio"]')
-        self.shipping_method_flatrate = page.locator('input[value="flatrate_flatrate"]')
-        self.shipping_method_tablerate = page.locator('input[value="tablerate_bestway"]')
-        self.shipping_method_rows = page.locator('.table-checkout-shipping-method tbody tr.row')
-        self.shipping_method_prices = page.locator('.table-checkout-shipping-method .col-price .price')
-        
-        # Next button in shipping methods
-        self.next_button = page.locator('button.action.continue.primary')
-        
-        # Payment section
-        self.payment_section = page.locator('#payment')
-        self.payment_section_title = page.locator('#payment .step-title')
-        self.payment_methods_list = page.locator('#checkout-payment-method-load')
-        self.payment_methods = page.locator('.payment-method')
-        self.payment_method_check = page.locator('#checkmo')
-        self.payment_method_radio_buttons = page.locator('input[name="payment[method]"]')
-        
-        # Billing address section
-        self.billing_address_same_as_shipping = page.locator('input[id^="billing-address-same-as-shipping"]')
-        self.billing_address_details = page.locator('.billing-address-details')
-        self.billing_address_edit_button = page.locator('.action.action-edit-address')
-        
-        # Discount code section
-        self.discount_code_section = page.locator('.payment-option.discount-code')
-        self.discount_code_toggle = page.locator('#block-discount-heading')
-        self.discount_code_input = page.locator('#discount-code')
-        self.apply_discount_button = page.locator('.action.action-apply')
-        
-        # Order summary
-        self.order_summary = page.locator('.opc-block-summary')
-        self.order_summary_title = page.locator('.opc-block-summary .title')
-        self.items_in_cart = page.locator('.block.items-in-cart')
-        self.cart_items = page.locator('.minicart-items .product-item')
-        self.cart_item_options = page.locator('.product.options')
-        self.cart_item_options_toggle = page.locator('.product.options .toggle')
-        self.cart_item_price = page.locator('.subtotal .price')
-        self.order_total = page.locator('.grand.totals .price')
-        
-        # Place order button
-        self.place_order_button = page.locator('.action.primary.checkout')
-        
-        # Order success
-        self.order_success_message = page.locator('.checkout-success')
-        self.order_number = page.locator('.checkout-success p span')
-        
-    def fill_shipping_information(self, email: str, first_name: str, last_name: str, 
-                                 street: str, city: str, region_id: str, 
-                                 zip_code: str, country_id: str = 'US', phone: str = '1234567890'):
-        """Fill in the shipping information form"""
-        self.email_input.fill(email)
+        super().__init__(page)
+        self.waits = WaitService.for_page(page)
+        
+    def fill_shipping_information(self, email: Optional[str], first_name: str, last_name: str,
+                                  street: str, city: str, region_id: str,
+                                  zip_code: str, country_id: str = 'US', phone: str = '1234567890',
+                                  batch: bool = True):
+        """Fill in the shipping information form
+
+        With `batch` (the default) every field is set in one script and checked against the
+        Knockout model; `batch=False` keeps the one-call-per-field path. A signed-in customer's
+        checkout has no email field: pass email=None.
+        """
+        if batch:
+            values = {
+                'email_input': email,
+                'first_name_input': first_name,
+                'last_name_input': last_name,
+                'street_input': street,
+                'city_input': city,
+                # Country first: changing it rebuilds the region options
+                'country_dropdown': country_id,
+                'region_dropdown': region_id,
+                'zip_input': zip_code,
+                'phone_input': phone,
+            }
+            if email is None:
+                del values['email_input']
+            return FormFiller(self).fill(values)
+        if email is not None:
+            self.email_input.fill(email)
         self.first_name_input.fill(first_name)
         self.last_name_input.fill(last_name)
         self.street_input.fill(street)
@@ -151,11 +188,24 @@ class CheckoutPage:
         """Check if order was placed successfully"""
         return self.order_success_message.is_visible()
         
-    def login_during_checkout(self, email: str, password: str):
-        """Login during checkout process"""
+    def signed_in_email(self) -> Optional[str]:
+        """Email of the signed-in customer according to window.checkoutConfig, None for a guest"""
+        return self.page.evaluate(SIGNED_IN_EMAIL_JS)
+
+    def login_during_checkout(self, email: str, password: str, state_cache: Optional[StorageStateCache] = None):
+        """Login during checkout process
+
+        A page whose context was restored from the account's cached state (@pytest.mark.signed_in)
+        is already signed in and skips the form. After a form login, `state_cache` keeps the new
+        state for the account, so the next signed-in test starts from it instead of logging in.
+        """
+        if self.signed_in_email() == email.lower():
+            return
         self.sign_in_button.click()
-        self.login_email.fill(email)
-        self.login_password.fill(password)
-        self.login_button.click()
-        # Wait for login to complete
-        self.page.wait_for_load_state('networkidle')
+        FormFiller(self).fill({'login_email': email, 'login_password': password})
+        # customer/ajax/login answers first, then Magento reloads the checkout page
+        with self.waits.endpoint('checkout_reload', name="checkout:login-reload"):
+            with self.waits.endpoint('checkout_login'):
+                self.login_button.click()
+        if state_cache is not None:
+            state_cache.put(account_key(email, self.page.url), self.page.context.storage_state())
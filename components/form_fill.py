@@ -0,0 +1,140 @@
+"""
+Batched form filling for page objects.
+
+`FormFiller(component).fill({"first_name_input": "Test", ...})` sets every field in
+one call to the page-side `forms.fill` helper (service/js_bundle.py) instead of one
+fill/select_option round trip per field. Values go through the element's native
+value setter followed by bubbling `input` and `change` events, which is what
+Knockout's value/textInput bindings listen to, and the helper then reads the bound
+view model back with `ko.dataFor` (Knockout comes from RequireJS) to confirm the
+value landed in Magento's form state and not only in the DOM.
+
+Fields the helper could not confirm (not rendered yet, hidden, disabled, an option
+that does not exist, a model that did not take the value or no model to read back)
+are filled again through the regular Playwright calls, so a batch never does less
+than the per-field path; it only skips the round trips where it can. Forms with no
+Knockout behind them (plain HTML forms) pass verify=False.
+"""
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from components.locators import LocatorDef, PageComponent
+from service import js_bundle
+
+@dataclass
+class FieldResult:
+    name: str
+    kind: Optional[str]
+    applied: bool
+    # True/False when a Knockout model was found for the field, None when there was none to check
+    # (reason "unverified" if verify was asked for)
+    bound: Optional[bool]
+    reason: Optional[str]
+
+
+@dataclass
+class FormFillResult:
+    """What a batch did: per-field outcome, the fields re-filled one by one, and the time taken"""
+    fields: List[FieldResult] = field(default_factory=list)
+    fallback: List[str] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def batched(self) -> List[str]:
+        return [f.name for f in self.fields if f.name not in self.fallback]
+
+    @property
+    def round_trips(self) -> int:
+        """Browser round trips spent: the ready wait, the batch script and one per fallback field,
+        plus the tagName lookup for fallback fields the script could not find (kind None)"""
+        lookups = sum(1 for f in self.fields if f.name in self.fallback and f.kind is None)
+        return 2 + len(self.fallback) + lookups
+
+
+class FormFiller:
+    """Fills a page object's declared fields in one evaluate; see the module docstring"""
+
+    def __init__(self, component: PageComponent, verify: bool = True):
+        self.component = component
+        self.verify = verify
+
+    def _definition(self, name: str) -> LocatorDef:
+        definition = type(self.component)._locator_defs.get(name)
+        if definition is None:
+            raise KeyError(f"{type(self.component).__name__} declares no locator named {name!r}")
+        if definition.selector is None:
+            raise ValueError(f"{type(self.component).__name__}.{name} is a role locator; "
+                             f"only css() fields can be batch-filled")
+        return definition
+
+    def _fields(self, values: Dict[str, object]) -> List[Dict]:
+        fields = []
+        for name, value in values.items():
+            definition = self._definition(name)
+            fields.append({"name": name, "selector": definition.selector,
+                           "nth": definition.nth or 0, "value": value})
+        return fields
+
+    def _fill_one(self, name: str, value, kind: Optional[str]):
+        locator = getattr(self.component, name)
+        if kind is None:
+            kind = "select" if locator.evaluate("el => el.tagName") == "SELECT" else "text"
+        if kind == "select":
+            locator.select_option(str(value))
+        elif kind == "check":
+            locator.set_checked(bool(value))
+        else:
+            locator.fill(str(value))
+
+    def fill(self, values: Dict[str, object]) -> FormFillResult:
+        """Set `{locator name: value}` in insertion order and return what happened
+
+        Order matters the same way it does for a user: pick the country before the region.
+        """
+        start = time.perf_counter()
+        fields = self._fields(values)
+        # The form may still be rendering; wait for its first field like fill() would
+        getattr(self.component, fields[0]["name"]).wait_for(state="visible")
+        outcome = js_bundle.call(self.component.page, "forms.fill", fields, self.verify)
+        result = FormFillResult(fields=[FieldResult(**item) for item in outcome])
+        for item in result.fields:
+            if item.reason is not None:
+                self._fill_one(item.name, values[item.name], item.kind)
+                result.fallback.append(item.name)
+        result.elapsed = time.perf_counter() - start
+        if result.fallback:
+            reasons = ", ".join(f"{f.name} ({f.reason})" for f in result.fields if f.reason)
+            print(f"Form fill: {len(result.fallback)} of {len(fields)} fields filled one by one: {reasons}")
+        return result
+
+
+class AsyncFormFiller(FormFiller):
+    """playwright.async_api twin of FormFiller"""
+
+    async def _fill_one(self, name: str, value, kind: Optional[str]):
+        locator = getattr(self.component, name)
+        if kind is None:
+            kind = "select" if await locator.evaluate("el => el.tagName") == "SELECT" else "text"
+        if kind == "select":
+            await locator.select_option(str(value))
+        elif kind == "check":
+            await locator.set_checked(bool(value))
+        else:
+            await locator.fill(str(value))
+
+    async def fill(self, values: Dict[str, object]) -> FormFillResult:
+        start = time.perf_counter()
+        fields = self._fields(values)
+        await getattr(self.component, fields[0]["name"]).wait_for(state="visible")
+        outcome = await js_bundle.async_call(self.component.page, "forms.fill", fields, self.verify)
+        result = FormFillResult(fields=[FieldResult(**item) for item in outcome])
+        for item in result.fields:
+            if item.reason is not None:
+                await self._fill_one(item.name, values[item.name], item.kind)
+                result.fallback.append(item.name)
+        result.elapsed = time.perf_counter() - start
+        if result.fallback:
+            reasons = ", ".join(f"{f.name} ({f.reason})" for f in result.fields if f.reason)
+            print(f"Form fill: {len(result.fallback)} of {len(fields)} fields filled one by one: {reasons}")
+        return result
@@ -0,0 +1,70 @@
+from playwright.async_api import Page
+from service.wait_service import AsyncWaitService
+from components.locators import PageComponent, css
+
+class AsyncHeaderContent(PageComponent):
+    """playwright.async_api twin of HeaderContent"""
+    __slots__ = ('waits',)
+
+    # Hamburger/toggle nav
+    toggle_nav = css('span.action.nav-toggle')
+    # Logo
+    logo_link = css('a.logo')
+    logo_img = css('a.logo img')
+    # Minicart
+    minicart_wrapper = css('div.minicart-wrapper')
+    cart_link = css('a.action.showcart')
+    cart_text = css('a.action.showcart .text')
+    cart_counter = css('a.action.showcart .counter.qty')
+    # Minicart dialog
+    minicart_dialog = css('div.mage-dropdown-dialog')
+    minicart_close_btn = css('button#btn-minicart-close')
+    minicart_empty_msg = css('strong.subtitle.empty')
+    # Search
+    search_form = css('form#search_mini_form')
+    search_input = css('input#search')
+    search_button = css('button.action.search')
+    advanced_search_link = css('a.action.advanced')
+    # Compare products
+    compare_products_link = css('a.action.compare')
+    compare_products_counter = css('a.action.compare .counter.qty')
+
+    def __init__(self, page: Page):
+        super().__init__(page)
+        self.waits = AsyncWaitService.for_page(page)
+
+    async def click_toggle_nav(self):
+        await self.toggle_nav.click()
+
+    async def click_logo(self):
+        await self.logo_link.click()
+
+    async def open_cart(self):
+        await self.cart_link.click()
+        await self.page.wait_for_selector('div.mage-dropdown-dialog', state='visible')
+
+    async def close_cart(self):
+        await self.minicart_close_btn.click()
+        await self.page.wait_for_selector('div.mage-dropdown-dialog', state='hidden')
+
+    async def search(self, query: str):
+        await self.search_input.fill('')
+        await self.search_input.fill(query)
+        async with self.waits.endpoint('search'):
+            await self.search_button.click()
+
+    async def open_advanced_search(self):
+        await self.advanced_search_link.click()
+
+    async def is_cart_empty(self):
+        return await self.minicart_empty_msg.is_visible()
+
+    async def get_cart_counter(self):
+        if await self.cart_counter.is_visible():
+            return await self.cart_counter.inner_text()
+        return None
+
+    async def get_compare_counter(self):
+        if await self.compare_products_counter.is_visible():
+            return await self.compare_products_counter.inner_text()
+        return None
@@ -0,0 +1,89 @@
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
+from service.wait_service import AsyncWaitService
+from .async_header_content import AsyncHeaderContent
+from .async_nav_sections import AsyncNavSections
+from .async_panel_navbar import AsyncPanelNavbar
+from components.locators import PageComponent, css
+
+class AsyncHomePage(PageComponent):
+    """playwright.async_api twin of HomePage"""
+    __slots__ = ('waits', 'header_content', 'nav_sections', 'panel_navbar')
+
+    # Search results locators
+    no_results_message = css('.message.notice')
+    search_results = css('.product-items .product-item')
+    product_links = css('.product-item-link')
+
+    def __init__(self, page: Page):
+        super().__init__(page)
+        self.waits = AsyncWaitService.for_page(page)
+        self.header_content = AsyncHeaderContent(page)
+        self.nav_sections = AsyncNavSections(page)
+        self.panel_navbar = AsyncPanelNavbar(page)
+
+    async def get_title(self):
+        return await self.page.title()
+
+    async def is_nav_menu_visible(self):
+        return await self.nav_sections.menu_list.is_visible()
+
+    async def is_cart_icon_visible(self):
+        return await self.header_content.cart_link.is_visible()
+
+    async def is_sign_in_visible(self):
+        return await self.panel_navbar.is_sign_in_visible()
+
+    async def is_create_account_visible(self):
+        return await self.panel_navbar.is_create_account_visible()
+
+    async def is_whats_new_visible(self):
+        return await self.nav_sections.is_whats_new_visible()
+
+    async def is_logo_visible(self):
+        return await self.header_content.logo_img.is_visible()
+
+    async def search(self, query: str):
+        await self.header_content.search(query)
+
+    async def has_search_results(self):
+        """Check if search returned any results"""
+        return not await self.no_results_message.is_visible() and await self.search_results.count() > 0
+
+    async def wait_until_ready(self, timeout: float = 10000):
+        """Wait until the storefront JS has initialised the navigation menu"""
+        await self.waits.selector('nav.navigation > ul.ui-menu', state='attached', name="homepage:ready",
+                                  timeout=timeout)
+
+    async def wait_for_search_results(self, timeout: float = 10000) -> bool:
+        """Wait until either the result grid or the no-results notice is rendered"""
+        try:
+            await self.waits.selector('.product-items .product-item, .message.notice', state='attached',
+                                      name="search:results", timeout=timeout)
+            return True
+        except PlaywrightTimeoutError:
+            return False
+
+    async def search_with_fallback(self, query: str, fallback_query: str = "jacket"):
+        """Search with a query and fallback to another query if no results"""
+        await self.search(query)
+        await self.wait_for_search_results()
+
+        if not await self.has_search_results():
+            print(f"Search for '{query}' returned no results. Trying with '{fallback_query}' instead.")
+            await self.search(fallback_query)
+            await self.wait_for_search_results()
+
+    async def get_first_product(self):
+        """Get the first product from search results"""
+        first_product = self.product_links.first
+        product_name = await first_product.text_content()
+        return {
+            "link": first_product,
+            "name": product_name.strip()
+        }
+
+    async def get_menu_items_text(self):
+        return await self.nav_sections.get_menu_items_text()
+
+    async def get_account_links_text(self):
+        return await self.nav_sections.get_account_links_text()
@@ -0,0 +1,53 @@
+from playwright.async_api import Page
+from components.locators import PageComponent, css
+
+class AsyncNavSections(PageComponent):
+    """playwright.async_api twin of NavSections"""
+    __slots__ = ()
+
+    # Main container
+    sections = css('div.sections.nav-sections')
+    section_items = css('div.section-items.nav-sections-items')
+    # Collapsible section titles
+    section_titles = css('div.section-item-title.nav-sections-item-title')
+    menu_section_title = css('div.section-item-title.nav-sections-item-title:has-text("Menu")')
+    account_section_title = css('div.section-item-title.nav-sections-item-title:has-text("Account")')
+    # Section contents
+    menu_section_content = css(r'div.section-item-content#store\.menu')
+    account_section_content = css(r'div.section-item-content#store\.links')
+    # Navigation (menu)
+    navigation = css('nav.navigation')
+    # Only select the first/top-level menu list to avoid strict mode violation
+    menu_list = css('nav.navigation > ul.ui-menu', nth=0)
+    menu_items = css('nav.navigation > ul.ui-menu > li.level0')
+    # Top-level menu links
+    menu_links = css('nav.navigation > ul.ui-menu > li.level0 > a')
+    # Account links inside Account section
+    account_links = css('div#store\\.links ul.header.links a')
+
+    def __init__(self, page: Page):
+        super().__init__(page)
+
+    async def is_main_menu_visible(self):
+        return await self.menu_list.is_visible()
+
+    async def is_whats_new_visible(self):
+        return await self.page.get_by_role("menuitem", name="What's New").is_visible()
+
+    async def expand_menu_section(self):
+        await self.menu_section_title.click()
+
+    async def expand_account_section(self):
+        await self.account_section_title.click()
+
+    async def get_menu_items_text(self):
+        return await self.menu_links.all_inner_texts()
+
+    async def get_account_links_text(self):
+        return await self.account_links.all_inner_texts()
+
+    async def click_menu_link_by_text(self, text: str):
+        await self.page.locator(f'nav.navigation ul.ui-menu > li.level0 > a:has-text("{text}")').click()
+
+    async def click_account_link_by_text(self, text: str):
+        await self.page.locator(f'div#store\\.links ul.header.links a:has-text("{text}")').click()
@@ -0,0 +1,36 @@
+from playwright.async_api import Page
+from components.locators import PageComponent, css, role
+
+class AsyncPanelNavbar(PageComponent):
+    """playwright.async_api twin of PanelNavbar"""
+    __slots__ = ()
+
+    # Locators matching the provided HTML structure
+    skip_to_content = css('a.action.skip.contentarea')
+    greet = css('li.greet.welcome')
+    not_logged_in = css('span.not-logged-in')
+    authorization_link = css('li.authorization-link')
+    # Use a more specific selector to avoid strict mode violation
+    sign_in = role("link", name="Sign In", first=True)
+    create_account = role("link", name="Create an Account")
+
+    def __init__(self, page: Page):
+        super().__init__(page)
+
+    async def is_skip_to_content_visible(self):
+        return await self.skip_to_content.is_visible()
+
+    async def is_greet_visible(self):
+        return await self.greet.is_visible()
+
+    async def is_not_logged_in_visible(self):
+        return await self.not_logged_in.is_visible()
+
+    async def is_authorization_link_visible(self):
+        return await self.authorization_link.is_visible()
+
+    async def is_sign_in_visible(self):
+        return await self.sign_in.is_visible()
+
+    async def is_create_account_visible(self):
+        return await self.create_account.is_visible()
@@ -1,30 +1,36 @@
 from playwright.sync_api import Page
+from service.wait_service import WaitService
+from components.locators import PageComponent, css
+
+class HeaderContent(PageComponent):
+    __slots__ = ('waits',)
+
+    # Hamburger/toggle nav
+    toggle_nav = css('span.action.nav-toggle')
+    # Logo
+    logo_link = css('a.logo')
+    logo_img = css('a.logo img')
+    # Minicart
+    minicart_wrapper = css('div.minicart-wrapper')
+    cart_link = css('a.action.showcart')
+    cart_text = css('a.action.showcart .text')
+    cart_counter = css('a.action.showcart .counter.qty')
+    # Minicart dialog
+    minicart_dialog = css('div.mage-dropdown-dialog')
+    minicart_close_btn = css('button#btn-minicart-close')
+    minicart_empty_msg = css('strong.subtitle.empty')
+    # Search
+    search_form = css('form#search_mini_form')
+    search_input = css('input#search')
+    search_button = css('button.action.search')
+    advanced_search_link = css('a.action.advanced')
+    # Compare products
+    compare_products_link = css('a.action.compare')
+    compare_products_counter = css('a.action.compare .counter.qty')
 
-class HeaderContent:
     def __init__(self, page: Page):
-        self.page = page
-        # Hamburger/toggle nav
-        self.toggle_nav = page.locator('span.action.nav-toggle')
-        # Logo
-        self.logo_link = page.locator('a.logo')
-        self.logo_img = page.locator('a.logo img')
-        # Minicart
-        self.minicart_wrapper = page.locator('div.minicart-wrapper')
-        self.cart_link = page.locator('a.action.showcart')
-        self.cart_text = page.locator('a.action.showcart .text')
-        self.cart_counter = page.locator('a.action.showcart .counter.qty')
-        # Minicart dialog
-        self.minicart_dialog = page.locator('div.mage-dropdown-dialog')
-        self.minicart_close_btn = page.locator('button#btn-minicart-close')
-        self.minicart_empty_msg = page.locator('strong.subtitle.empty')
-        # Search
-        self.search_form = page.locator('form#search_mini_form')
-        self.search_input = page.locator('input#search')
-        self.search_button = page.locator('button.action.search')
-        self.advanced_search_link = page.locator('a.action.advanced')
-        # Compare products
-        self.compare_products_link = page.locator('a.action.compare')
-        self.compare_products_counter = page.locator('a.action.compare .counter.qty')
+        super().__init__(page)
+        self.waits = WaitService.for_page(page)
 
     def click_toggle_nav(self):
         self.toggle_nav.click()
@@ -43,8 +49,9 @@ class HeaderContent:
     def search(self, query: str):
         self.search_input.fill('')
         self.search_input.fill(query)
-        self.search_button.click()
-        self.page.wait_for_load_state('networkidle')
+        # The results page is ready at DOMContentLoaded; networkidle waits on trackers too
+        with self.waits.endpoint('search'):
+            self.search_button.click()
 
     def open_advanced_search(self):
         self.advanced_search_link.click()
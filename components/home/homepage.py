@@ -1,20 +1,24 @@
-from playwright.sync_api import Page
+from playwright.sync_api import Page, TimeoutError as PlaywrightTimeoutError
+from service.wait_service import WaitService
 from .header_content import HeaderContent
 from .nav_sections import NavSections
 from .panel_navbar import PanelNavbar
+from components.locators import PageComponent, css
 
-class HomePage:
+class HomePage(PageComponent):
+    __slots__ = ('waits', 'header_content', 'nav_sections', 'panel_navbar')
+
+    # Search results locators
+    no_results_message = css('.message.notice')
+    search_results = css('.product-items .product-item')
+    product_links = css('.product-item-link')
 
     def __init__(self, page: Page):
-        self.page = page
+        super().__init__(page)
+        self.waits = WaitService.for_page(page)
         self.header_content = HeaderContent(page)
         self.nav_sections = NavSections(page)
         self.panel_navbar = PanelNavbar(page)
-        
-        # Search results locators
-        self.no_results_message = page.locator('.message.notice')
-        self.search_results = page.locator('.product-items .product-item')
-        self.product_links = page.locator('.product-item-link')
 
     # Proxy method for navigation menu visibility
     def is_nav_menu_visible(self):
@@ -49,15 +53,29 @@ class HomePage:
         """Check if search returned any results"""
         return not self.no_results_message.is_visible() and self.search_results.count() > 0
         
+    def wait_until_ready(self, timeout: float = 10000):
+        """Wait until the storefront JS has initialised the navigation menu"""
+        # The ui-menu class is added by the jQuery menu widget, so it marks the page as interactive
+        self.waits.selector('nav.navigation > ul.ui-menu', state='attached', name="homepage:ready", timeout=timeout)
+        
+    def wait_for_search_results(self, timeout: float = 10000) -> bool:
+        """Wait until either the result grid or the no-results notice is rendered"""
+        try:
+            self.waits.selector('.product-items .product-item, .message.notice', state='attached',
+                                name="search:results", timeout=timeout)
+            return True
+        except PlaywrightTimeoutError:
+            return False
+        
     def search_with_fallback(self, query: str, fallback_query: str="jacket"):
         """Search with a query and fallback to another query if no results"""
         self.search(query)
-        self.page.wait_for_timeout(1000)  # Wait for search results to load
+        self.wait_for_search_results()
         
         if not self.has_search_results():
             print(f"Search for '{query}' returned no results. Trying with '{fallback_query}' instead.")
             self.search(fallback_query)
-            self.page.wait_for_timeout(1000)  # Wait for new search results to load
+            self.wait_for_search_results()
             
     def get_first_product(self):
         """Get the first product from search results"""
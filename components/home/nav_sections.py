@@ -1,27 +1,31 @@
 from playwright.sync_api import Page
+from components.locators import PageComponent, css
+
+class NavSections(PageComponent):
+    __slots__ = ()
+
+    # Main container
+    sections = css('div.sections.nav-sections')
+    section_items = css('div.section-items.nav-sections-items')
+    # Collapsible section titles
+    section_titles = css('div.section-item-title.nav-sections-item-title')
+    menu_section_title = css('div.section-item-title.nav-sections-item-title:has-text("Menu")')
+    account_section_title = css('div.section-item-title.nav-sections-item-title:has-text("Account")')
+    # Section contents
+    menu_section_content = css(r'div.section-item-content#store\.menu')
+    account_section_content = css(r'div.section-item-content#store\.links')
+    # Navigation (menu)
+    navigation = css('nav.navigation')
+    # Only select the first/top-level menu list to avoid strict mode violation
+    menu_list = css('nav.navigation > ul.ui-menu', nth=0)
+    menu_items = css('nav.navigation > ul.ui-menu > li.level0')
+    # Top-level menu links
+    menu_links = css('nav.navigation > ul.ui-menu > li.level0 > a')
+    # Account links inside Account section
+    account_links = css('div#store\\.links ul.header.links a')
 
-class NavSections:
     def __init__(self, page: Page):
-        self.page = page
-        # Main container
-        self.sections = page.locator('div.sections.nav-sections')
-        self.section_items = page.locator('div.section-items.nav-sections-items')
-        # Collapsible section titles
-        self.section_titles = page.locator('div.section-item-title.nav-sections-item-title')
-        self.menu_section_title = page.locator('div.section-item-title.nav-sections-item-title:has-text("Menu")')
-        self.account_section_title = page.locator('div.section-item-title.nav-sections-item-title:has-text("Account")')
-        # Section contents
-        self.menu_section_content = page.locator(r'div.section-item-content#store\.menu')
-        self.account_section_content = page.locator(r'div.section-item-content#store\.links')
-        # Navigation (menu)
-        self.navigation = page.locator('nav.navigation')
-        # Only select the first/top-level menu list to avoid strict mode violation
-        self.menu_list = page.locator('nav.navigation > ul.ui-menu').nth(0)
-        self.menu_items = page.locator('nav.navigation > ul.ui-menu > li.level0')
-        # Top-level menu links
-        self.menu_links = page.locator('nav.navigation > ul.ui-menu > li.level0 > a')
-        # Account links inside Account section
-        self.account_links = page.locator('div#store\\.links ul.header.links a')
+        super().__init__(page)
 
     def is_main_menu_visible(self):
         return self.menu_list.is_visible()
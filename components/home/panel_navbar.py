@@ -1,16 +1,20 @@
 from playwright.sync_api import Page
+from components.locators import PageComponent, css, role
+
+class PanelNavbar(PageComponent):
+    __slots__ = ()
+
+    # Locators matching the provided HTML structure
+    skip_to_content = css('a.action.skip.contentarea')
+    greet = css('li.greet.welcome')
+    not_logged_in = css('span.not-logged-in')
+    authorization_link = css('li.authorization-link')
+    # Use a more specific selector to avoid strict mode violation
+    sign_in = role("link", name="Sign In", first=True)
+    create_account = role("link", name="Create an Account")
 
-class PanelNavbar:
     def __init__(self, page: Page):
-        self.page = page
-        # Locators matching the provided HTML structure
-        self.skip_to_content = page.locator('a.action.skip.contentarea')
-        self.greet = page.locator('li.greet.welcome')
-        self.not_logged_in = page.locator('span.not-logged-in')
-        self.authorization_link = page.locator('li.authorization-link')
-        # Use a more specific selector to avoid strict mode violation
-        self.sign_in = page.get_by_role("link", name="Sign In").first
-        self.create_account = page.get_by_role("link", name="Create an Account")
+        super().__init__(page)
 
     def is_skip_to_content_visible(self):
         return self.skip_to_content.is_visible()
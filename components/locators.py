@@ -0,0 +1,132 @@
+"""
+Declarative locators for page objects.
+
+Selectors are declared once on the class and turned into Playwright locators the
+first time an instance reads them, so a test that touches two elements of a page
+object pays for two locators instead of fifty. Built locators are cached in a
+per-instance slot list; instances carry no __dict__.
+
+    class ProductPage(PageComponent):
+        __slots__ = ("waits",)
+
+        product_name = css('.page-title span.base')
+        sign_in = role("link", name="Sign In", first=True)
+
+`REGISTRY` maps every page object class to its selectors for tooling (selector
+linting, coverage against the stand-in storefront, docs).
+"""
+import importlib
+from pathlib import Path
+from typing import Dict, Optional
+
+# "module.Class" -> {attribute: selector description}, inherited declarations included
+REGISTRY: Dict[str, Dict[str, str]] = {}
+
+
+class LocatorDef:
+    """Class-level declaration of one locator; a read-only data descriptor"""
+
+    __slots__ = ("selector", "role", "role_name", "nth", "first", "name", "index")
+
+    def __init__(self, selector: Optional[str] = None, role: Optional[str] = None, role_name: Optional[str] = None,
+                 nth: Optional[int] = None, first: bool = False):
+        self.selector = selector
+        self.role = role
+        self.role_name = role_name
+        self.nth = nth
+        self.first = first
+        self.name = None
+        self.index = None
+
+    def describe(self) -> str:
+        if self.role is not None:
+            text = f'role={self.role}[name="{self.role_name}"]' if self.role_name else f"role={self.role}"
+        else:
+            text = self.selector
+        if self.first:
+            text += " >> first"
+        elif self.nth is not None:
+            text += f" >> nth={self.nth}"
+        return text
+
+    def build(self, page):
+        if self.role is not None:
+            if self.role_name:
+                locator = page.get_by_role(self.role, name=self.role_name)
+            else:
+                locator = page.get_by_role(self.role)
+        else:
+            locator = page.locator(self.selector)
+        if self.first:
+            return locator.first
+        if self.nth is not None:
+            return locator.nth(self.nth)
+        return locator
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        cache = instance._locators
+        locator = cache[self.index]
+        if locator is None:
+            locator = cache[self.index] = self.build(instance.page)
+        return locator
+
+    def __set__(self, instance, value):
+        raise AttributeError(f"{type(instance).__name__}.{self.name} is a declared locator and cannot be reassigned")
+
+    def __repr__(self):
+        return f"<locator {self.name}: {self.describe()}>"
+
+
+def css(selector: str, nth: Optional[int] = None, first: bool = False) -> LocatorDef:
+    """`page.locator(selector)`, optionally narrowed with .nth(n) or .first"""
+    return LocatorDef(selector=selector, nth=nth, first=first)
+
+
+def role(role_: str, name: Optional[str] = None, nth: Optional[int] = None, first: bool = False) -> LocatorDef:
+    """`page.get_by_role(role, name=name)`, optionally narrowed with .nth(n) or .first"""
+    return LocatorDef(role=role_, role_name=name, nth=nth, first=first)
+
+
+class PageComponent:
+    """Base for page objects: holds `page` and the lazily built locators declared on the class"""
+
+    __slots__ = ("page", "_locators")
+    _locator_defs: Dict[str, LocatorDef] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        defs = dict(cls._locator_defs)
+        for name, value in list(cls.__dict__.items()):
+            if isinstance(value, LocatorDef):
+                if name in defs:
+                    # Overriding a parent's locator keeps its slot
+                    value.index = defs[name].index
+                else:
+                    value.index = len(defs)
+                defs[name] = value
+        cls._locator_defs = defs
+        REGISTRY[f"{cls.__module__}.{cls.__qualname__}"] = {name: d.describe() for name, d in defs.items()}
+
+    def __init__(self, page):
+        self.page = page
+        self._locators = [None] * len(self._locator_defs)
+
+    @classmethod
+    def selectors(cls) -> Dict[str, str]:
+        """Every selector this page object declares, by attribute name"""
+        return {name: d.describe() for name, d in cls._locator_defs.items()}
+
+
+def registry() -> Dict[str, Dict[str, str]]:
+    """REGISTRY after importing every module under components/, so no page object is missing"""
+    root = Path(__file__).parent
+    # Walk files rather than packages: not every subfolder has an __init__.py
+    for path in sorted(root.rglob("*.py")):
+        if path.name != "__init__.py":
+            importlib.import_module(".".join(("components",) + path.relative_to(root).with_suffix("").parts))
+    return dict(REGISTRY)
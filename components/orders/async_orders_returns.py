@@ -0,0 +1,189 @@
+from urllib.parse import urljoin
+from playwright.async_api import Page
+from components.orders.orders_returns import DEFAULT_STOREFRONT, LOOKUP_RESULT
+from service import js_bundle
+from service.wait_service import AsyncWaitService
+from components.locators import PageComponent, css
+from components.orders.order_details import (ORDER_ITEM_ROWS, SNAPSHOT_FIELDS, OrderDetails,
+                                             OrderDetailsCache)
+
+class AsyncOrdersReturnsPage(PageComponent):
+    """playwright.async_api twin of OrdersReturnsPage"""
+    __slots__ = ('waits', '_cache')
+
+    # Page title
+    page_title = css('.page-title span.base')
+
+    # Form
+    form = css('#oar-widget-orders-and-returns-form')
+
+    # Order Information fields
+    order_id_input = css('#oar-order-id')
+    billing_lastname_input = css('#oar-billing-lastname')
+    find_order_by_select = css('#quick-search-type-id')
+
+    # Email field (visible by default)
+    email_field = css('#oar-email')
+    email_input = css('#oar_email')
+
+    # ZIP code field (hidden by default)
+    zip_field = css('#oar-zip')
+    zip_input = css('#oar_zip')
+
+    # Submit button
+    continue_button = css('button.action.submit.primary')
+
+    # Error messages
+    error_message = css('.message-error')
+
+    # Order Details Page Elements
+    order_number = css('.page-title span.base')
+    order_status = css('.order-status')
+    order_date = css('.order-date span:not(.label)')
+    reorder_button = css('.action.order')
+    print_order_button = css('.action.print')
+
+    # Order Items Table
+    order_items_table = css('#my-orders-table')
+    product_names = css('.product.name.product-item-name')
+
+    # Shipping and Billing Information
+    shipping_address = css('.box.box-order-shipping-address .box-content')
+    billing_address = css('.box.box-order-billing-address .box-content')
+    shipping_method = css('.box.box-order-shipping-method .box-content')
+    payment_method = css('.box.box-order-billing-method .box-content')
+
+    # Order Totals
+    subtotal = css('tr.subtotal .amount .price')
+    shipping_total = css('tr.shipping .amount .price')
+    grand_total = css('tr.grand_total .amount .price')
+
+    def __init__(self, page: Page):
+        super().__init__(page)
+        self.waits = AsyncWaitService.for_page(page)
+        self._cache = OrderDetailsCache.for_page(page)
+        
+    async def navigate(self, base_url=None):
+        """Navigate to the Orders and Returns page of `base_url` (default: the storefront already open)"""
+        if base_url is None:
+            base_url = self.page.url if self.page.url.startswith('http') else DEFAULT_STOREFRONT
+        await self.page.goto(urljoin(base_url, '/sales/guest/form/'), wait_until='domcontentloaded')
+        await self.waits.selector('#oar-widget-orders-and-returns-form', name="orders:form")
+        
+    async def is_page_loaded(self):
+        """Check if the Orders and Returns page is loaded"""
+        return await self.page_title.is_visible() and await self.page_title.text_content() == "Orders and Returns"
+        
+    async def select_find_order_by(self, option: str):
+        """Select an option from the 'Find Order By' dropdown
+        
+        Args:
+            option: Either 'email' or 'zip'
+        """
+        await self.find_order_by_select.select_option(option)
+        
+        # Wait for the appropriate field to be visible
+        if option == 'email':
+            await self.email_field.wait_for(state='visible')
+        elif option == 'zip':
+            await self.zip_field.wait_for(state='visible')
+            
+    async def fill_order_details(self, order_id: str, billing_lastname: str, email_or_zip: str, find_by: str = 'email'):
+        """Fill in the order details form (see OrdersReturnsPage.fill_order_details)"""
+        await self.order_id_input.fill(order_id)
+        await self.billing_lastname_input.fill(billing_lastname)
+        await self.select_find_order_by(find_by)
+        
+        if find_by == 'email':
+            await self.email_input.fill(email_or_zip)
+        elif find_by == 'zip':
+            await self.zip_input.fill(email_or_zip)
+            
+    async def submit_form(self):
+        """Submit the form and wait for the order view or a message"""
+        async with self.waits.endpoint('orders_lookup'):
+            await self.continue_button.click()
+        # A failed lookup redirects back to the form, whose error Magento renders from the
+        # mage-messages cookie only after the page has loaded
+        await self.waits.selector(LOOKUP_RESULT, name="orders:result")
+        
+    async def search_order(self, order_id: str, billing_lastname: str, email_or_zip: str, find_by: str = 'email'):
+        """Search for an order (see OrdersReturnsPage.search_order)"""
+        await self.fill_order_details(order_id, billing_lastname, email_or_zip, find_by)
+        await self.submit_form()
+        
+    async def snapshot(self, refresh: bool = False) -> OrderDetails:
+        """The whole order details view (and any error message) from one evaluate call
+        
+        Cached until the page navigates, so the getters below cost no round trips after the first.
+        A page with neither an order nor an error is not cached: the error may not be rendered yet.
+        """
+        if refresh or self._cache.snapshot is None or self._cache.snapshot.url != self.page.url:
+            selectors = {name: self.selectors()[name] for name in SNAPSHOT_FIELDS}
+            data = await js_bundle.async_call(self.page, "orders.details", selectors, ORDER_ITEM_ROWS)
+            snapshot = OrderDetails.from_js(data)
+            self._cache.snapshot = snapshot if snapshot.displayed or snapshot.error_message is not None else None
+            return snapshot
+        return self._cache.snapshot
+        
+    async def has_error_message(self):
+        """Check if there is an error message"""
+        return (await self.snapshot()).error_message is not None
+        
+    async def get_error_message(self):
+        """Get the error message text"""
+        return (await self.snapshot()).error_message
+        
+    async def is_order_details_page_displayed(self):
+        """Check if the order details page is displayed"""
+        # Title, status and items table must all be visible
+        return (await self.snapshot()).displayed
+        
+    async def get_order_number(self):
+        """Get the order number from the order details page"""
+        return (await self.snapshot()).order_number
+        
+    async def get_order_status(self):
+        """Get the order status"""
+        return (await self.snapshot()).status
+        
+    async def get_order_date(self):
+        """Get the order date"""
+        return (await self.snapshot()).date
+        
+    async def get_product_names(self):
+        """Get the names of products in the order"""
+        return list((await self.snapshot()).product_names)
+        
+    async def get_shipping_address(self):
+        """Get the shipping address"""
+        return (await self.snapshot()).shipping_address
+        
+    async def get_billing_address(self):
+        """Get the billing address"""
+        return (await self.snapshot()).billing_address
+        
+    async def get_payment_method(self):
+        """Get the payment method"""
+        return (await self.snapshot()).payment_method
+        
+    async def get_order_total(self):
+        """Get the grand total of the order"""
+        return (await self.snapshot()).grand_total
+        
+    async def verify_order_details(self, expected_order_id=None, expected_email=None):
+        """Verify the order details match the expected values (see OrdersReturnsPage.verify_order_details)"""
+        if not await self.is_order_details_page_displayed():
+            print("Order details page is not displayed")
+            return False
+            
+        if expected_order_id:
+            actual_order_id = await self.get_order_number()
+            print(f"Verifying order ID - Expected: {expected_order_id}, Actual: {actual_order_id}")
+            if not actual_order_id:
+                print("Order ID is not displayed")
+                return False
+            if expected_order_id not in actual_order_id:
+                print(f"Order ID mismatch: expected {expected_order_id}, got {actual_order_id}")
+                return False
+        return True
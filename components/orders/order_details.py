@@ -0,0 +1,104 @@
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+# Rows the bundle's orders.details reads items from; the selectors of SNAPSHOT_FIELDS
+# stay declared on the page object
+ORDER_ITEM_ROWS = '#my-orders-table tbody tr[id^="order-item-row"]'
+
+# OrdersReturnsPage locators that make up a snapshot
+SNAPSHOT_FIELDS = (
+    "order_number", "order_status", "order_date", "order_items_table", "error_message",
+    "shipping_address", "billing_address", "shipping_method", "payment_method",
+    "subtotal", "shipping_total", "grand_total", "product_names",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class OrderItem:
+    name: Optional[str]
+    sku: Optional[str]
+    price: Optional[str]
+    qty: Optional[str]
+    subtotal: Optional[str]
+
+
+@dataclass(frozen=True, slots=True)
+class OrderDetails:
+    """Everything the guest order view shows, read in one browser round trip"""
+    url: str
+    title: Optional[str]
+    status: Optional[str]
+    date: Optional[str]
+    items_table_visible: bool
+    product_names: Tuple[str, ...]
+    items: Tuple[OrderItem, ...]
+    shipping_address: Optional[str]
+    billing_address: Optional[str]
+    shipping_method: Optional[str]
+    payment_method: Optional[str]
+    subtotal: Optional[str]
+    shipping_total: Optional[str]
+    grand_total: Optional[str]
+    error_message: Optional[str]
+
+    @property
+    def order_number(self) -> Optional[str]:
+        """Number from a title like 'Order # 000054232'"""
+        if self.title is None:
+            return None
+        return self.title.split("#")[1].strip() if "#" in self.title else self.title
+
+    @property
+    def displayed(self) -> bool:
+        """Same check as is_order_details_page_displayed: title, status and items table visible"""
+        return self.title is not None and self.status is not None and self.items_table_visible
+
+    @classmethod
+    def from_js(cls, data: Dict) -> "OrderDetails":
+        fields = data["fields"]
+        payment = fields["payment_method"]
+        return cls(
+            url=data["url"],
+            title=fields["order_number"],
+            status=fields["order_status"],
+            date=fields["order_date"],
+            items_table_visible=fields["order_items_table"] is not None,
+            product_names=tuple(data["productNames"]),
+            items=tuple(OrderItem(**item) for item in data["items"]),
+            shipping_address=fields["shipping_address"],
+            billing_address=fields["billing_address"],
+            shipping_method=fields["shipping_method"],
+            payment_method=payment.strip() if payment is not None else None,
+            subtotal=fields["subtotal"],
+            shipping_total=fields["shipping_total"],
+            grand_total=fields["grand_total"],
+            error_message=fields["error_message"],
+        )
+
+
+class OrderDetailsCache:
+    """
+    The cached OrderDetails of one page, shared by every orders page object on it.
+
+    Use `OrderDetailsCache.for_page(page)` so the framenavigated listener that drops the
+    snapshot is added once per page; like SnapshotCache it keeps no reference to the page.
+    """
+
+    _instances: "WeakKeyDictionary[object, OrderDetailsCache]" = WeakKeyDictionary()
+
+    def __init__(self, page):
+        self.snapshot: Optional[OrderDetails] = None
+        page.on('framenavigated', self._on_navigated)
+
+    @classmethod
+    def for_page(cls, page) -> "OrderDetailsCache":
+        cache = cls._instances.get(page)
+        if cache is None:
+            cache = cls(page)
+            cls._instances[page] = cache
+        return cache
+
+    def _on_navigated(self, frame):
+        if frame.parent_frame is None:
+            self.snapshot = None
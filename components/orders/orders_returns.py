@@ -1,62 +1,78 @@
+from urllib.parse import urljoin
 from playwright.sync_api import Page
+from service import js_bundle
+from service.wait_service import WaitService
+from components.locators import PageComponent, css
+from components.orders.order_details import (ORDER_ITEM_ROWS, SNAPSHOT_FIELDS, OrderDetails,
+                                             OrderDetailsCache)
 
-class OrdersReturnsPage:
+DEFAULT_STOREFRONT = 'https://magento.softwaretestingboard.com/'
+
+# What a lookup ends on: the order view, or the form with a flash message
+LOOKUP_RESULT = '#my-orders-table, .messages .message'
+
+class OrdersReturnsPage(PageComponent):
     """Component representing the Orders and Returns page"""
-    
+    __slots__ = ('waits', '_cache')
+
+    # Page title
+    page_title = css('.page-title span.base')
+
+    # Form
+    form = css('#oar-widget-orders-and-returns-form')
+
+    # Order Information fields
+    order_id_input = css('#oar-order-id')
+    billing_lastname_input = css('#oar-billing-lastname')
+    find_order_by_select = css('#quick-search-type-id')
+
+    # Email field (visible by default)
+    email_field = css('#oar-email')
+    email_input = css('#oar_email')
+
+    # ZIP code field (hidden by default)
+    zip_field = css('#oar-zip')
+    zip_input = css('#oar_zip')
+
+    # Submit button
+    continue_button = css('button.action.submit.primary')
+
+    # Error messages
+    error_message = css('.message-error')
+
+    # Order Details Page Elements
+    order_number = css('.page-title span.base')
+    order_status = css('.order-status')
+    order_date = css('.order-date span:not(.label)')
+    reorder_button = css('.action.order')
+    print_order_button = css('.action.print')
+
+    # Order Items Table
+    order_items_table = css('#my-orders-table')
+    product_names = css('.product.name.product-item-name')
+
+    # Shipping and Billing Information
+    shipping_address = css('.box.box-order-shipping-address .box-content')
+    billing_address = css('.box.box-order-billing-address .box-content')
+    shipping_method = css('.box.box-order-shipping-method .box-content')
+    payment_method = css('.box.box-order-billing-method .box-content')
+
+    # Order Totals
+    subtotal = css('tr.subtotal .amount .price')
+    shipping_total = css('tr.shipping .amount .price')
+    grand_total = css('tr.grand_total .amount .price')
+
     def __init__(self, page: Page):
-        self.page = page
+        super().__init__(page)
+        self.waits = WaitService.for_page(page)
+        self._cache = OrderDetailsCache.for_page(page)
         
-        # Page title
-        self.page_title = page.locator('.page-title span.base')
-        
-        # Form
-        self.form = page.locator('#oar-widget-orders-and-returns-form')
-        
-        # Order Information fields
-        self.order_id_input = page.locator('#oar-order-id')
-        self.billing_lastname_input = page.locator('#oar-billing-lastname')
-        self.find_order_by_select = page.locator('#quick-search-type-id')
-        
-        # Email field (visible by default)
-        self.email_field = page.locator('#oar-email')
-        self.email_input = page.locator('#oar_email')
-        
-        # ZIP code field (hidden by default)
-        self.zip_field = page.locator('#oar-zip')
-        self.zip_input = page.locator('#oar_zip')
-        
-        # Submit button
-        self.continue_button = page.locator('button.action.submit.primary')
-        
-        # Error messages
-        self.error_message = page.locator('.message-error')
-        
-        # Order Details Page Elements
-        self.order_number = page.locator('.page-title span.base')
-        self.order_status = page.locator('.order-status')
-        self.order_date = page.locator('.order-date span:not(.label)')
-        self.reorder_button = page.locator('.action.order')
-        self.print_order_button = page.locator('.action.print')
-        
-        # Order Items Table
-        self.order_items_table = page.locator('#my-orders-table')
-        self.product_names = page.locator('.product.name.product-item-name')
-        
-        # Shipping and Billing Information
-        self.shipping_address = page.locator('.box.box-order-shipping-address .box-content')
-        self.billing_address = page.locator('.box.box-order-billing-address .box-content')
-        self.shipping_method = page.locator('.box.box-order-shipping-method .box-content')
-        self.payment_method = page.locator('.box.box-order-billing-method .box-content')
-        
-        # Order Totals
-        self.subtotal = page.locator('tr.subtotal .amount .price')
-        self.shipping_total = page.locator('tr.shipping .amount .price')
-        self.grand_total = page.locator('tr.grand_total .amount .price')
-        
-    def navigate(self):
-        """Navigate to the Orders and Returns page"""
-        self.page.goto('https://magento.softwaretestingboard.com/sales/guest/form/')
-        self.page.wait_for_load_state('networkidle')
+    def navigate(self, base_url=None):
+        """Navigate to the Orders and Returns page of `base_url` (default: the storefront already open)"""
+        if base_url is None:
+            base_url = self.page.url if self.page.url.startswith('http') else DEFAULT_STOREFRONT
+        self.page.goto(urljoin(base_url, '/sales/guest/form/'), wait_until='domcontentloaded')
+        self.waits.selector('#oar-widget-orders-and-returns-form', name="orders:form")
         
     def is_page_loaded(self):
         """Check if the Orders and Returns page is loaded"""
@@ -95,9 +111,12 @@ class OrdersReturnsPage:
             self.zip_input.fill(email_or_zip)
             
     def submit_form(self):
-        """Submit the form"""
-        self.continue_button.click()
-        self.page.wait_for_load_state('networkidle')
+        """Submit the form and wait for the order view or a message"""
+        with self.waits.endpoint('orders_lookup'):
+            self.continue_button.click()
+        # A failed lookup redirects back to the form, whose error Magento renders from the
+        # mage-messages cookie only after the page has loaded
+        self.waits.selector(LOOKUP_RESULT, name="orders:result")
         
     def search_order(self, order_id: str, billing_lastname: str, email_or_zip: str, find_by: str = 'email'):
         """Search for an order
@@ -111,76 +130,64 @@ class OrdersReturnsPage:
         self.fill_order_details(order_id, billing_lastname, email_or_zip, find_by)
         self.submit_form()
         
+    def snapshot(self, refresh: bool = False) -> OrderDetails:
+        """The whole order details view (and any error message) from one evaluate call
+        
+        Cached until the page navigates, so the getters below cost no round trips after the first.
+        A page with neither an order nor an error is not cached: the error may not be rendered yet.
+        """
+        if refresh or self._cache.snapshot is None or self._cache.snapshot.url != self.page.url:
+            selectors = {name: self.selectors()[name] for name in SNAPSHOT_FIELDS}
+            data = js_bundle.call(self.page, "orders.details", selectors, ORDER_ITEM_ROWS)
+            snapshot = OrderDetails.from_js(data)
+            self._cache.snapshot = snapshot if snapshot.displayed or snapshot.error_message is not None else None
+            return snapshot
+        return self._cache.snapshot
+        
     def has_error_message(self):
         """Check if there is an error message"""
-        return self.error_message.is_visible()
+        return self.snapshot().error_message is not None
         
     def get_error_message(self):
         """Get the error message text"""
-        if self.has_error_message():
-            return self.error_message.text_content()
-        return None
+        return self.snapshot().error_message
         
     def is_order_details_page_displayed(self):
         """Check if the order details page is displayed"""
-        # Check for key elements that should be present on the order details page
-        return (
-            self.order_number.is_visible() and
-            self.order_status.is_visible() and
-            self.order_items_table.is_visible()
-        )
+        # Title, status and items table must all be visible
+        return self.snapshot().displayed
         
     def get_order_number(self):
         """Get the order number from the order details page"""
-        if self.order_number.is_visible():
-            # Extract just the order number from text like "Order # 000054232"
-            text = self.order_number.text_content()
-            if "#" in text:
-                return text.split("#")[1].strip()
-            return text
-        return None
+        return self.snapshot().order_number
         
     def get_order_status(self):
         """Get the order status"""
-        if self.order_status.is_visible():
-            return self.order_status.text_content()
-        return None
+        return self.snapshot().status
         
     def get_order_date(self):
         """Get the order date"""
-        if self.order_date.is_visible():
-            return self.order_date.text_content()
-        return None
+        return self.snapshot().date
         
     def get_product_names(self):
         """Get the names of products in the order"""
-        if self.product_names.count() > 0:
-            return [name.text_content() for name in self.product_names.all()]
-        return []
+        return list(self.snapshot().product_names)
         
     def get_shipping_address(self):
         """Get the shipping address"""
-        if self.shipping_address.is_visible():
-            return self.shipping_address.text_content()
-        return None
+        return self.snapshot().shipping_address
         
     def get_billing_address(self):
         """Get the billing address"""
-        if self.billing_address.is_visible():
-            return self.billing_address.text_content()
-        return None
+        return self.snapshot().billing_address
         
     def get_payment_method(self):
         """Get the payment method"""
-        if self.payment_method.is_visible():
-            return self.payment_method.text_content().strip()
-        return None
+        return self.snapshot().payment_method
         
     def get_order_total(self):
         """Get the grand total of the order"""
-        if self.grand_total.is_visible():
-            return self.grand_total.text_content()
-        return None
+        return self.snapshot().grand_total
         
     def verify_order_details(self, expected_order_id=None, expected_email=None):
         """Verify the order details match the expected values
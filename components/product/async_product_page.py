@@ -0,0 +1,244 @@
+from typing import Optional
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
+from service import js_bundle
+from service.cart_service import AsyncCartService
+from service.wait_service import AsyncWaitService, CART_RENDERED_JS
+from components.locators import PageComponent, css
+from components.product.product_snapshot import (SNAPSHOT_LOCATORS, ProductSnapshot, SnapshotCache,
+                                                 nearest_enabled)
+
+class AsyncProductPage(PageComponent):
+    """playwright.async_api twin of ProductPage"""
+    __slots__ = ('waits', '_cache')
+
+    # Product details selectors
+    product_name = css('.page-title span.base')
+    product_price = css('.price-box .price-wrapper .price')
+    product_sku = css('.product.attribute.sku .value')
+    product_description = css('.product.attribute.description .value')
+    product_stock_status = css('.stock.available')
+    stock_status = css('.product-info-stock-sku .stock')
+
+    # Product ratings
+    product_rating = css('.rating-result')
+    reviews_count = css('.reviews-actions .action.view span:first-child')
+
+    # Size options
+    size_attribute = css('.swatch-attribute.size')
+    size_options = css('.swatch-attribute.size .swatch-option.text')
+
+    # Color options
+    color_attribute = css('.swatch-attribute.color')
+    color_options = css('.swatch-attribute.color .swatch-option.color')
+
+    # Quantity
+    quantity_input = css('#qty')
+
+    # Add to cart button
+    add_to_cart_button = css('#product-addtocart-button')
+
+    # Success message
+    success_message = css('.message-success')
+
+    # Cart elements
+    cart_icon = css('.action.showcart')
+    cart_counter = css('.counter-number')
+    minicart = css('.block-minicart')
+    minicart_wrapper = css('#minicart-content-wrapper')
+    proceed_to_checkout = css('#top-cart-btn-checkout')
+    cart_items = css('#mini-cart .item.product.product-item')
+    cart_item_remove_buttons = css('.product.actions .secondary .action.delete')
+    cart_empty_message = css('.subtitle.empty')
+    view_and_edit_cart = css('.action.viewcart')
+    minicart_close_button = css('#btn-minicart-close')
+    cart_subtotal = css('.subtotal .price-container .price')
+    cart_items_count_text = css('.items-total .count')
+
+    # Wishlist and compare
+    add_to_wishlist = css('.action.towishlist')
+    add_to_compare = css('.action.tocompare')
+
+    # Product tabs
+    details_tab = css('#tab-label-description')
+    more_info_tab = css('#tab-label-additional')
+    reviews_tab = css('#tab-label-reviews')
+
+    def __init__(self, page: Page):
+        super().__init__(page)
+        self.waits = AsyncWaitService.for_page(page)
+        self._cache = SnapshotCache.for_page(page)
+        
+    async def navigate(self, url: str):
+        """Open a product page directly, e.g. a CatalogProduct.url from the catalog index"""
+        await self.page.goto(url, wait_until='domcontentloaded')
+
+    async def snapshot(self, refresh: bool = False, timeout: float = 10000) -> ProductSnapshot:
+        """Name, price, SKU, stock, swatches, quantity and cart counter from one evaluate
+
+        Cached until the page navigates or the cart changes (add, remove, qty update or a
+        customer-data reload); selecting a swatch or setting the quantity also drops it.
+        """
+        if refresh or self._cache.snapshot is None or self._cache.snapshot.url != self.page.url:
+            selectors = self.selectors()
+            fields = {field: selectors[name] for field, name in SNAPSHOT_LOCATORS.items()}
+            result = await js_bundle.async_call(self.page, "product.snapshot", fields, timeout)
+            snapshot = ProductSnapshot.from_js(result)
+            # Not rendered within the timeout: hand it out, but read again next time
+            self._cache.snapshot = snapshot if snapshot.ready else None
+            return snapshot
+        return self._cache.snapshot
+
+    async def get_product_name(self) -> str:
+        """Get the product name"""
+        return (await self.snapshot()).name
+    
+    async def get_product_price(self) -> str:
+        """Get the product price"""
+        return (await self.snapshot()).price
+
+    async def _select_swatch(self, options, kind: str, index: int) -> Optional[int]:
+        swatches = getattr(await self.snapshot(), kind)
+        chosen = nearest_enabled(swatches, index)
+        if chosen is None:
+            print(f"No enabled {kind} swatch to select")
+            return None
+        if chosen != index:
+            state = "disabled" if index < len(swatches) else "missing"
+            print(f"{kind} swatch {index} is {state}, selecting {chosen} ({swatches[chosen].label}) instead")
+        await options.nth(chosen).click()
+        self._cache.snapshot = None
+        return chosen
+    
+    async def select_size(self, size_index: int = 0) -> Optional[int]:
+        """Select a size option by index, or the nearest enabled one if it is missing or disabled
+
+        Returns the index selected, or None when the product has no enabled size.
+        """
+        return await self._select_swatch(self.size_options, "sizes", size_index)
+        
+    async def select_color(self, color_index: int = 0) -> Optional[int]:
+        """Select a color option by index, or the nearest enabled one if it is missing or disabled
+
+        Returns the index selected, or None when the product has no enabled color.
+        """
+        return await self._select_swatch(self.color_options, "colors", color_index)
+        
+    async def set_quantity(self, quantity: int = 1):
+        """Set the product quantity"""
+        await self.quantity_input.fill(str(quantity))
+        self._cache.snapshot = None
+        
+    async def add_to_cart(self):
+        """Add the product to cart"""
+        await self.add_to_cart_button.click()
+        # Wait for success message
+        await self.success_message.wait_for(state='visible', timeout=10000)
+        self._cache.snapshot = None
+        
+    async def is_added_to_cart(self) -> bool:
+        """Check if product was added to cart successfully"""
+        return await self.success_message.is_visible()
+    
+    async def get_cart_count(self) -> int:
+        """Get the number of items in cart"""
+        return (await self.snapshot()).cart_count
+    
+    async def proceed_to_checkout_from_minicart(self):
+        """Open mini cart and proceed to checkout"""
+        await self.cart_icon.click()
+        await self.proceed_to_checkout.wait_for(state='visible', timeout=5000)
+        await self.proceed_to_checkout.click()
+        
+    async def open_minicart(self) -> dict:
+        """Open the mini cart and return its state once the dropdown is shown
+
+        The click waits until the minicart widget and its customer-data content are rendered,
+        so it cannot be lost on a half-initialised page, and it is skipped if the dropdown is
+        already open (clicking again would close it).
+        """
+        state = await self.waits.minicart(ready=True, name="minicart:ready")
+        if not state["open"]:
+            await self.cart_icon.click()
+            state = await self.waits.minicart(open=True, name="minicart:open", timeout=5000)
+        return state
+        
+    async def get_cart_items_count(self) -> int:
+        """Get the number of items in the mini cart"""
+        return (await self.open_minicart())["count"]
+        
+    async def remove_item_from_cart(self, item_index: int = 0):
+        """Remove an item from the cart by index"""
+        try:
+            items_before = (await self.open_minicart())["count"]
+            
+            if items_before == 0:
+                print("No items in cart to remove")
+                return
+            if item_index >= items_before:
+                print(f"Invalid item index {item_index}, only {items_before} items in cart")
+                return
+            
+            try:
+                await js_bundle.async_call(self.page, "cart.remove", item_index)
+                
+                # Wait for the confirmation dialog
+                try:
+                    dialog_visible = await self.waits.selector('.modal-popup.confirm._show', timeout=3000,
+                                                               name="cart:confirm-dialog")
+                except PlaywrightTimeoutError:
+                    dialog_visible = None
+                
+                # removeItem is followed by a reload of the cart customer-data section
+                async with self.waits.customer_data('cart', name="cart:reload-after-remove"):
+                    if dialog_visible:
+                        async with self.waits.endpoint('cart_remove'):
+                            await js_bundle.async_call(self.page, "cart.confirm")
+                    else:
+                        print("Confirmation dialog not found, waiting for the cart to reload")
+                
+                try:
+                    state = await self.waits.minicart(count__lt=items_before, name="cart:item-removed", timeout=5000)
+                except PlaywrightTimeoutError:
+                    await self.reload_with_cart()
+                    state = await self.open_minicart()
+                
+                items_after = state["count"]
+                print(f"Items before: {items_before}, Items after: {items_after}")
+                if items_after >= items_before:
+                    print("Warning: Failed to remove item from cart")
+                
+            except Exception as e:
+                print(f"Error during item removal: {str(e)}")
+                
+        except Exception as e:
+            print(f"Error removing item from cart: {str(e)}")
+        
+    async def remove_all_items_from_cart(self, storefront_url: str):
+        """Empty the cart in one request and re-render the minicart from customer data
+
+        `storefront_url` is the configured base URL, which may carry a path the page URL does not reveal.
+        """
+        await AsyncCartService(self.page.context, storefront_url).reset()
+        await self.reload_with_cart()
+        
+    async def reload_with_cart(self):
+        await self.page.reload(wait_until='domcontentloaded')
+        await self.waits.until(CART_RENDERED_JS, name="cart:rendered")
+
+    async def wait_for_cart_count(self, expected: int = None, minimum: int = None, timeout: float = 10000) -> int:
+        """Wait until the header cart counter equals `expected` (or reaches `minimum`) and return it"""
+        result = await self.waits.until("""
+            ([expected, minimum]) => {
+                const counter = document.querySelector('.counter-number');
+                const count = counter ? (parseInt(counter.textContent.trim(), 10) || 0) : 0;
+                const done = expected !== null ? count === expected : count >= minimum;
+                return done ? {count} : false;
+            }
+        """, arg=[expected, minimum if minimum is not None else 1], name="cart:counter", timeout=timeout)
+        # The counter just settled; the next snapshot should see it
+        self._cache.snapshot = None
+        return result["count"]
+            
+    async def is_cart_empty(self) -> bool:
+        """Check if the cart is empty"""
+        return (await self.open_minicart())["empty"]
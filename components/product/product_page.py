@@ -1,87 +1,138 @@
-from playwright.sync_api import Page, Locator
+from typing import Optional
+from playwright.sync_api import Page, TimeoutError as PlaywrightTimeoutError
+from service import js_bundle
+from service.cart_service import CartService
+from service.wait_service import WaitService, CART_RENDERED_JS
+from components.locators import PageComponent, css
+from components.product.product_snapshot import (SNAPSHOT_LOCATORS, ProductSnapshot, SnapshotCache,
+                                                 nearest_enabled)
 
-class ProductPage:
+class ProductPage(PageComponent):
     """Component representing a product detail page"""
-    
+    __slots__ = ('waits', '_cache')
+
+    # Product details selectors
+    product_name = css('.page-title span.base')
+    product_price = css('.price-box .price-wrapper .price')
+    product_sku = css('.product.attribute.sku .value')
+    product_description = css('.product.attribute.description .value')
+    product_stock_status = css('.stock.available')
+    stock_status = css('.product-info-stock-sku .stock')
+
+    # Product ratings
+    product_rating = css('.rating-result')
+    reviews_count = css('.reviews-actions .action.view span:first-child')
+
+    # Size options
+    size_attribute = css('.swatch-attribute.size')
+    size_options = css('.swatch-attribute.size .swatch-option.text')
+
+    # Color options
+    color_attribute = css('.swatch-attribute.color')
+    color_options = css('.swatch-attribute.color .swatch-option.color')
+
+    # Quantity
+    quantity_input = css('#qty')
+
+    # Add to cart button
+    add_to_cart_button = css('#product-addtocart-button')
+
+    # Success message
+    success_message = css('.message-success')
+
+    # Cart elements
+    cart_icon = css('.action.showcart')
+    cart_counter = css('.counter-number')
+    minicart = css('.block-minicart')
+    minicart_wrapper = css('#minicart-content-wrapper')
+    proceed_to_checkout = css('#top-cart-btn-checkout')
+    cart_items = css('#mini-cart .item.product.product-item')
+    cart_item_remove_buttons = css('.product.actions .secondary .action.delete')
+    cart_empty_message = css('.subtitle.empty')
+    view_and_edit_cart = css('.action.viewcart')
+    minicart_close_button = css('#btn-minicart-close')
+    cart_subtotal = css('.subtotal .price-container .price')
+    cart_items_count_text = css('.items-total .count')
+
+    # Wishlist and compare
+    add_to_wishlist = css('.action.towishlist')
+    add_to_compare = css('.action.tocompare')
+
+    # Product tabs
+    details_tab = css('#tab-label-description')
+    more_info_tab = css('#tab-label-additional')
+    reviews_tab = css('#tab-label-reviews')
+
     def __init__(self, page: Page):
-        self.page = page
-        
-        # Product details selectors
-        self.product_name = page.locator('.page-title span.base')
-        self.product_price = page.locator('.price-box .price-wrapper .price')
-        self.product_sku = page.locator('.product.attribute.sku .value')
-        self.product_description = page.locator('.product.attribute.description .value')
-        self.product_stock_status = page.locator('.stock.available')
-        
-        # Product ratings
-        self.product_rating = page.locator('.rating-result')
-        self.reviews_count = page.locator('.reviews-actions .action.view span:first-child')
-        
-        # Size options
-        self.size_attribute = page.locator('.swatch-attribute.size')  
-        self.size_options = page.locator('.swatch-attribute.size .swatch-option.text')
-        
-        # Color options
-        self.color_attribute = page.locator('.swatch-attribute.color')
-        self.color_options = page.locator('.swatch-attribute.color .swatch-option.color')
-        
-        # Quantity
-        self.quantity_input = page.locator('#qty')
-        
-        # Add to cart button
-        self.add_to_cart_button = page.locator('#product-addtocart-button')
-        
-        # Success message
-        self.success_message = page.locator('.message-success')
-        
-        # Cart elements
-        self.cart_icon = page.locator('.action.showcart')
-        self.cart_counter = page.locator('.counter-number')
-        self.minicart = page.locator('.block-minicart')
-        self.minicart_wrapper = page.locator('#minicart-content-wrapper')
-        self.proceed_to_checkout = page.locator('#top-cart-btn-checkout')
-        self.cart_items = page.locator('#mini-cart .item.product.product-item')
-        self.cart_item_remove_buttons = page.locator('.product.actions .secondary .action.delete')
-        self.cart_empty_message = page.locator('.subtitle.empty')
-        self.view_and_edit_cart = page.locator('.action.viewcart')
-        self.minicart_close_button = page.locator('#btn-minicart-close')
-        self.cart_subtotal = page.locator('.subtotal .price-container .price')
-        self.cart_items_count_text = page.locator('.items-total .count')
-        
-        # Wishlist and compare
-        self.add_to_wishlist = page.locator('.action.towishlist')
-        self.add_to_compare = page.locator('.action.tocompare')
-        
-        # Product tabs
-        self.details_tab = page.locator('#tab-label-description')
-        self.more_info_tab = page.locator('#tab-label-additional')
-        self.reviews_tab = page.locator('#tab-label-reviews')
+        super().__init__(page)
+        self.waits = WaitService.for_page(page)
+        self._cache = SnapshotCache.for_page(page)
         
+    def navigate(self, url: str):
+        """Open a product page directly, e.g. a CatalogProduct.url from the catalog index"""
+        self.page.goto(url, wait_until='domcontentloaded')
+
+    def snapshot(self, refresh: bool = False, timeout: float = 10000) -> ProductSnapshot:
+        """Name, price, SKU, stock, swatches, quantity and cart counter from one evaluate
+
+        Cached until the page navigates or the cart changes (add, remove, qty update or a
+        customer-data reload); selecting a swatch or setting the quantity also drops it.
+        """
+        if refresh or self._cache.snapshot is None or self._cache.snapshot.url != self.page.url:
+            selectors = self.selectors()
+            fields = {field: selectors[name] for field, name in SNAPSHOT_LOCATORS.items()}
+            snapshot = ProductSnapshot.from_js(js_bundle.call(self.page, "product.snapshot", fields, timeout))
+            # Not rendered within the timeout: hand it out, but read again next time
+            self._cache.snapshot = snapshot if snapshot.ready else None
+            return snapshot
+        return self._cache.snapshot
+
     def get_product_name(self) -> str:
         """Get the product name"""
-        return self.product_name.text_content().strip()
+        return self.snapshot().name
     
     def get_product_price(self) -> str:
         """Get the product price"""
-        return self.product_price.text_content().strip()
+        return self.snapshot().price
+
+    def _select_swatch(self, options, kind: str, index: int) -> Optional[int]:
+        swatches = getattr(self.snapshot(), kind)
+        chosen = nearest_enabled(swatches, index)
+        if chosen is None:
+            print(f"No enabled {kind} swatch to select")
+            return None
+        if chosen != index:
+            state = "disabled" if index < len(swatches) else "missing"
+            print(f"{kind} swatch {index} is {state}, selecting {chosen} ({swatches[chosen].label}) instead")
+        options.nth(chosen).click()
+        self._cache.snapshot = None
+        return chosen
     
-    def select_size(self, size_index: int = 0):
-        """Select a size option by index"""
-        self.size_options.nth(size_index).click()
+    def select_size(self, size_index: int = 0) -> Optional[int]:
+        """Select a size option by index, or the nearest enabled one if it is missing or disabled
+
+        Returns the index selected, or None when the product has no enabled size.
+        """
+        return self._select_swatch(self.size_options, "sizes", size_index)
         
-    def select_color(self, color_index: int = 0):
-        """Select a color option by index"""
-        self.color_options.nth(color_index).click()
+    def select_color(self, color_index: int = 0) -> Optional[int]:
+        """Select a color option by index, or the nearest enabled one if it is missing or disabled
+
+        Returns the index selected, or None when the product has no enabled color.
+        """
+        return self._select_swatch(self.color_options, "colors", color_index)
         
     def set_quantity(self, quantity: int = 1):
         """Set the product quantity"""
         self.quantity_input.fill(str(quantity))
+        self._cache.snapshot = None
         
     def add_to_cart(self):
         """Add the product to cart"""
         self.add_to_cart_button.click()
         # Wait for success message
         self.success_message.wait_for(state='visible', timeout=10000)
+        self._cache.snapshot = None
         
     def is_added_to_cart(self) -> bool:
         """Check if product was added to cart successfully"""
@@ -89,8 +140,7 @@ class ProductPage:
     
     def get_cart_count(self) -> int:
         """Get the number of items in cart"""
-        count_text = self.cart_counter.text_content().strip()
-        return int(count_text) if count_text.isdigit() else 0
+        return self.snapshot().cart_count
     
     def proceed_to_checkout_from_minicart(self):
         """Open mini cart and proceed to checkout"""
@@ -98,84 +148,28 @@ class ProductPage:
         self.proceed_to_checkout.wait_for(state='visible', timeout=5000)
         self.proceed_to_checkout.click()
         
-    def open_minicart(self):
-        """Open the mini cart using a more reliable approach"""
-        # The minicart has ID ui-id-1 and class block-minicart
-        # We'll try a different approach to open it
-        
-        max_attempts = 3
-        for attempt in range(max_attempts):
-            try:
-                # First make sure we're at the top of the page
-                self.page.evaluate("window.scrollTo(0, 0)")
-                self.page.wait_for_timeout(300)  # Short pause
-                
-                # Hover over the cart icon first to make it more reliable
-                self.cart_icon.hover()
-                self.page.wait_for_timeout(300)  # Short pause
-                
-                # Click the cart icon
-                self.cart_icon.click()
-                
-                # Wait a moment for any animations to start
-                self.page.wait_for_timeout(500)
-                
-                # Check if the minicart is visible by evaluating its display property
-                is_visible = self.page.evaluate("""
-                    () => {
-                        const minicart = document.querySelector('#ui-id-1');
-                        if (!minicart) return false;
-                        
-                        const style = window.getComputedStyle(minicart);
-                        return style.display !== 'none' && style.visibility !== 'hidden';
-                    }
-                """)
-                
-                if is_visible:
-                    # Success! Wait a moment to ensure it's fully loaded
-                    self.page.wait_for_timeout(500)
-                    return
-                    
-                # If not visible, try clicking again
-                print(f"Attempt {attempt+1}: Minicart not visible after click, trying again")
-                
-            except Exception as e:
-                print(f"Attempt {attempt+1} failed: {str(e)}")
-            
-            # Wait before next attempt
-            self.page.wait_for_timeout(500)
-        
-        # If we get here, all attempts failed
-        # As a last resort, try using JavaScript to show the minicart
-        try:
-            self.page.evaluate("""
-                () => {
-                    const minicart = document.querySelector('#ui-id-1');
-                    if (minicart) {
-                        minicart.style.display = 'block';
-                        minicart.style.visibility = 'visible';
-                    }
-                }
-            """)
-            self.page.wait_for_timeout(500)
-            print("Used JavaScript to force minicart visibility")
-        except Exception as e:
-            print(f"Failed to force minicart visibility: {str(e)}")
-            raise Exception("Failed to open minicart after multiple attempts")
+    def open_minicart(self) -> dict:
+        """Open the mini cart and return its state once the dropdown is shown
+
+        The click waits until the minicart widget and its customer-data content are rendered,
+        so it cannot be lost on a half-initialised page, and it is skipped if the dropdown is
+        already open (clicking again would close it).
+        """
+        state = self.waits.minicart(ready=True, name="minicart:ready")
+        if not state["open"]:
+            self.cart_icon.click()
+            state = self.waits.minicart(open=True, name="minicart:open", timeout=5000)
+        return state
         
     def get_cart_items_count(self) -> int:
         """Get the number of items in the mini cart"""
-        self.open_minicart()
-        return self.cart_items.count()
+        return self.open_minicart()["count"]
         
     def remove_item_from_cart(self, item_index: int = 0):
         """Remove an item from the cart by index"""
         try:
             # Try to open the minicart
-            self.open_minicart()
-            
-            # Get the number of items before removal
-            items_before = self.cart_items.count()
+            items_before = self.open_minicart()["count"]
             
             # Make sure we have items to remove
             if items_before == 0:
@@ -187,98 +181,81 @@ class ProductPage:
                 print(f"Invalid item index {item_index}, only {items_before} items in cart")
                 return
             
-            # Ensure the minicart is still open
-            if not self.page.evaluate("() => document.querySelector('#ui-id-1').style.display !== 'none'"):
-                print("Minicart closed unexpectedly, reopening...")
-                self.open_minicart()
-            
-            # Click the delete button for the specified item using JavaScript
-            # This is more reliable than using Playwright's click
+            # Click the delete button in the page; this is more reliable than Playwright's click
+            # on a dropdown that may be scrolled out of view
             try:
-                # Get the delete button for the item at the specified index
-                self.page.evaluate(f"""
-                    () => {{
-                        const items = document.querySelectorAll('#mini-cart .item.product.product-item');
-                        if (items.length <= {item_index}) return false;
-                        
-                        const deleteButton = items[{item_index}].querySelector('.action.delete');
-                        if (deleteButton) {{
-                            deleteButton.click();
-                            return true;
-                        }}
-                        return false;
-                    }}
-                """)
+                js_bundle.call(self.page, "cart.remove", item_index)
                 
                 # Wait for the confirmation dialog
-                self.page.wait_for_timeout(1000)
-                
-                # Check if the confirmation dialog is visible
-                dialog_visible = self.page.wait_for_selector('.modal-popup.confirm._show', timeout=3000, state='visible')
+                try:
+                    dialog_visible = self.waits.selector('.modal-popup.confirm._show', timeout=3000,
+                                                         name="cart:confirm-dialog")
+                except PlaywrightTimeoutError:
+                    dialog_visible = None
                 
-                if dialog_visible:
-                    # Make sure the OK button is in view and click it using JavaScript
-                    # This avoids the "element is outside of viewport" error
-                    self.page.evaluate("""
-                        () => {
-                            const okButton = document.querySelector('.action-primary.action-accept');
-                            if (okButton) {
-                                // Scroll to make sure it's in view
-                                okButton.scrollIntoView({behavior: 'smooth', block: 'center'});
-                                // Wait a moment for the scroll to complete
-                                setTimeout(() => {
-                                    okButton.click();
-                                }, 300);
-                                return true;
-                            }
-                            return false;
-                        }
-                    """)
-                    
-                    # Wait for the removal to complete
-                    self.page.wait_for_timeout(2000)
-                else:
-                    print("Confirmation dialog not found, trying alternative approach")
-                    # Sometimes the site auto-confirms without showing the dialog
-                    self.page.wait_for_timeout(2000)
+                # Removing posts to checkout/sidebar/removeItem, after which Magento reloads
+                # the cart customer-data section and re-renders the minicart
+                with self.waits.customer_data('cart', name="cart:reload-after-remove"):
+                    if dialog_visible:
+                        # Make sure the OK button is in view and click it using JavaScript
+                        # This avoids the "element is outside of viewport" error
+                        with self.waits.endpoint('cart_remove'):
+                            js_bundle.call(self.page, "cart.confirm")
+                    else:
+                        # Sometimes the site auto-confirms without showing the dialog
+                        print("Confirmation dialog not found, waiting for the cart to reload")
                 
-                # Verify the item was removed
-                # Reopen the minicart to get fresh data
-                self.page.reload()  # Reload the page to ensure we get the latest cart state
-                self.page.wait_for_load_state('networkidle')
-                self.open_minicart()
+                # Verify the item was removed from the re-rendered minicart
+                try:
+                    state = self.waits.minicart(count__lt=items_before, name="cart:item-removed", timeout=5000)
+                except PlaywrightTimeoutError:
+                    # Fall back to a fresh page to read the latest cart state
+                    self.reload_with_cart()
+                    state = self.open_minicart()
                 
                 # Get updated count
-                items_after = self.cart_items.count()
+                items_after = state["count"]
                 print(f"Items before: {items_before}, Items after: {items_after}")
                 
-                # If item wasn't removed, try one more time with a different approach
                 if items_after >= items_before:
-                    print("Item not removed, trying alternative approach")
-                    # Try direct API call or another method if available
-                    # For now, just report the issue
                     print("Warning: Failed to remove item from cart")
                 
             except Exception as e:
                 print(f"Error during item removal: {str(e)}")
-                self.page.wait_for_timeout(1000)
                 
         except Exception as e:
             print(f"Error removing item from cart: {str(e)}")
-            # Try to recover
-            self.page.wait_for_timeout(1000)
         
-    def remove_all_items_from_cart(self):
-        """Remove all items from the cart"""
-        self.open_minicart()
-        # Get the number of items
-        item_count = self.cart_items.count()
-        # Remove each item one by one
-        for i in range(item_count):
-            # Always remove the first item since the list shifts after each removal
-            self.remove_item_from_cart(0)
+    def remove_all_items_from_cart(self, storefront_url: str):
+        """Empty the cart in one request and re-render the minicart from customer data
+
+        `storefront_url` is the configured base URL, which may carry a path the page URL does not reveal.
+        """
+        CartService(self.page.context, storefront_url).reset()
+        self.reload_with_cart()
+        
+    def reload_with_cart(self):
+        """Reload the page and wait until the minicart is rendered from customer data"""
+        self.page.reload(wait_until='domcontentloaded')
+        self.waits.until(CART_RENDERED_JS, name="cart:rendered")
+
+    def wait_for_cart_count(self, expected: int = None, minimum: int = None, timeout: float = 10000) -> int:
+        """Wait until the header cart counter equals `expected` (or reaches `minimum`) and return it
+
+        A hidden or empty counter counts as 0.
+        """
+        result = self.waits.until("""
+            ([expected, minimum]) => {
+                const counter = document.querySelector('.counter-number');
+                const count = counter ? (parseInt(counter.textContent.trim(), 10) || 0) : 0;
+                const done = expected !== null ? count === expected : count >= minimum;
+                return done ? {count} : false;
+            }
+        """, arg=[expected, minimum if minimum is not None else 1], name="cart:counter", timeout=timeout)
+        # The counter just settled; the next snapshot should see it
+        self._cache.snapshot = None
+        return result["count"]
             
     def is_cart_empty(self) -> bool:
         """Check if the cart is empty"""
-        self.open_minicart()
-        return self.cart_empty_message.is_visible()
+        return self.open_minicart()["empty"]
@@ -0,0 +1,106 @@
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+from service.wait_service import MAGENTO_ENDPOINTS
+
+# Snapshot field -> ProductPage locator it is read from, passed to the bundle's product.snapshot
+SNAPSHOT_LOCATORS = {
+    "name": "product_name",
+    "price": "product_price",
+    "sku": "product_sku",
+    "stock": "stock_status",
+    "sizes": "size_options",
+    "colors": "color_options",
+    "quantity": "quantity_input",
+    "cart_count": "cart_counter",
+}
+
+# Responses after which the cart counter (and so any snapshot) may be out of date
+CART_CHANGE_URLS = tuple(MAGENTO_ENDPOINTS[action][0] for action in
+                         ("customer_data", "cart_add", "cart_remove", "cart_update_qty"))
+CART_CHANGE_URLS += ("checkout/cart/updatePost",)
+
+
+@dataclass(frozen=True, slots=True)
+class Swatch:
+    index: int
+    option_id: Optional[str]
+    label: Optional[str]
+    enabled: bool
+    selected: bool
+
+
+def nearest_enabled(swatches: Tuple[Swatch, ...], index: int) -> Optional[int]:
+    """`index` if that swatch exists and is enabled, else the closest enabled one (lower wins a tie)"""
+    enabled = [s.index for s in swatches if s.enabled]
+    if not enabled:
+        return None
+    return min(enabled, key=lambda i: (abs(i - index), i))
+
+
+@dataclass(frozen=True, slots=True)
+class ProductSnapshot:
+    """Everything the product view shows that tests read, taken in one browser round trip"""
+    url: str
+    ready: bool
+    name: Optional[str]
+    price: Optional[str]
+    sku: Optional[str]
+    stock: Optional[str]
+    sizes: Tuple[Swatch, ...]
+    colors: Tuple[Swatch, ...]
+    quantity: Optional[int]
+    cart_count: int
+
+    @property
+    def in_stock(self) -> bool:
+        return self.stock is not None and self.stock.lower() == "in stock"
+
+    @classmethod
+    def from_js(cls, data: Dict) -> "ProductSnapshot":
+        return cls(
+            url=data["url"],
+            ready=data["ready"],
+            name=data["name"],
+            price=data["price"],
+            sku=data["sku"],
+            stock=data["stock"],
+            sizes=tuple(Swatch(**s) for s in data["sizes"]),
+            colors=tuple(Swatch(**s) for s in data["colors"]),
+            quantity=data["quantity"],
+            cart_count=data["cart_count"],
+        )
+
+
+class SnapshotCache:
+    """
+    The cached ProductSnapshot of one page, shared by every product page object on it.
+
+    Use `SnapshotCache.for_page(page)`: the framenavigated/response listeners that drop
+    the snapshot are added once per page, not once per page object. The cache keeps no
+    reference to the page, so the page can still be collected once it is closed.
+    """
+
+    _instances: "WeakKeyDictionary[object, SnapshotCache]" = WeakKeyDictionary()
+
+    def __init__(self, page):
+        self.snapshot: Optional[ProductSnapshot] = None
+        page.on('framenavigated', self._on_navigated)
+        page.on('response', self._on_response)
+
+    @classmethod
+    def for_page(cls, page) -> "SnapshotCache":
+        cache = cls._instances.get(page)
+        if cache is None:
+            cache = cls(page)
+            cls._instances[page] = cache
+        return cache
+
+    def _on_navigated(self, frame):
+        if frame.parent_frame is None:
+            self.snapshot = None
+
+    def _on_response(self, response):
+        if any(part in response.url for part in CART_CHANGE_URLS):
+            self.snapshot = None
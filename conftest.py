@@ -0,0 +1,3 @@
+# Register the project fixtures as a plugin so they take precedence over pytest-playwright's
+# built-in page/context/browser fixtures for every test, not only the ones that import them.
+pytest_plugins = ["fixtures.pw_fixture", "fixtures.async_pw_fixture"]
@@ -1,4 +1,5 @@
-from fixtures.pw_fixture import homepage, product_page, checkout_page, orders_returns_page, csv_service, pytest
+from fixtures.pw_fixture import (homepage, product_page, checkout_page, orders_returns_page, csv_service, guest_order,
+                                 pytest)
 
 @pytest.mark.orders
 class TestOrdersReturns:
@@ -24,7 +25,8 @@ class TestOrdersReturns:
         # Verify that an error message is displayed
         assert orders_returns_page.has_error_message(), "Error message should be displayed for invalid order details"
         error_message = orders_returns_page.get_error_message()
-        assert "incorrect data" in error_message.lower(), f"Error message should indicate incorrect data, got: {error_message}"
+        assert "incorrect data" in error_message.lower(), \
+            f"Error message should indicate incorrect data, got: {error_message}"
     
     @pytest.mark.returns
     def test_switch_between_email_and_zip(self, homepage, orders_returns_page):
@@ -51,7 +53,8 @@ class TestOrdersReturns:
         
         # Verify email field is visible again and ZIP field is hidden
         assert orders_returns_page.email_field.is_visible(), "Email field should be visible after switching back"
-        assert not orders_returns_page.zip_field.is_visible(), "ZIP field should not be visible after switching back to email"
+        assert not orders_returns_page.zip_field.is_visible(), \
+            "ZIP field should not be visible after switching back to email"
     
     @pytest.mark.returns
     def test_search_order_with_zip(self, homepage, orders_returns_page):
@@ -74,80 +77,19 @@ class TestOrdersReturns:
         assert orders_returns_page.has_error_message(), "Error message should be displayed for invalid order details"
     
     @pytest.mark.integration
-    def test_order_lookup_after_checkout(self, homepage, product_page, checkout_page, orders_returns_page, csv_service):
-        """Test looking up an order after completing checkout"""
-        # First complete a checkout to get a real order number
-        # Add a product to cart
-        search_term = csv_service.get_random_search_term("sample_test_data.csv")
-        homepage.search_with_fallback(search_term)
-        
-        # Verify we have search results
-        assert homepage.has_search_results(), "Should have search results after fallback search"
-        
-        # Get and click on the first product
-        product = homepage.get_first_product()
-        product["link"].click()
-        
-        # Select size and color
-        product_page.select_size(2)
-        product_page.select_color(2)
-        
-        # Set quantity and add to cart
-        product_page.set_quantity(1)
-        product_page.add_to_cart()
-        
-        # Verify product was added to cart
-        assert product_page.is_added_to_cart(), "Product should be added to cart"
-        
-        # Proceed to checkout
-        product_page.cart_icon.click()
-        product_page.proceed_to_checkout.wait_for(state='visible', timeout=5000)
-        product_page.proceed_to_checkout.click()
-        
-        # Wait for shipping form to be visible
-        checkout_page.email_input.wait_for(state='visible', timeout=10000)
-        
-        # Fill in shipping information
-        checkout_page.fill_shipping_information(
-            email="test@example.com",
-            first_name="Test",
-            last_name="User",
-            street="123 Test St",
-            city="Test City",
-            region_id="1",  # Alabama
-            zip_code="12345",
-            country_id="US",
-            phone="1234567890"
-        )
-        
-        # Select shipping method
-        checkout_page.shipping_methods.first.click()
-        
-        # Proceed to payment
-        checkout_page.next_button.click()
-        
-        # Place order
-        checkout_page.place_order_button.click()
-        
-        # Wait for success message
-        checkout_page.order_success_message.wait_for(state='visible', timeout=20000)
-        
-        # Verify order was placed successfully
-        assert checkout_page.is_order_successful(), "Order should be placed successfully"
-        
-        # Get order number
-        order_number = checkout_page.get_order_number()
-        assert order_number, "Order number should be present"
-        print(f"Order successfully placed with order number: {order_number}")
+    def test_order_lookup_after_checkout(self, homepage, orders_returns_page, guest_order):
+        """Test looking up an order placed earlier by a guest"""
+        # The order comes from the pool pre-created over HTTP, so no checkout runs here
+        order_number = guest_order["order_id"]
         
-        # Now navigate to the Orders and Returns page to look up the order
+        # Navigate to the Orders and Returns page to look up the order
         orders_returns_page.navigate()
         
-        # Search for the order we just created
+        # Search for the order
         orders_returns_page.search_order(
             order_id=order_number,
-            billing_lastname="User",
-            email_or_zip="test@example.com",
+            billing_lastname=guest_order["lastname"],
+            email_or_zip=guest_order["email"],
             find_by="email"
         )
         # Check if there's an error message (which can happen on test sites)  
@@ -166,7 +108,8 @@ class TestOrdersReturns:
         # Verify the order number matches what we expect
         displayed_order_number = orders_returns_page.get_order_number()
         print(f"Displayed order number: {displayed_order_number}")
-        assert order_number in displayed_order_number, f"Order number should be {order_number}, but got {displayed_order_number}"
+        assert order_number in displayed_order_number, \
+            f"Order number should be {order_number}, but got {displayed_order_number}"
         
         # Verify the order status is displayed
         order_status = orders_returns_page.get_order_status()
@@ -192,5 +135,5 @@ class TestOrdersReturns:
         # This is a more comprehensive check than just checking the URL
         assert orders_returns_page.verify_order_details(
             expected_order_id=order_number,
-            expected_email="test@example.com"
+            expected_email=guest_order["email"]
         ), "Order details should match the expected order ID and email"
\ No newline at end of file
@@ -0,0 +1,104 @@
+import pytest_asyncio
+from playwright.async_api import async_playwright
+from components.home.async_homepage import AsyncHomePage
+from components.product.async_product_page import AsyncProductPage
+from components.checkout.async_checkout_page import AsyncCheckoutPage
+from components.orders.async_orders_returns import AsyncOrdersReturnsPage
+from fixtures.pw_fixture import _option, _headless, _networkidle_fallback, _route_policy, _har_setup, _har_teardown
+from service.har_store import REPLAY
+from service import js_bundle
+from service.browser_pool import AsyncBrowserPool
+from service.cart_service import AsyncCartService
+from service.wait_service import AsyncWaitService
+
+# Async twin of the fixture stack in pw_fixture.py. Everything shares the session event loop
+# (see asyncio_default_*_loop_scope in pytest.ini), so one worker can drive many pages at once
+# with asyncio.gather instead of one page at a time.
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def async_playwright_instance():
+    async with async_playwright() as p:
+        yield p
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def async_browser_pool(async_playwright_instance, pytestconfig, browser_server_farm):
+    pool = AsyncBrowserPool(
+        async_playwright_instance,
+        headless=_headless(pytestconfig),
+        slow_mo=int(_option(pytestconfig, "slowmo")),
+        max_tests=int(_option(pytestconfig, "pool_max_tests")),
+        max_rss_mb=int(_option(pytestconfig, "pool_max_rss_mb")),
+        endpoints=browser_server_farm,
+    )
+    yield pool
+    await pool.aclose()
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def async_context(async_browser_pool, browser_type, storage_state, har_store, request):
+    context_args = {}
+    if storage_state:
+        context_args["storage_state"] = storage_state
+    har_mode, har_path = _har_setup(request, har_store, context_args)
+    context = await async_browser_pool.new_context(browser_type, **context_args)
+    await js_bundle.install(context)
+    if har_mode == REPLAY:
+        await context.route_from_har(str(har_store.materialize(request.node.nodeid)), not_found="abort")
+    policy = _route_policy(request)
+    route_stats = await policy.apply_async(context) if policy else None
+    yield context
+    await context.close()
+    _har_teardown(request, har_store, har_mode, har_path)
+    if route_stats is not None:
+        request.node.user_properties.append(("routing", route_stats.to_dict()))
+    await async_browser_pool.release(context)
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def async_page(async_context, request, pytestconfig):
+    page = await async_context.new_page()
+    AsyncWaitService.for_page(page).networkidle_fallback = _networkidle_fallback(pytestconfig)
+    yield page
+    waits = AsyncWaitService.for_page(page)
+    if waits.records:
+        request.node.user_properties.append(("waits", waits.report()))
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def async_page_factory(async_browser_pool, browser_type):
+    """Returns a coroutine that opens an extra page in its own isolated context"""
+    contexts = []
+
+    async def new_page():
+        context = await async_browser_pool.new_context(browser_type)
+        contexts.append(context)
+        return await context.new_page()
+
+    yield new_page
+    for context in contexts:
+        await context.close()
+        await async_browser_pool.release(context)
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def async_homepage(async_page, storefront_url):
+    await async_page.goto(storefront_url)
+    home = AsyncHomePage(async_page)
+    await home.wait_until_ready()
+    return home
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def async_product_page(async_homepage):
+    return AsyncProductPage(async_homepage.page)
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def async_cart_service(async_context, storefront_url):
+    return AsyncCartService(async_context, storefront_url)
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def async_reset_cart(async_cart_service):
+    await async_cart_service.reset()
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def async_checkout_page(async_homepage):
+    return AsyncCheckoutPage(async_homepage.page)
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def async_orders_returns_page(async_homepage):
+    return AsyncOrdersReturnsPage(async_homepage.page)
@@ -1,54 +1,283 @@
+import importlib.util
+import os
+from pathlib import Path
+from typing import Optional
 import pytest
 from playwright.sync_api import sync_playwright
+from components.account.login_page import LoginPage
 from components.home.homepage import HomePage
 from components.product.product_page import ProductPage
 from components.checkout.checkout_page import CheckoutPage
 from components.orders.orders_returns import OrdersReturnsPage
+from service.browser_pool import BrowserPool
+from service.browser_server import BrowserServerFarm
+from service.cart_service import CartService
+from service.catalog_index import CatalogIndex, default_crawler
 from service.csv_service import CSVService
+from service.customer_factory import CustomerPool
+from service.data_shards import parse_shard, row_index
+from service.route_policy import RoutePolicy
 from service.email_service import EmailService
+from service.har_store import HarStore, RECORD, REPLAY
+from service import js_bundle
+from service.magento_stub import MagentoStubServer
+from service.order_factory import GuestOrderFactory, GuestOrderPool
+from service.storage_state_cache import StorageStateCache, account_key
+from service.wait_service import WaitService
+from service.wait_profiler import WaitProfiler
 
 BROWSERS = ["chromium", "firefox", "webkit"]
 
-# Parametrize browser_type so tests run in all browsers unless --browser is specified
+
+def _load_playwright_config():
+    # playwright.config.py is not an importable module name, so load it from its path
+    config_path = Path(__file__).parent.parent / "playwright.config.py"
+    spec = importlib.util.spec_from_file_location("playwright_config", config_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+PW_CONFIG = _load_playwright_config()
+BROWSER_ALIASES = PW_CONFIG.BROWSER_ALIASES
+
+
+def pytest_addoption(parser):
+    # playwright.config.py is loaded from its path, never as a plugin, so its hooks are wired up here
+    PW_CONFIG.pytest_addoption(parser)
+
+
+def pytest_configure(config):
+    PW_CONFIG.pytest_configure(config)
+
+
+def _option(pytestconfig, name):
+    """A playwright.config.py option; its default is the matching PLAYWRIGHT_* environment variable"""
+    return pytestconfig.getoption(name)
+
 @pytest.fixture(scope="session")
 def browser_types(pytestconfig):
-    cli_browser = pytestconfig.getoption("browser")
-    if cli_browser and cli_browser in BROWSERS:
-        return [cli_browser]
-    return BROWSERS
+    """Browser types this run uses: pytest-playwright's --browser values (BROWSER when none is given)"""
+    selected = pytestconfig.getoption("browser") or [PW_CONFIG.default_browser()]
+    return [BROWSER_ALIASES.get(b, b) for b in selected]
 
-@pytest.fixture(params=BROWSERS, scope="session")
-def browser_type(request, browser_types):
-    # Only parametrize over the selected browsers
-    if request.param in browser_types:
-        return request.param
-    pytest.skip(f"Skipping {request.param} as it's not selected.")
+@pytest.fixture(scope="session")
+def browser_type(browser_name):
+    # pytest-playwright parametrizes browser_name from --browser, so the test ids stay [chromium], ...
+    return BROWSER_ALIASES.get(browser_name, browser_name)
 
-@pytest.fixture
-def page(browser_type):
+@pytest.fixture(scope="session")
+def playwright():
     with sync_playwright() as p:
-        browser = getattr(p, browser_type).launch(headless=False)
-        context = browser.new_context()
-        page = context.new_page()
-        # page.wait_for_load_state("networkidle")
-        yield page
-        context.close()
-        browser.close()
+        yield p
 
-@pytest.fixture
-def homepage(page, pytestconfig, autouse=True):
+def _headless(pytestconfig) -> bool:
+    if pytestconfig.getoption("headed", default=False):
+        return False
+    return bool(_option(pytestconfig, "headless"))
+
+def _networkidle_fallback(pytestconfig) -> bool:
+    return _option(pytestconfig, "networkidle_fallback") == "on"
+
+def _route_policy(request) -> Optional[RoutePolicy]:
+    """RoutePolicy for the test's markers, None when routing is off or the test is marked visual"""
+    if _option(request.config, "route_policy") != "on":
+        return None
+    markers = [marker.name for marker in request.node.iter_markers()]
+    return RoutePolicy.for_markers(markers, extra_block_domains=PW_CONFIG.BLOCK_DOMAINS)
+
+@pytest.fixture(scope="session")
+def har_store():
+    return HarStore(PW_CONFIG.HAR_DIR)
+
+def _har_setup(request, har_store, context_args):
+    """Adds HAR recording to `context_args` in record mode; returns (mode, recording path)"""
+    mode = _option(request.config, "har_mode")
+    if mode == RECORD:
+        har_path = har_store.new_recording_dir() / "recording.har"
+        context_args.update(record_har_path=str(har_path), record_har_content="attach")
+        return mode, har_path
+    if mode == REPLAY and not har_store.has(request.node.nodeid):
+        pytest.skip(f"No HAR recorded for {request.node.nodeid}; run it once with --har-mode=record")
+    return mode, None
+
+def _har_teardown(request, har_store, mode, har_path):
+    # The HAR is only written once the context is closed
+    if mode == RECORD:
+        request.node.user_properties.append(("har", har_store.save(request.node.nodeid, har_path)))
+
+@pytest.fixture(scope="session")
+def browser_server_farm(pytestconfig, tmp_path_factory, browser_types):
+    """Websocket endpoints of the node-wide browser servers, or None when the mode is off"""
+    if _option(pytestconfig, "browser_server") != "on":
+        yield None
+        return
+    # Under xdist every worker has its own basetemp; their parent is shared by the whole run
+    state_dir = tmp_path_factory.getbasetemp()
+    if os.getenv("PYTEST_XDIST_WORKER"):
+        state_dir = state_dir.parent
+    farm = BrowserServerFarm(
+        state_dir,
+        instances=int(_option(pytestconfig, "browser_server_instances")),
+        headless=_headless(pytestconfig),
+    )
+    endpoints = farm.attach(browser_types)
+    yield endpoints
+    farm.detach()
+
+@pytest.fixture(scope="session")
+def browser_pool(playwright, pytestconfig, browser_server_farm):
+    # Session scope means one pool per xdist worker; browsers are launched lazily on first use
+    pool = BrowserPool(
+        playwright,
+        headless=_headless(pytestconfig),
+        slow_mo=int(_option(pytestconfig, "slowmo")),
+        max_tests=int(_option(pytestconfig, "pool_max_tests")),
+        max_rss_mb=int(_option(pytestconfig, "pool_max_rss_mb")),
+        endpoints=browser_server_farm,
+    )
+    yield pool
+    pool.close()
+
+@pytest.fixture(scope="session")
+def magento_stub(pytestconfig):
+    """URL of a local Magento stand-in for this worker, or None when --magento-stub is off"""
+    if _option(pytestconfig, "magento_stub") != "on":
+        yield None
+        return
+    server = MagentoStubServer()
+    yield server.start()
+    server.stop()
+
+@pytest.fixture(scope="session")
+def storefront_url(pytestconfig, magento_stub):
+    if magento_stub:
+        return magento_stub
     base_url = pytestconfig.getoption('base_url') or pytestconfig.getini('base_url')
     if not base_url:
         raise RuntimeError("base_url is not set in pytest or playwright config.")
-    page.goto(base_url)
-    page.wait_for_timeout(1000)
+    return base_url
+
+@pytest.fixture(scope="session")
+def storage_state_cache():
+    return StorageStateCache(PW_CONFIG.AUTH_STATE_DIR, ttl_seconds=PW_CONFIG.AUTH_STATE_TTL)
+
+def _account_credentials(account: str, magento_stub: Optional[str] = None):
+    # "default" reads ACCOUNT_EMAIL/ACCOUNT_PASSWORD, any other name ACCOUNT_<NAME>_EMAIL/...
+    prefix = "ACCOUNT" if account == "default" else f"ACCOUNT_{account.upper()}"
+    email = os.getenv(f"{prefix}_EMAIL")
+    password = os.getenv(f"{prefix}_PASSWORD")
+    if (not email or not password) and magento_stub:
+        # The stand-in signs in any email with any password
+        return f"{account}.customer@example.com", "stub-password"
+    if not email or not password:
+        pytest.skip(f"No credentials configured for account '{account}' ({prefix}_EMAIL/{prefix}_PASSWORD)")
+    return email, password
+
+def _signed_in_account(request):
+    """Account name from @pytest.mark.signed_in, or None for anonymous tests"""
+    marker = request.node.get_closest_marker("signed_in")
+    if marker is None:
+        return None
+    return marker.args[0] if marker.args else "default"
+
+@pytest.fixture
+def account_credentials(request, magento_stub):
+    """(email, password) of the @pytest.mark.signed_in account, e.g. for CheckoutPage.login_during_checkout"""
+    account = _signed_in_account(request)
+    if account is None:
+        pytest.fail("account_credentials needs a @pytest.mark.signed_in test")
+    return _account_credentials(account, magento_stub)
+
+@pytest.fixture
+def storage_state(request, storage_state_cache, browser_type, storefront_url, magento_stub):
+    """Path of the cached signed-in state for tests marked with @pytest.mark.signed_in, else None"""
+    account = _signed_in_account(request)
+    if account is None:
+        return None
+    email, password = _account_credentials(account, magento_stub)
+
+    def login(path):
+        # Only resolved for signed-in tests so anonymous async tests never start the sync stack
+        browser_pool = request.getfixturevalue("browser_pool")
+        login_context = browser_pool.new_context(browser_type)
+        try:
+            login_page = LoginPage(login_context.new_page())
+            login_page.navigate(storefront_url)
+            login_page.login(email, password)
+            login_context.storage_state(path=path)
+        finally:
+            login_context.close()
+            browser_pool.release(login_context)
+
+    return storage_state_cache.get(account_key(email, storefront_url), login)
+
+@pytest.fixture
+def context(browser_pool, browser_type, storage_state, har_store, request):
+    context_args = {}
+    if storage_state:
+        context_args["storage_state"] = storage_state
+    har_mode, har_path = _har_setup(request, har_store, context_args)
+    context = browser_pool.new_context(browser_type, **context_args)
+    # Page objects call the __taf helpers by name; every document gets them up front
+    js_bundle.install(context)
+    if har_mode == REPLAY:
+        # Unmatched requests are aborted, so a replayed test never touches the network
+        context.route_from_har(str(har_store.materialize(request.node.nodeid)), not_found="abort")
+    policy = _route_policy(request)
+    route_stats = policy.apply(context) if policy else None
+    yield context
+    context.close()
+    _har_teardown(request, har_store, har_mode, har_path)
+    if route_stats is not None:
+        request.node.user_properties.append(("routing", route_stats.to_dict()))
+    browser_pool.release(context)
+
+@pytest.fixture
+def page(context, request, pytestconfig):
+    page = context.new_page()
+    WaitService.for_page(page).networkidle_fallback = _networkidle_fallback(pytestconfig)
+    # page.wait_for_load_state("networkidle")
+    yield page
+    # Per-wait durations end up in the JSON report next to the test
+    waits = WaitService.for_page(page)
+    if waits.records:
+        request.node.user_properties.append(("waits", waits.report()))
+
+@pytest.fixture
+def homepage(page, storefront_url, autouse=True):
+    page.goto(storefront_url)
     home = HomePage(page)
+    home.wait_until_ready()
     return home
 
 @pytest.fixture
 def csv_service():
     return CSVService()
 
+@pytest.hookimpl(trylast=True)
+def pytest_generate_tests(metafunc):
+    """Parametrize `data_row` from a @pytest.mark.data_rows("file.csv", id_column=...) marker
+
+    Only this node's shard of the file is collected, as LazyRow ids and offsets; see service/data_shards.py.
+    """
+    marker = metafunc.definition.get_closest_marker("data_rows")
+    if marker is None or "data_row" not in metafunc.fixturenames:
+        return
+    shard = parse_shard(_option(metafunc.config, "data_shard"))
+    groups = int(_option(metafunc.config, "data_groups"))
+    index = row_index(*marker.args, shard=shard, groups=groups, **marker.kwargs)
+    params = []
+    for row in index.rows:
+        marks = [pytest.mark.xdist_group(f"{index.path.stem}:{row.group}")] if row.group is not None else []
+        params.append(pytest.param(row, id=row.id, marks=marks))
+    metafunc.parametrize("data_row", params, indirect=True)
+
+@pytest.fixture
+def data_row(request):
+    """The CSV row of a data_rows-parametrized test, read from the file when the test starts"""
+    return request.param.load()
+
 @pytest.fixture
 def email_service():
     return EmailService()
@@ -57,6 +286,67 @@ def email_service():
 def product_page(homepage):
     return ProductPage(homepage.page)
 
+@pytest.fixture
+def cart_service(context, storefront_url):
+    """Adds products over HTTP in the test's own context (shared cookies, same quote)"""
+    return CartService(context, storefront_url)
+
+@pytest.fixture
+def reset_cart(cart_service):
+    """Starts the test with an empty cart; one section request when it already is.
+    Opt a module in with `pytestmark = pytest.mark.usefixtures("reset_cart")`."""
+    cart_service.reset()
+
+@pytest.fixture
+def seeded_cart(reset_cart, cart_service, product_page):
+    """Cart holding the first product from data/cart_products.csv, shown in the open page's minicart"""
+    added = cart_service.seed(CSVService.read_csv("cart_products.csv")[:1])
+    product_page.reload_with_cart()
+    product_page.wait_for_cart_count(minimum=1)
+    return added
+
+@pytest.fixture(scope="session")
+def guest_order_pool(pytestconfig, storefront_url, magento_stub, tmp_path_factory):
+    """(pool, factory) with the pool topped up once per session; workers share it through a file lock"""
+    size = int(_option(pytestconfig, "order_pool_size"))
+    factory = GuestOrderFactory(storefront_url, CSVService.read_csv("cart_products.csv"))
+    # A stand-in's orders die with it, so its pool must not outlive the session
+    pool_dir = tmp_path_factory.mktemp("orders") if magento_stub else PW_CONFIG.ORDER_POOL_DIR
+    pool = GuestOrderPool(pool_dir, storefront_url)
+    pool.refill(factory, size)
+    return pool, factory
+
+@pytest.fixture(scope="session")
+def catalog(pytestconfig, storefront_url, magento_stub, tmp_path_factory):
+    """CatalogIndex of the storefront, crawled once (again when a day old) and shared by workers"""
+    # Same as the order pool: a stand-in's catalog lives only as long as the stand-in
+    if magento_stub:
+        path = tmp_path_factory.mktemp("catalog") / "catalog.sqlite"
+    else:
+        path = Path(_option(pytestconfig, "catalog_index"))
+    index = CatalogIndex(path, storefront_url)
+    index.ensure(default_crawler(storefront_url))
+    return index
+
+@pytest.fixture
+def guest_order(guest_order_pool):
+    """A guest order nobody else has used: {order_id, lastname, email, zip}"""
+    pool, factory = guest_order_pool
+    return pool.take(factory)
+
+@pytest.fixture(scope="session")
+def customer_pool(pytestconfig, tmp_path_factory):
+    """This worker's CustomerPool; its basetemp is its own, so the pool file is too"""
+    batch = int(_option(pytestconfig, "customer_pool_batch"))
+    pool = CustomerPool(tmp_path_factory.getbasetemp() / "customers.bin", batch=batch)
+    yield pool
+    pool.close()
+
+@pytest.fixture
+def customer(customer_pool):
+    """A checkout customer with a unique email and a valid US address: customer.shipping() fills the form"""
+    return customer_pool.take()
+
 @pytest.fixture
 def checkout_page(homepage):
     return CheckoutPage(homepage.page)
@@ -65,8 +355,27 @@ def checkout_page(homepage):
 def orders_returns_page(homepage):
     return OrdersReturnsPage(homepage.page)
 
+@pytest.fixture(scope="session")
+def wait_profiler(pytestconfig):
+    """Session WaitProfiler when --profile/PLAYWRIGHT_PROFILE is on, else None"""
+    if _option(pytestconfig, "profile") != "on":
+        return None
+    WaitProfiler.install()
+    return WaitProfiler(PW_CONFIG.PROFILES_DIR)
+
+@pytest.fixture(autouse=True)
+def profile_test(request, wait_profiler):
+    # Autouse, so it is set up before page fixtures and their navigation is profiled too
+    if wait_profiler is None:
+        yield
+        return
+    wait_profiler.start(request.node.nodeid)
+    yield
+    request.node.user_properties.append(("profile", wait_profiler.stop()))
+    wait_profiler.write_folded()
+
 @pytest.fixture(autouse=True)
-def before_and_after(page, email_service):
+def before_and_after(email_service):
     # Before hook
     print("[Setup]")
     yield
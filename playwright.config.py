@@ -6,6 +6,7 @@ BASE_URL = os.getenv("BASE_URL", "https://magento.softwaretestingboard.com/")
 # Supported browsers: chromium (Chrome/Edge), firefox, webkit (Safari). IE11 is not natively supported by Playwright;
 # for legacy/IE testing, use a cloud/grid provider or Selenium.
 BROWSER = os.getenv("BROWSER", "chromium")  # chromium, chrome, firefox, webkit, safari, edge
+BROWSER_ALIASES = {"chrome": "chromium", "edge": "chromium", "safari": "webkit"}
 HEADLESS = os.getenv("HEADLESS", "true").lower() == "true"
 TIMEOUT = int(os.getenv("PLAYWRIGHT_TIMEOUT", "30000"))  # ms
 RETRIES = int(os.getenv("PLAYWRIGHT_RETRIES", "2"))  # test retries on failure
@@ -14,31 +15,93 @@ TRACE = os.getenv("PLAYWRIGHT_TRACE", "off")  # on, off, retain-on-failure
 VIDEO = os.getenv("PLAYWRIGHT_VIDEO", "off")  # on, off, retain-on-failure
 SCREENSHOT = os.getenv("PLAYWRIGHT_SCREENSHOT", "only-on-failure")  # on, off, only-on-failure
 SLOWMO = int(os.getenv("PLAYWRIGHT_SLOWMO", "0"))  # ms delay
+POOL_MAX_TESTS = int(os.getenv("PLAYWRIGHT_POOL_MAX_TESTS", "50"))  # tests per pooled browser, 0 = never recycle
+POOL_MAX_RSS_MB = int(os.getenv("PLAYWRIGHT_POOL_MAX_RSS_MB", "1024"))  # browser RSS that forces a recycle, 0 = never
+BROWSER_SERVER = os.getenv("PLAYWRIGHT_BROWSER_SERVER", "off")  # on, off: share browser servers across workers
+AUTH_STATE_TTL = int(os.getenv("PLAYWRIGHT_AUTH_STATE_TTL", "3600"))  # seconds a cached login stays valid
+BROWSER_SERVER_INSTANCES = int(os.getenv("PLAYWRIGHT_BROWSER_SERVER_INSTANCES", "2"))  # servers per browser type
+NETWORKIDLE_FALLBACK = os.getenv("PLAYWRIGHT_NETWORKIDLE_FALLBACK", "off")  # on, off: networkidle on endpoint timeout
+ROUTE_POLICY = os.getenv("PLAYWRIGHT_ROUTE_POLICY", "on")  # on, off: block analytics and per-marker resource types
+BLOCK_DOMAINS = [d for d in os.getenv("PLAYWRIGHT_BLOCK_DOMAINS", "").split(",") if d]  # extra hosts to abort
+HAR_MODE = os.getenv("PLAYWRIGHT_HAR_MODE", "off")  # off, record, replay: per-test HAR archives under data/har
+PROFILE = os.getenv("PLAYWRIGHT_PROFILE", "off")  # on, off: per-test sleep/network/selector/act profile
+MAGENTO_STUB = os.getenv("PLAYWRIGHT_MAGENTO_STUB", "off")  # on, off: run against the local storefront stand-in
+ORDER_POOL_SIZE = int(os.getenv("PLAYWRIGHT_ORDER_POOL_SIZE", "4"))  # guest orders pre-created per storefront
+# offline product index
+CATALOG_INDEX = os.getenv("PLAYWRIGHT_CATALOG_INDEX", str(Path(__file__).parent / "data" / "catalog.sqlite"))
+
+DATA_SHARD = os.getenv("PLAYWRIGHT_DATA_SHARD", "")  # i/N: collect only shard i of N of data_rows tests
+CUSTOMER_POOL_BATCH = int(os.getenv("PLAYWRIGHT_CUSTOMER_POOL_BATCH", "1024"))  # checkout customers generated per batch
+DATA_GROUPS = int(os.getenv("PLAYWRIGHT_DATA_GROUPS", "8"))  # xdist_group buckets per data file, 0 = no marks
 
 # Directory paths
 ROOT_DIR = Path(__file__).parent
 DATA_DIR = ROOT_DIR / "data"
 REPORTS_DIR = ROOT_DIR / "reports"
 SCREENSHOTS_DIR = ROOT_DIR / "screenshots"
+AUTH_STATE_DIR = ROOT_DIR / ".auth"
+ORDER_POOL_DIR = ROOT_DIR / ".orders"
+HAR_DIR = DATA_DIR / "har"
+PROFILES_DIR = REPORTS_DIR / "profiles"
+
 
 # ===== Pytest Plugin Options =====
+# Registered through fixtures/pw_fixture.py, which loads this file by path. --browser, --headed, --slowmo,
+# --tracing, --video, --screenshot and --base-url belong to pytest-playwright and pytest-base-url.
 def pytest_addoption(parser):
-    parser.addoption("--base-url", action="store", default=BASE_URL, help="Base URL for tests")
-    parser.addoption("--browser", action="store", default=BROWSER, help="Browser: chromium, chrome, firefox, webkit, safari, edge")
-    parser.addoption("--headless", action="store_true", default=HEADLESS, help="Run browser in headless mode")
-    parser.addoption("--headed", action="store_true", default=not HEADLESS, help="Run browser in headed mode")
-    parser.addoption("--timeout", action="store", default=TIMEOUT, help="Test timeout in ms")
-    parser.addoption("--retries", action="store", default=RETRIES, help="Number of retries for flaky tests")
-    parser.addoption("--workers", action="store", default=WORKERS, help="Number of parallel workers")
-    parser.addoption("--trace", action="store", default=TRACE, help="Trace mode: on, off, retain-on-failure")
-    parser.addoption("--video", action="store", default=VIDEO, help="Video recording: on, off, retain-on-failure")
-    parser.addoption("--screenshot", action="store", default=SCREENSHOT, help="Screenshot: on, off, only-on-failure")
-    parser.addoption("--slowmo", action="store", default=SLOWMO, help="Slow down Playwright operations by ms")
+    group = parser.getgroup("playwright-config", "Project Playwright settings (playwright.config.py)")
+    group.addoption("--headless", action="store_true", default=HEADLESS, help="Run browser in headless mode")
+    group.addoption("--timeout", action="store", type=int, default=TIMEOUT, help="Test timeout in ms")
+    group.addoption("--retries", action="store", type=int, default=RETRIES, help="Number of retries for flaky tests")
+    group.addoption("--workers", action="store", default=WORKERS, help="Number of parallel workers")
+    group.addoption("--pool-max-tests", action="store", type=int, default=POOL_MAX_TESTS,
+                    help="Tests served by a pooled browser before it is recycled")
+    group.addoption("--pool-max-rss-mb", action="store", type=int, default=POOL_MAX_RSS_MB,
+                    help="Browser memory (MB) that forces a recycle")
+    group.addoption("--browser-server", action="store", default=BROWSER_SERVER, choices=["on", "off"],
+                    help="Share browser servers across workers")
+    group.addoption("--browser-server-instances", action="store", type=int, default=BROWSER_SERVER_INSTANCES,
+                    help="Browser servers per browser type")
+    group.addoption("--networkidle-fallback", action="store", default=NETWORKIDLE_FALLBACK, choices=["on", "off"],
+                    help="Fall back to networkidle when an endpoint wait times out")
+    group.addoption("--route-policy", action="store", default=ROUTE_POLICY, choices=["on", "off"],
+                    help="Block non-essential requests per test marker")
+    group.addoption("--har-mode", action="store", default=HAR_MODE, choices=["off", "record", "replay"],
+                    help="Per-test HAR archives; replay runs offline")
+    group.addoption("--profile", action="store", default=PROFILE, choices=["on", "off"],
+                    help="Profile where test time goes")
+    group.addoption("--magento-stub", action="store", default=MAGENTO_STUB, choices=["on", "off"],
+                    help="Run against a local Magento stand-in instead of base_url")
+    group.addoption("--order-pool-size", action="store", type=int, default=ORDER_POOL_SIZE,
+                    help="Guest orders pre-created over HTTP for order lookup tests")
+    group.addoption("--catalog-index", action="store", default=CATALOG_INDEX,
+                    help="SQLite catalog index tests pick products from")
+    group.addoption("--customer-pool-batch", action="store", type=int, default=CUSTOMER_POOL_BATCH,
+                    help="Checkout customers pre-generated per batch for the customer fixture")
+    group.addoption("--data-shard", action="store", default=DATA_SHARD,
+                    help="Collect only shard i/N of data_rows-parametrized tests, e.g. 2/4")
+    group.addoption("--data-groups", action="store", type=int, default=DATA_GROUPS,
+                    help="xdist_group buckets per data file (use with --dist loadgroup)")
+
+
+def default_browser() -> str:
+    """The Playwright browser type BROWSER names, or chromium
+
+    BROWSER is also the desktop's web browser on many systems, so only Playwright names count.
+    """
+    browser = BROWSER_ALIASES.get(BROWSER, BROWSER)
+    return browser if browser in ("chromium", "firefox", "webkit") else "chromium"
+
 
 # ===== Pytest Setup: Ensure Output Dirs Exist =====
 def pytest_configure(config):
     for d in [REPORTS_DIR, SCREENSHOTS_DIR]:
         d.mkdir(parents=True, exist_ok=True)
+    # pytest-playwright defaults to chromium at full speed; BROWSER and PLAYWRIGHT_SLOWMO set other defaults
+    if not config.getoption("browser", default=None):
+        config.option.browser = [default_browser()]
+    if not config.getoption("slowmo", default=None):
+        config.option.slowmo = SLOWMO
 
 # ===== Notes for Users =====
 """
@@ -59,7 +122,32 @@ Other Playwright config options (set via env or CLI):
 - PLAYWRIGHT_VIDEO: Record video (on, off, retain-on-failure)
 - PLAYWRIGHT_SCREENSHOT: Take screenshots (on, off, only-on-failure)
 - PLAYWRIGHT_SLOWMO: Slow down Playwright operations (ms)
+- PLAYWRIGHT_POOL_MAX_TESTS: Tests a pooled browser serves before it is relaunched (0 = never)
+- PLAYWRIGHT_POOL_MAX_RSS_MB: Browser memory in MB that forces a relaunch (0 = never)
+- PLAYWRIGHT_AUTH_STATE_TTL: Seconds a cached signed-in storage state is reused before logging in again
+- PLAYWRIGHT_BROWSER_SERVER: Run one set of browser servers per node and connect workers to them (on, off)
+- PLAYWRIGHT_BROWSER_SERVER_INSTANCES: Browser servers started per browser type when the mode is on
+- PLAYWRIGHT_NETWORKIDLE_FALLBACK: Wait for networkidle when an expected Magento endpoint response never arrives
+  (on, off)
+- PLAYWRIGHT_ROUTE_POLICY: Stub analytics/ad scripts and drop per-marker resource types, see service/route_policy.py
+  (on, off)
+- PLAYWRIGHT_BLOCK_DOMAINS: Comma-separated extra hosts aborted while the route policy is on
+- PLAYWRIGHT_HAR_MODE: record saves each test's traffic to data/har, replay serves it back with no network
+  (off, record, replay)
+- PLAYWRIGHT_PROFILE: Time every Page/Locator call per page object method (on, off);
+  folded stacks go to reports/profiles/
+- PLAYWRIGHT_MAGENTO_STUB: Start service/magento_stub.py per worker and point storefront_url at it (on, off);
+  latency via MAGENTO_STUB_*_MS
+- PLAYWRIGHT_ORDER_POOL_SIZE: Guest orders placed over HTTP in parallel and shared by workers through .orders/
+- PLAYWRIGHT_CATALOG_INDEX: SQLite file of crawled products (service/catalog_index.py);
+  built on first use, rebuilt after a day
+- PLAYWRIGHT_CUSTOMER_POOL_BATCH: Unique checkout customers (service/customer_factory.py) each worker generates
+  at a time into its mmap pool
+- PLAYWRIGHT_DATA_SHARD: i/N collects only the rows of shard i (by hash of the row id) of data_rows tests,
+  for splitting across CI nodes
+- PLAYWRIGHT_DATA_GROUPS: Number of xdist_group marks rows of a data file are spread over; pair with --dist loadgroup
 
 Example CLI usage:
-pytest e2e/ --browser=firefox --headless --retries=1 --trace=on --video=on --timeout=60000
+pytest e2e/ --browser=firefox --headless --retries=1 --tracing=on --video=on --timeout=60000
+pytest e2e/ --magento-stub=on --har-mode=record --route-policy=off
 """
@@ -0,0 +1,253 @@
+import asyncio
+import os
+from typing import Dict, List, Optional
+import psutil
+from playwright.sync_api import Playwright, Browser, BrowserContext
+from playwright.async_api import BrowserContext as AsyncBrowserContext
+
+
+class PooledBrowser:
+    """A launched browser plus the bookkeeping needed to decide when to recycle it"""
+
+    def __init__(self, browser: Browser, pid: Optional[int] = None):
+        self.browser = browser
+        self.pid = pid
+        self.tests_served = 0
+        self.open_contexts = 0
+        # Set once the browser hit a limit; it is closed when its last context is released
+        self.retired = False
+
+    def rss_mb(self) -> float:
+        """Resident memory of the browser process tree in MB (0 when the pid is unknown)"""
+        if self.pid is None:
+            return 0.0
+        try:
+            root = psutil.Process(self.pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.NoSuchProcess:
+            return 0.0
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.NoSuchProcess:
+                continue
+        return total / (1024 * 1024)
+
+
+class BrowserPool:
+    """
+    Keeps one browser per browser type alive for the whole worker session.
+    Every test gets its own BrowserContext, so isolation is preserved while the
+    browser launch is paid once. A browser is recycled after `max_tests` tests or
+    when its process tree grows above `max_rss_mb` (0 disables either limit).
+
+    When `endpoints` maps a browser name to browser server websocket URLs the pool
+    connects to one of them instead of launching, and falls back to a local launch
+    if none of them answers.
+    """
+
+    def __init__(self, playwright: Playwright, headless: bool = True, slow_mo: int = 0,
+                 max_tests: int = 50, max_rss_mb: int = 1024,
+                 endpoints: Optional[Dict[str, List[str]]] = None, connect_timeout: int = 5000):
+        self.playwright = playwright
+        self.headless = headless
+        self.slow_mo = slow_mo
+        self.max_tests = max_tests
+        self.max_rss_mb = max_rss_mb
+        self.endpoints = endpoints or {}
+        self.connect_timeout = connect_timeout
+        self._browsers: Dict[str, PooledBrowser] = {}
+        # The browser each open context lives on, so a release finds it even after retirement
+        self._owners: Dict[BrowserContext, PooledBrowser] = {}
+        self.launches = 0
+        self.recycles = 0
+        # Offsets endpoint selection so workers spread over the server instances
+        worker = os.getenv("PYTEST_XDIST_WORKER", "gw0")
+        self.worker_index = int(worker[2:]) if worker[2:].isdigit() else 0
+
+    def _child_pids(self) -> List[int]:
+        # Browsers are spawned by the Playwright driver, which is a child of this process
+        try:
+            return [p.pid for p in psutil.Process().children(recursive=True)]
+        except psutil.Error:
+            return []
+
+    def _endpoint_rotation(self, browser_name: str) -> List[str]:
+        # Rotate through the instances on every (re)connect, starting at this worker's slot
+        endpoints = self.endpoints.get(browser_name, [])
+        return [endpoints[(self.worker_index + self.launches + i) % len(endpoints)] for i in range(len(endpoints))]
+
+    def _browser_pid(self, before: List[int]) -> Optional[int]:
+        new_pids = [pid for pid in self._child_pids() if pid not in before]
+        # The first new process is the browser root; the rest are its helpers/renderers
+        for candidate in new_pids:
+            try:
+                parent = psutil.Process(candidate).ppid()
+            except psutil.NoSuchProcess:
+                continue
+            if parent not in new_pids:
+                return candidate
+        return None
+
+    def _connect(self, browser_name: str) -> Optional[PooledBrowser]:
+        for ws_endpoint in self._endpoint_rotation(browser_name):
+            try:
+                browser = getattr(self.playwright, browser_name).connect(
+                    ws_endpoint, timeout=self.connect_timeout, slow_mo=self.slow_mo)
+            except Exception as e:
+                print(f"[BrowserPool] Could not connect to {ws_endpoint}: {e}")
+                continue
+            self.launches += 1
+            # Remote browsers are not our children, so no pid and no RSS-based recycling
+            return PooledBrowser(browser)
+        return None
+
+    def _launch(self, browser_name: str) -> PooledBrowser:
+        remote = self._connect(browser_name)
+        if remote is not None:
+            return remote
+        if self.endpoints.get(browser_name):
+            print(f"[BrowserPool] No browser server reachable for {browser_name}, launching locally")
+        before = self._child_pids()
+        browser = getattr(self.playwright, browser_name).launch(headless=self.headless, slow_mo=self.slow_mo)
+        self.launches += 1
+        return PooledBrowser(browser, self._browser_pid(before))
+
+    def acquire(self, browser_name: str) -> PooledBrowser:
+        """Return the live browser for `browser_name`, launching it if needed"""
+        entry = self._browsers.get(browser_name)
+        if entry is None or not entry.browser.is_connected():
+            entry = self._launch(browser_name)
+            self._browsers[browser_name] = entry
+        return entry
+
+    def new_context(self, browser_name: str, **context_args) -> BrowserContext:
+        """Open a fresh, isolated context on the pooled browser"""
+        entry = self.acquire(browser_name)
+        entry.tests_served += 1
+        context = entry.browser.new_context(**context_args)
+        entry.open_contexts += 1
+        self._owners[context] = entry
+        return context
+
+    def should_recycle(self, browser_name: str) -> bool:
+        entry = self._browsers.get(browser_name)
+        return entry is not None and self._over_limits(entry)
+
+    def _over_limits(self, entry: PooledBrowser) -> bool:
+        if self.max_tests and entry.tests_served >= self.max_tests:
+            return True
+        if self.max_rss_mb and entry.rss_mb() > self.max_rss_mb:
+            return True
+        return False
+
+    def _pop_for_recycle(self, context: BrowserContext) -> Optional[PooledBrowser]:
+        entry = self._owners.pop(context, None)
+        if entry is None:
+            return None
+        entry.open_contexts -= 1
+        if not entry.retired and self._over_limits(entry):
+            # New contexts go to a fresh browser; this one stays up for the contexts still open on it
+            for browser_name, current in list(self._browsers.items()):
+                if current is entry:
+                    del self._browsers[browser_name]
+                    print(f"[BrowserPool] Recycling {browser_name} after {entry.tests_served} tests "
+                          f"({entry.rss_mb():.0f} MB RSS)")
+            entry.retired = True
+            self.recycles += 1
+        if entry.retired and entry.open_contexts == 0:
+            return entry
+        return None
+
+    def release(self, context: BrowserContext):
+        """Called after a test closed `context`; a browser over its limits is closed with its last context"""
+        entry = self._pop_for_recycle(context)
+        if entry is not None:
+            self._close(entry)
+
+    def _live_entries(self) -> List[PooledBrowser]:
+        entries = list(self._browsers.values())
+        for entry in self._owners.values():
+            if entry not in entries:
+                entries.append(entry)
+        return entries
+
+    @staticmethod
+    def _close(entry: PooledBrowser):
+        try:
+            entry.browser.close()
+        except Exception as e:
+            print(f"[BrowserPool] Failed to close browser: {e}")
+
+    def close(self):
+        """Close every pooled browser"""
+        for entry in self._live_entries():
+            self._close(entry)
+        self._browsers.clear()
+        self._owners.clear()
+
+
+class AsyncBrowserPool(BrowserPool):
+    """BrowserPool for the playwright.async_api stack; same limits and endpoint handling"""
+
+    async def _connect(self, browser_name: str) -> Optional[PooledBrowser]:
+        for ws_endpoint in self._endpoint_rotation(browser_name):
+            try:
+                browser = await getattr(self.playwright, browser_name).connect(
+                    ws_endpoint, timeout=self.connect_timeout, slow_mo=self.slow_mo)
+            except Exception as e:
+                print(f"[AsyncBrowserPool] Could not connect to {ws_endpoint}: {e}")
+                continue
+            self.launches += 1
+            return PooledBrowser(browser)
+        return None
+
+    async def _launch(self, browser_name: str) -> PooledBrowser:
+        remote = await self._connect(browser_name)
+        if remote is not None:
+            return remote
+        before = self._child_pids()
+        browser = await getattr(self.playwright, browser_name).launch(headless=self.headless, slow_mo=self.slow_mo)
+        self.launches += 1
+        return PooledBrowser(browser, self._browser_pid(before))
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._launch_locks: Dict[str, asyncio.Lock] = {}
+
+    async def acquire(self, browser_name: str) -> PooledBrowser:
+        # Concurrent new_context calls (asyncio.gather) would otherwise each launch a browser and
+        # leave all but the last one running unreferenced
+        async with self._launch_locks.setdefault(browser_name, asyncio.Lock()):
+            entry = self._browsers.get(browser_name)
+            if entry is None or not entry.browser.is_connected():
+                entry = await self._launch(browser_name)
+                self._browsers[browser_name] = entry
+            return entry
+
+    async def new_context(self, browser_name: str, **context_args) -> AsyncBrowserContext:
+        entry = await self.acquire(browser_name)
+        entry.tests_served += 1
+        context = await entry.browser.new_context(**context_args)
+        entry.open_contexts += 1
+        self._owners[context] = entry
+        return context
+
+    async def release(self, context: AsyncBrowserContext):
+        entry = self._pop_for_recycle(context)
+        if entry is not None:
+            await self._aclose(entry)
+
+    @staticmethod
+    async def _aclose(entry: PooledBrowser):
+        try:
+            await entry.browser.close()
+        except Exception as e:
+            print(f"[AsyncBrowserPool] Failed to close browser: {e}")
+
+    async def aclose(self):
+        for entry in self._live_entries():
+            await self._aclose(entry)
+        self._browsers.clear()
+        self._owners.clear()
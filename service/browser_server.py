@@ -0,0 +1,119 @@
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List
+from filelock import FileLock
+
+
+class BrowserServerFarm:
+    """
+    Runs Playwright browser servers (`playwright launch-server`) shared by every
+    xdist worker on the node. The first worker to attach starts `instances`
+    servers per browser type; later workers reuse them, and the last worker to
+    detach shuts them down. State lives in a JSON file guarded by a file lock.
+    """
+
+    def __init__(self, state_dir: Path, instances: int = 2, headless: bool = True, startup_timeout: float = 30.0):
+        self.state_dir = Path(state_dir)
+        self.state_file = self.state_dir / "browser_servers.json"
+        self.lock = FileLock(str(self.state_file) + ".lock")
+        self.instances = instances
+        self.headless = headless
+        self.startup_timeout = startup_timeout
+
+    def _load(self) -> Dict:
+        if not self.state_file.exists():
+            return {"refs": 0, "servers": {}}
+        with open(self.state_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save(self, state: Dict):
+        with open(self.state_file, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+
+    @staticmethod
+    def _free_port() -> int:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.bind(("127.0.0.1", 0))
+            return s.getsockname()[1]
+
+    @staticmethod
+    def _is_listening(port: int) -> bool:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.settimeout(0.5)
+            return s.connect_ex(("127.0.0.1", port)) == 0
+
+    @staticmethod
+    def _is_alive(pid: int) -> bool:
+        try:
+            os.kill(pid, 0)
+        except OSError:
+            return False
+        return True
+
+    def _start_server(self, browser_name: str) -> Dict:
+        port = self._free_port()
+        ws_path = uuid.uuid4().hex
+        config_path = self.state_dir / f"{browser_name}-{port}.json"
+        with open(config_path, "w", encoding="utf-8") as f:
+            json.dump({"headless": self.headless, "port": port, "wsPath": f"/{ws_path}"}, f)
+        process = subprocess.Popen(
+            [sys.executable, "-m", "playwright", "launch-server",
+             "--browser", browser_name, "--config", str(config_path)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        deadline = time.monotonic() + self.startup_timeout
+        while not self._is_listening(port):
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                raise RuntimeError(f"Browser server for {browser_name} did not start on port {port}")
+            time.sleep(0.1)
+        return {"pid": process.pid, "port": port, "ws_endpoint": f"ws://127.0.0.1:{port}/{ws_path}"}
+
+    def _healthy(self, server: Dict) -> bool:
+        return self._is_alive(server["pid"]) and self._is_listening(server["port"])
+
+    def attach(self, browser_names: List[str]) -> Dict[str, List[str]]:
+        """Register this worker and make sure the servers for `browser_names` are running"""
+        with self.lock:
+            state = self._load()
+            for name in browser_names:
+                servers = [s for s in state["servers"].get(name, []) if self._healthy(s)]
+                while len(servers) < self.instances:
+                    try:
+                        servers.append(self._start_server(name))
+                    except RuntimeError as e:
+                        # Workers fall back to a local launch when no endpoint is available
+                        print(f"[BrowserServerFarm] {e}")
+                        break
+                state["servers"][name] = servers
+            state["refs"] += 1
+            self._save(state)
+        return self.endpoints(state)
+
+    @staticmethod
+    def endpoints(state: Dict) -> Dict[str, List[str]]:
+        return {name: [s["ws_endpoint"] for s in servers] for name, servers in state["servers"].items()}
+
+    def detach(self):
+        """Unregister this worker; the last one out stops the servers"""
+        with self.lock:
+            state = self._load()
+            state["refs"] = max(0, state["refs"] - 1)
+            if state["refs"] == 0:
+                for servers in state["servers"].values():
+                    for server in servers:
+                        try:
+                            os.killpg(server["pid"], signal.SIGTERM)
+                        except OSError:
+                            pass
+                state["servers"] = {}
+            self._save(state)
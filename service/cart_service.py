@@ -0,0 +1,248 @@
+import json
+import re
+import secrets
+import string
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+
+# Configurable product JSON Magento embeds for the swatch renderer (or the configurable dropdowns)
+_MAGENTO_INIT_RE = re.compile(r'<script type="text/x-magento-init">\s*(\{.*?\})\s*</script>', re.S)
+_ADD_FORM_RE = re.compile(r'<form[^>]*id="product_addtocart_form"[^>]*>', re.S)
+_ATTR_RE = re.compile(r'(\w[\w-]*)="([^"]*)"')
+_INPUT_RE = re.compile(r'<input[^>]*name="(product|form_key)"[^>]*>', re.S)
+
+AJAX_HEADERS = {"X-Requested-With": "XMLHttpRequest"}
+
+# Cookies that tie a browser to its guest quote and cached customer data
+SESSION_COOKIES = re.compile(r"^(PHPSESSID|private_content_version|section_data_ids|form_key|mage-messages)$")
+
+
+class CartError(Exception):
+    """The storefront rejected a cart operation, or the cart did not end up as expected"""
+
+
+class ProductForm:
+    """What is needed to POST a configurable product to checkout/cart/add"""
+
+    def __init__(self, url: str, action: str, product_id: str, form_key: str, sp_config: Dict):
+        self.url = url
+        self.action = action
+        self.product_id = product_id
+        self.form_key = form_key
+        self.sp_config = sp_config
+
+    @classmethod
+    def parse(cls, url: str, html: str) -> "ProductForm":
+        form = _ADD_FORM_RE.search(html)
+        if form is None:
+            raise CartError(f"No add-to-cart form on {url}")
+        action = dict(_ATTR_RE.findall(form.group(0))).get("action", "")
+        inputs = {}
+        for tag in _INPUT_RE.finditer(html):
+            attrs = dict(_ATTR_RE.findall(tag.group(0)))
+            inputs.setdefault(attrs["name"], attrs.get("value", ""))
+        sp_config = {}
+        for block in _MAGENTO_INIT_RE.findall(html):
+            try:
+                data = json.loads(block)
+            except ValueError:
+                continue
+            # Luma renders swatch products through the swatch renderer; plain dropdowns use spConfig
+            swatches = data.get("[data-role=swatch-options]", {}).get("Magento_Swatches/js/swatch-renderer", {})
+            if "jsonConfig" in swatches:
+                sp_config = swatches["jsonConfig"]
+                break
+            configurable = data.get("#product_addtocart_form", {}).get("configurable", {})
+            if "spConfig" in configurable and not sp_config:
+                sp_config = configurable["spConfig"]
+        return cls(url, urljoin(url, action), inputs.get("product", ""), inputs.get("form_key", ""), sp_config)
+
+    def _attribute(self, code: str) -> Optional[Dict]:
+        for attribute in self.sp_config.get("attributes", {}).values():
+            if attribute.get("code") == code:
+                return attribute
+        return None
+
+    def super_attributes(self, size_index: int = 0, color_index: int = 0) -> Dict[str, str]:
+        """super_attribute[...] fields for the size/color at the given swatch positions
+
+        Falls back to the nearest combination that exists as a child product, the same
+        way the swatch renderer disables options with no stock.
+        """
+        wanted = {"size": size_index, "color": color_index}
+        attributes = {code: self._attribute(code) for code in wanted}
+        attributes = {code: a for code, a in attributes.items() if a is not None}
+        if not attributes:
+            return {}
+        variants = list(self.sp_config.get("index", {}).values())
+        choice = {code: a["options"][min(wanted[code], len(a["options"]) - 1)]["id"]
+                  for code, a in attributes.items()}
+        selected = {attributes[code]["id"]: option_id for code, option_id in choice.items()}
+        if variants and selected not in variants:
+            # Keep the size if possible and take the first color stocked in it
+            size = attributes.get("size")
+            same_size = [v for v in variants if size is None or v.get(size["id"]) == selected.get(size["id"])]
+            selected = (same_size or variants)[0]
+        return {f"super_attribute[{attribute_id}]": option_id for attribute_id, option_id in selected.items()}
+
+
+class CartService:
+    """
+    Seeds the cart over HTTP instead of through search, product page and swatches.
+
+    Requests go through `context.request`, which shares cookies with the browser
+    context, so the session, the quote and the private_content_version cookie they
+    touch are the ones the test's pages see. Pages that are already open show the
+    new cart after a reload (`ProductPage.reload_with_cart`).
+    """
+
+    def __init__(self, context, base_url: str):
+        self.request = context.request
+        self.context = context
+        self.base_url = base_url
+        self._forms: Dict[str, ProductForm] = {}
+
+    def _form_key(self, form: Optional[ProductForm] = None) -> str:
+        # With full page cache the form_key in the HTML is a placeholder; the cookie is authoritative
+        for cookie in self.context.cookies(self.base_url):
+            if cookie["name"] == "form_key":
+                return cookie["value"]
+        if form is not None and form.form_key:
+            return form.form_key
+        # Same as Magento's JS: make one up and let the server adopt it from the cookie
+        value = "".join(secrets.choice(string.ascii_letters + string.digits) for _ in range(16))
+        self.context.add_cookies([{"name": "form_key", "value": value, "url": self.base_url}])
+        return value
+
+    def product_form(self, product_path: str) -> ProductForm:
+        url = urljoin(self.base_url, product_path)
+        if url not in self._forms:
+            response = self.request.get(url)
+            if not response.ok:
+                raise CartError(f"GET {url} returned {response.status}")
+            self._forms[url] = ProductForm.parse(url, response.text())
+        return self._forms[url]
+
+    def sections(self, names: str = "cart") -> Dict:
+        """Fresh customer-data sections, e.g. sections("cart,customer")"""
+        response = self.request.get(urljoin(self.base_url, "customer/section/load/"),
+                                    params={"sections": names, "force_new_section_timestamp": "true"},
+                                    headers=AJAX_HEADERS)
+        return response.json()
+
+    def summary_count(self) -> int:
+        """Items in the cart according to the cart customer-data section"""
+        return int((self.sections("cart").get("cart") or {}).get("summary_count") or 0)
+
+    def add(self, product_path: str, size_index: int = 0, color_index: int = 0, qty: int = 1) -> Dict:
+        """Add one configurable product and return what was posted"""
+        form = self.product_form(product_path)
+        data = {"product": form.product_id, "form_key": self._form_key(form), "qty": str(qty)}
+        data.update(form.super_attributes(size_index, color_index))
+        response = self.request.post(form.action, form=data, headers=AJAX_HEADERS)
+        if not response.ok:
+            raise CartError(f"POST {form.action} returned {response.status}")
+        return {"url": form.url, "product": form.product_id, "qty": qty, "options": data}
+
+    def seed(self, products: List[Dict[str, str]]) -> List[Dict]:
+        """Add every row ({product_path, size_index, color_index, qty}) and confirm the cart grew"""
+        before = self.summary_count()
+        added = [self.add(row["product_path"], int(row.get("size_index") or 0),
+                          int(row.get("color_index") or 0), int(row.get("qty") or 1)) for row in products]
+        expected = before + sum(item["qty"] for item in added)
+        count = self.summary_count()
+        if count < expected:
+            raise CartError(f"Cart holds {count} items after seeding, expected {expected}")
+        return added
+
+    def reset(self, fresh_session: Optional[bool] = None) -> int:
+        """Empty the cart in one operation and return how many items it held
+
+        A guest's quote belongs to its session, so dropping the session cookies is
+        enough; a signed-in customer's quote outlives the session and is cleared with
+        the cart page's "empty_cart" update instead. Pass `fresh_session` to force one.
+        Open pages show the empty cart after a reload.
+        """
+        sections = self.sections("cart,customer")
+        count = int((sections.get("cart") or {}).get("summary_count") or 0)
+        if not count:
+            return 0
+        if fresh_session is None:
+            fresh_session = not (sections.get("customer") or {}).get("firstname")
+        if fresh_session:
+            self.context.clear_cookies(name=SESSION_COOKIES)
+        else:
+            self.request.post(urljoin(self.base_url, "checkout/cart/updatePost/"),
+                              form={"form_key": self._form_key(), "update_cart_action": "empty_cart"})
+        remaining = self.summary_count()
+        if remaining:
+            raise CartError(f"Cart still holds {remaining} items after reset")
+        return count
+
+
+class AsyncCartService(CartService):
+    """playwright.async_api twin of CartService"""
+
+    async def _form_key(self, form: Optional[ProductForm] = None) -> str:
+        for cookie in await self.context.cookies(self.base_url):
+            if cookie["name"] == "form_key":
+                return cookie["value"]
+        if form is not None and form.form_key:
+            return form.form_key
+        value = "".join(secrets.choice(string.ascii_letters + string.digits) for _ in range(16))
+        await self.context.add_cookies([{"name": "form_key", "value": value, "url": self.base_url}])
+        return value
+
+    async def product_form(self, product_path: str) -> ProductForm:
+        url = urljoin(self.base_url, product_path)
+        if url not in self._forms:
+            response = await self.request.get(url)
+            if not response.ok:
+                raise CartError(f"GET {url} returned {response.status}")
+            self._forms[url] = ProductForm.parse(url, await response.text())
+        return self._forms[url]
+
+    async def sections(self, names: str = "cart") -> Dict:
+        response = await self.request.get(urljoin(self.base_url, "customer/section/load/"),
+                                          params={"sections": names, "force_new_section_timestamp": "true"},
+                                          headers=AJAX_HEADERS)
+        return await response.json()
+
+    async def summary_count(self) -> int:
+        return int(((await self.sections("cart")).get("cart") or {}).get("summary_count") or 0)
+
+    async def add(self, product_path: str, size_index: int = 0, color_index: int = 0, qty: int = 1) -> Dict:
+        form = await self.product_form(product_path)
+        data = {"product": form.product_id, "form_key": await self._form_key(form), "qty": str(qty)}
+        data.update(form.super_attributes(size_index, color_index))
+        response = await self.request.post(form.action, form=data, headers=AJAX_HEADERS)
+        if not response.ok:
+            raise CartError(f"POST {form.action} returned {response.status}")
+        return {"url": form.url, "product": form.product_id, "qty": qty, "options": data}
+
+    async def seed(self, products: List[Dict[str, str]]) -> List[Dict]:
+        before = await self.summary_count()
+        added = [await self.add(row["product_path"], int(row.get("size_index") or 0),
+                                int(row.get("color_index") or 0), int(row.get("qty") or 1)) for row in products]
+        expected = before + sum(item["qty"] for item in added)
+        count = await self.summary_count()
+        if count < expected:
+            raise CartError(f"Cart holds {count} items after seeding, expected {expected}")
+        return added
+
+    async def reset(self, fresh_session: Optional[bool] = None) -> int:
+        sections = await self.sections("cart,customer")
+        count = int((sections.get("cart") or {}).get("summary_count") or 0)
+        if not count:
+            return 0
+        if fresh_session is None:
+            fresh_session = not (sections.get("customer") or {}).get("firstname")
+        if fresh_session:
+            await self.context.clear_cookies(name=SESSION_COOKIES)
+        else:
+            await self.request.post(urljoin(self.base_url, "checkout/cart/updatePost/"),
+                                    form={"form_key": await self._form_key(), "update_cart_action": "empty_cart"})
+        remaining = await self.summary_count()
+        if remaining:
+            raise CartError(f"Cart still holds {remaining} items after reset")
+        return count
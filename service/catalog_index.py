@@ -0,0 +1,305 @@
+"""
+Offline index of the storefront catalog, so tests can go straight to a product page.
+
+`CatalogCrawler` reads search result and category listings once over plain HTTP,
+then every product page they link to, and `CatalogIndex` keeps what it found in
+SQLite: URL, name, SKU, price, size and color options and stock status, plus the
+search terms and categories each product was listed under.
+
+    index = CatalogIndex(DATA_DIR / "catalog.sqlite", base_url)
+    product = index.random_product(term="jacket", min_sizes=3)
+    product_page.navigate(product.url)
+
+Rebuild it with `python -m service.catalog_index --base-url https://...`.
+"""
+import argparse
+import html
+import json
+import random
+import re
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin
+
+import requests
+from filelock import FileLock
+
+from service.cart_service import CartError, ProductForm
+from service.csv_service import CSVService
+
+DEFAULT_CATEGORIES = ("men.html", "women.html")
+# Listings show 12 per page by default; 36 is the largest page size Luma offers
+LISTING_PARAMS = {"product_list_limit": "36"}
+# An index older than this is rebuilt by `ensure`
+MAX_AGE_SECONDS = 24 * 3600
+
+_PRODUCT_LINK_RE = re.compile(r'<a[^>]*class="product-item-link"[^>]*href="([^"]+)"', re.S)
+_TITLE_RE = re.compile(r'<span class="base"[^>]*>(.*?)</span>', re.S)
+_SKU_RE = re.compile(r'class="product attribute sku".*?class="value"[^>]*>(.*?)<', re.S)
+_STOCK_RE = re.compile(r'class="stock (available|unavailable)"')
+_PRICE_RE = re.compile(r'data-price-amount="([\d.]+)"|class="price">\s*\$([\d,.]+)')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    storefront TEXT NOT NULL,
+    url TEXT NOT NULL,
+    name TEXT,
+    sku TEXT,
+    price REAL,
+    in_stock INTEGER NOT NULL,
+    sizes TEXT NOT NULL,
+    colors TEXT NOT NULL,
+    size_count INTEGER NOT NULL,
+    color_count INTEGER NOT NULL,
+    crawled_at REAL NOT NULL,
+    PRIMARY KEY (storefront, url)
+);
+CREATE TABLE IF NOT EXISTS listings (
+    storefront TEXT NOT NULL,
+    source TEXT NOT NULL,
+    url TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (storefront, source, url)
+);
+CREATE INDEX IF NOT EXISTS listings_source ON listings (storefront, source);
+"""
+
+
+@dataclass(frozen=True)
+class CatalogProduct:
+    url: str
+    name: Optional[str]
+    sku: Optional[str]
+    price: Optional[float]
+    in_stock: bool
+    sizes: Tuple[str, ...]
+    colors: Tuple[str, ...]
+
+    @property
+    def configurable(self) -> bool:
+        return bool(self.sizes or self.colors)
+
+    @property
+    def path(self) -> str:
+        """Last path segment, the form data/cart_products.csv uses"""
+        return self.url.rstrip("/").rsplit("/", 1)[-1]
+
+
+def _text(match) -> Optional[str]:
+    return html.unescape(re.sub(r"<[^>]+>", "", match.group(1))).strip() if match else None
+
+
+def _labels(form: ProductForm, code: str) -> List[str]:
+    for attribute in form.sp_config.get("attributes", {}).values():
+        if attribute.get("code") == code:
+            # Luma lists the child products per option; an option with none is out of stock
+            return [o["label"] for o in attribute.get("options", []) if "products" not in o or o["products"]]
+    return []
+
+
+class CatalogCrawler:
+    """Reads search/category listings and the product pages they link to, over plain GETs in parallel"""
+
+    def __init__(self, base_url: str, terms: Iterable[str] = (), categories: Iterable[str] = DEFAULT_CATEGORIES,
+                 workers: int = 8, timeout: float = 30):
+        self.base_url = base_url
+        self.terms = [t for t in terms if t]
+        self.categories = list(categories)
+        self.workers = workers
+        self.timeout = timeout
+
+    def _get(self, url: str, params: Optional[Dict[str, str]] = None) -> Optional[str]:
+        try:
+            response = requests.get(url, params=params, timeout=self.timeout)
+        except requests.RequestException as e:
+            print(f"Catalog crawl: GET {url} failed: {e}")
+            return None
+        if not response.ok:
+            print(f"Catalog crawl: GET {url} returned {response.status_code}")
+            return None
+        return response.text
+
+    def listing(self, source: str) -> List[str]:
+        """Product URLs on one listing: "search:<term>" or a category path like "men.html" """
+        if source.startswith("search:"):
+            url = urljoin(self.base_url, "catalogsearch/result/")
+            page = self._get(url, dict(LISTING_PARAMS, q=source[len("search:"):]))
+        else:
+            url = urljoin(self.base_url, source)
+            page = self._get(url, LISTING_PARAMS)
+        links = _PRODUCT_LINK_RE.findall(page or "")
+        # Keep listing order, drop repeats (the same product can show in several widgets)
+        return [urljoin(url, link) for link in dict.fromkeys(html.unescape(link) for link in links)]
+
+    def product(self, url: str) -> Optional[CatalogProduct]:
+        page = self._get(url)
+        if page is None:
+            return None
+        try:
+            form = ProductForm.parse(url, page)
+        except CartError:
+            form = ProductForm(url, "", "", "", {})
+        price = form.sp_config.get("prices", {}).get("finalPrice", {}).get("amount")
+        if price is None:
+            match = _PRICE_RE.search(page)
+            price = (match.group(1) or match.group(2).replace(",", "")) if match else None
+        stock = _STOCK_RE.search(page)
+        return CatalogProduct(
+            url=url,
+            name=_text(_TITLE_RE.search(page)),
+            sku=_text(_SKU_RE.search(page)),
+            price=float(price) if price is not None else None,
+            in_stock=bool(stock) and stock.group(1) == "available",
+            sizes=tuple(_labels(form, "size")),
+            colors=tuple(_labels(form, "color")),
+        )
+
+    def crawl(self) -> Tuple[Dict[str, List[str]], List[CatalogProduct]]:
+        """({source: [product url, ...]}, [every product listed anywhere])"""
+        sources = [f"search:{t}" for t in self.terms] + self.categories
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            listings = dict(zip(sources, pool.map(self.listing, sources)))
+            urls = list(dict.fromkeys(url for urls in listings.values() for url in urls))
+            products = [p for p in pool.map(self.product, urls) if p is not None]
+        return listings, products
+
+
+class CatalogIndex:
+    """SQLite catalog of one storefront; several storefronts can share a file"""
+
+    def __init__(self, path: Path, base_url: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.base_url = base_url
+        self.lock = FileLock(str(self.path) + ".lock")
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, timeout=30)
+        db.row_factory = sqlite3.Row
+        return db
+
+    def age(self) -> Optional[float]:
+        """Seconds since this storefront was last crawled, or None if it never was"""
+        with self._connect() as db:
+            row = db.execute("SELECT MIN(crawled_at) FROM products WHERE storefront = ?", (self.base_url,)).fetchone()
+        return None if row[0] is None else time.time() - row[0]
+
+    def build(self, crawler: CatalogCrawler) -> int:
+        """Replace this storefront's rows with a fresh crawl; returns the number of products"""
+        start = time.perf_counter()
+        listings, products = crawler.crawl()
+        now = time.time()
+        with self._connect() as db:
+            db.execute("DELETE FROM products WHERE storefront = ?", (self.base_url,))
+            db.execute("DELETE FROM listings WHERE storefront = ?", (self.base_url,))
+            db.executemany(
+                "INSERT INTO products VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(self.base_url, p.url, p.name, p.sku, p.price, int(p.in_stock), json.dumps(p.sizes),
+                  json.dumps(p.colors), len(p.sizes), len(p.colors), now) for p in products])
+            db.executemany(
+                "INSERT OR IGNORE INTO listings VALUES (?, ?, ?, ?)",
+                [(self.base_url, source, url, position)
+                 for source, urls in listings.items() for position, url in enumerate(urls)])
+        print(f"Catalog index: {len(products)} products from {len(listings)} listings "
+              f"in {time.perf_counter() - start:.1f}s -> {self.path}")
+        return len(products)
+
+    def ensure(self, crawler: CatalogCrawler, max_age: float = MAX_AGE_SECONDS) -> int:
+        """Build the index unless a fresh one exists; safe to call from every xdist worker"""
+        with self.lock:
+            age = self.age()
+            if age is not None and age < max_age:
+                return 0
+            return self.build(crawler)
+
+    def query(self, term: Optional[str] = None, category: Optional[str] = None, min_sizes: int = 0,
+              min_colors: int = 0, in_stock: Optional[bool] = True, configurable: Optional[bool] = None,
+              max_price: Optional[float] = None, limit: Optional[int] = None) -> List[CatalogProduct]:
+        """Products matching every given condition, in listing order
+
+        `term` matches products the search for that term listed, or whose name contains it.
+        """
+        where = ["p.storefront = ?"]
+        args: List = [self.base_url]
+        match = "l.storefront = p.storefront AND l.url = p.url AND l.source = ?"
+        listed = f"EXISTS (SELECT 1 FROM listings l WHERE {match})"
+        position = f"(SELECT MIN(l.position) FROM listings l WHERE {match})"
+        order, order_args = "p.name", []
+        if term is not None:
+            where.append(f"({listed} OR p.name LIKE ?)")
+            args += [f"search:{term}", f"%{term}%"]
+            order, order_args = f"COALESCE({position}, 1e9), p.name", [f"search:{term}"]
+        if category is not None:
+            where.append(listed)
+            args.append(category)
+            if term is None:
+                order, order_args = f"{position}, p.name", [category]
+        if min_sizes:
+            where.append("p.size_count >= ?")
+            args.append(min_sizes)
+        if min_colors:
+            where.append("p.color_count >= ?")
+            args.append(min_colors)
+        if in_stock is not None:
+            where.append("p.in_stock = ?")
+            args.append(int(in_stock))
+        if configurable is not None:
+            where.append("(p.size_count + p.color_count > 0) = ?")
+            args.append(int(configurable))
+        if max_price is not None:
+            where.append("p.price <= ?")
+            args.append(max_price)
+        sql = f"SELECT p.* FROM products p WHERE {' AND '.join(where)} ORDER BY {order}"
+        args += order_args
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(limit)
+        with self._connect() as db:
+            rows = db.execute(sql, args).fetchall()
+        return [CatalogProduct(url=r["url"], name=r["name"], sku=r["sku"], price=r["price"],
+                               in_stock=bool(r["in_stock"]), sizes=tuple(json.loads(r["sizes"])),
+                               colors=tuple(json.loads(r["colors"]))) for r in rows]
+
+    def listed(self, term: Optional[str] = None, category: Optional[str] = None) -> int:
+        """How many products the crawled search for `term` (or `category` page) listed"""
+        source = f"search:{term}" if term is not None else category
+        with self._connect() as db:
+            row = db.execute("SELECT COUNT(*) FROM listings WHERE storefront = ? AND source = ?",
+                             (self.base_url, source)).fetchone()
+        return row[0]
+
+    def random_product(self, **conditions) -> Optional[CatalogProduct]:
+        """One product matching `query(**conditions)`, or None"""
+        products = self.query(**conditions)
+        return random.choice(products) if products else None
+
+
+def default_crawler(base_url: str) -> CatalogCrawler:
+    """Crawler for the search terms the tests use plus the default categories"""
+    return CatalogCrawler(base_url, CSVService.search_terms("sample_test_data.csv"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the offline catalog index")
+    parser.add_argument("--base-url", default="https://magento.softwaretestingboard.com/")
+    parser.add_argument("--index", default=str(Path(__file__).parent.parent / "data" / "catalog.sqlite"))
+    parser.add_argument("--term", action="append", help="Search term to crawl (default: data/sample_test_data.csv)")
+    parser.add_argument("--category", action="append",
+                        help=f"Category page to crawl (default: {', '.join(DEFAULT_CATEGORIES)})")
+    args = parser.parse_args()
+    crawler = default_crawler(args.base_url)
+    if args.term:
+        crawler.terms = args.term
+    if args.category:
+        crawler.categories = args.category
+    CatalogIndex(Path(args.index), args.base_url).build(crawler)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,150 @@
+"""
+Test data access for the CSV files under data/.
+
+Files are read through the indexed SQLite store in service/data_store.py, which
+re-imports a CSV only when it changes, and the rows are cached per process, keyed
+by path, mtime and size, so the parametrize calls made at collection time, the
+fixtures and the tests all share one read of each file. `iter_rows` streams rows
+from a store cursor without holding the file in memory (or walks the cached rows
+if the file is already cached), `query` selects rows by column values through the
+store's indexes, and `model=` turns rows into the typed records below instead of
+dicts of strings.
+"""
+import asyncio
 import csv
 import random
-from typing import List, Dict
+import threading
+from dataclasses import MISSING, dataclass, fields
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type, TypeVar
 from pathlib import Path
 
+from service.data_store import DataStore
+
+DATA_PATH = Path(__file__).parent.parent / "data"
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class SearchCase:
+    """A row of sample_test_data.csv"""
+    test_case_id: str
+    description: str
+    search_term: str
+    expected_result: str
+
+
+@dataclass(frozen=True)
+class CartProduct:
+    """A row of cart_products.csv"""
+    product_path: str
+    size_index: int = 0
+    color_index: int = 0
+    qty: int = 1
+
+
+def to_model(row: Dict[str, str], model: Type[T]) -> T:
+    """Build `model` from a row, converting each field to its annotated int/float/bool type
+
+    Missing or empty cells take the field's default (or "" / None when it has none); columns the model
+    does not declare are ignored.
+    """
+    values: Dict[str, Any] = {}
+    for f in fields(model):
+        raw = row.get(f.name)
+        if raw is None or raw.strip() == "":
+            if f.default is MISSING and f.default_factory is MISSING:
+                # A required column left blank: "" for text, None for numbers
+                values[f.name] = "" if f.type is str else None
+            continue
+        kind = f.type
+        if kind is bool:
+            values[f.name] = raw.strip().lower() in ("1", "true", "yes", "y")
+        elif kind in (int, float):
+            values[f.name] = kind(raw.strip())
+        else:
+            values[f.name] = raw
+    return model(**values)
+
+
+class _CachedFile:
+    __slots__ = ("key", "rows", "search_terms")
+
+    def __init__(self, key: Tuple[int, int], rows: List[Dict[str, str]]):
+        self.key = key
+        self.rows = rows
+        self.search_terms: Optional[List[str]] = None
+
+
+_cache: Dict[Path, _CachedFile] = {}
+_cache_lock = threading.Lock()
+
+
+def _resolve(file_path: str) -> Path:
+    path = DATA_PATH / file_path
+    if not path.exists():
+        raise FileNotFoundError(f"CSV file not found: {path}")
+    return path
+
+
+def _stat_key(path: Path) -> Tuple[int, int]:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _cached(file_path: str) -> _CachedFile:
+    path = _resolve(file_path)
+    key = _stat_key(path)
+    entry = _cache.get(path)
+    if entry is not None and entry.key == key:
+        return entry
+    with _cache_lock:
+        entry = _cache.get(path)
+        if entry is None or entry.key != key:
+            entry = _CachedFile(key, DataStore.default().query(path))
+            _cache[path] = entry
+        return entry
+
+
 class CSVService:
     @staticmethod
     def read_csv(file_path: str) -> List[Dict[str, str]]:
-        DATA_PATH = Path(__file__).parent.parent / "data"
-        file_path = str(DATA_PATH / file_path)
-        if not Path(file_path).exists():
-            raise FileNotFoundError(f"CSV file not found: {file_path}")
-        with open(file_path, newline='', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            return [row for row in reader]
+        """All rows of data/<file_path>; parsed once per process until the file changes
+
+        The row dicts are shared between callers: copy one before modifying it.
+        """
+        return list(_cached(file_path).rows)
+
+    @staticmethod
+    def read_models(file_path: str, model: Type[T]) -> List[T]:
+        """All rows of data/<file_path> as `model` instances, e.g. `read_models("cart_products.csv", CartProduct)`"""
+        return [to_model(row, model) for row in _cached(file_path).rows]
+
+    @staticmethod
+    def iter_rows(file_path: str, model: Optional[Type[T]] = None) -> Iterator[Any]:
+        """Rows one at a time, as dicts or `model` instances, without loading the whole file
+
+        A file that is already cached (and unchanged) is walked from memory instead.
+        """
+        path = _resolve(file_path)
+        entry = _cache.get(path)
+        if entry is not None and entry.key == _stat_key(path):
+            rows = iter(entry.rows)
+        else:
+            rows = DataStore.default().iter_query(path)
+        if model is None:
+            return rows
+        return (to_model(row, model) for row in rows)
+
+    @staticmethod
+    def query(file_path: str, **conditions) -> List[Dict[str, str]]:
+        """Rows of data/<file_path> whose columns equal `conditions`, served from the store's indexes
+
+        Usage:
+            CSVService.query("sample_test_data.csv", test_case_id="TC004")
+            CSVService.query("../tests/tests.csv", category="Home Page Search", priority="High")
+        """
+        return DataStore.default().query(_resolve(file_path), **conditions)
 
     @staticmethod
     def write_csv(file_path: str, data: List[Dict[str, str]], fieldnames: List[str]):
@@ -20,19 +152,34 @@ class CSVService:
             writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
             writer.writeheader()
             writer.writerows(data)
+        # mtime alone can miss a rewrite within its resolution; drop the entry outright
+        with _cache_lock:
+            _cache.pop(DATA_PATH / file_path, None)
 
     @staticmethod
-    def async_read_csv(file_path: str) -> List[Dict[str, str]]:
-        return CSVService.read_csv(file_path)
+    async def async_read_csv(file_path: str) -> List[Dict[str, str]]:
+        """read_csv on a worker thread, so a cold read does not block the event loop"""
+        return await asyncio.to_thread(CSVService.read_csv, file_path)
 
     @staticmethod
     def search_terms(file_path: str) -> List[str]:
         """Synchronous version of async_search_terms for use in pytest parametrize"""
-        search_data = CSVService.read_csv(file_path)
-        return [row['search_term'].strip() for row in search_data if row.get('search_term', '').strip()]
+        entry = _cached(file_path)
+        if entry.search_terms is None:
+            entry.search_terms = [row['search_term'].strip() for row in entry.rows
+                                  if (row.get('search_term') or '').strip()]
+        return list(entry.search_terms)
+
+    @staticmethod
+    async def async_search_terms(file_path: str) -> List[str]:
+        return await asyncio.to_thread(CSVService.search_terms, file_path)
 
     @staticmethod
     def get_random_search_term(file_path: str) -> str:
-        """Get a random search term from the CSV file"""
-        search_data = CSVService.read_csv(file_path)
-        return random.choice(search_data)['search_term'].strip()
+        """Get a random non-empty search term from the CSV file"""
+        return random.choice(CSVService.search_terms(file_path))
+
+    @staticmethod
+    def clear_cache():
+        with _cache_lock:
+            _cache.clear()
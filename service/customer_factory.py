@@ -0,0 +1,196 @@
+"""
+Unique checkout customers for parallel runs.
+
+`CustomerFactory` turns a sequence number into a customer with a US address whose
+Magento region id, city, ZIP code and area code belong together, and an email
+built from the run, the xdist worker and the sequence number, so no two tests of
+a run (or of two runs sharing a storefront) check out as the same person:
+
+    factory = CustomerFactory(namespace="a1b2c3d4gw3")
+    customer = factory.customer(17)
+    checkout_page.fill_shipping_information(**customer.shipping())
+
+`CustomerPool` pre-generates customers in batches into a file of fixed-size
+records and hands them out through a read-only memory map, so taking one in a
+test is a slice and a json.loads. Each worker owns its pool, so nothing is
+shared and nothing is locked across processes.
+"""
+import itertools
+import json
+import mmap
+import os
+import random
+import threading
+import uuid
+import zlib
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+DEFAULT_BATCH = 1024
+# Bytes per pooled record: the JSON of one customer, space padded, newline terminated
+RECORD_SIZE = 384
+
+# (Magento region id, state, city, lowest ZIP, highest ZIP, area code); ids match the
+# storefront's United States region list and service/magento_stub.py
+US_ADDRESSES = (
+    ("1", "Alabama", "Birmingham", 35004, 36925, "205"),
+    ("2", "Alaska", "Anchorage", 99501, 99950, "907"),
+    ("4", "Arizona", "Phoenix", 85001, 86556, "602"),
+    ("5", "Arkansas", "Little Rock", 71601, 72959, "501"),
+    ("12", "California", "Los Angeles", 90001, 96162, "213"),
+    ("13", "Colorado", "Denver", 80001, 81658, "303"),
+    ("18", "Florida", "Miami", 32003, 34997, "305"),
+    ("19", "Georgia", "Atlanta", 30002, 31999, "404"),
+    ("23", "Illinois", "Chicago", 60001, 62999, "312"),
+    ("32", "Massachusetts", "Boston", 1001, 2791, "617"),
+    ("43", "New York", "New York", 10001, 14975, "212"),
+    ("57", "Texas", "Austin", 75001, 79999, "512"),
+    ("62", "Washington", "Seattle", 98001, 99403, "206"),
+)
+
+FIRST_NAMES = ("James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David",
+               "Elizabeth", "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah",
+               "Carlos", "Maria", "Wei", "Mei", "Ahmed", "Fatima", "Raj", "Priya", "Kenji", "Yuki")
+LAST_NAMES = ("Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez",
+              "Martinez", "Hernandez", "Lopez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson",
+              "Lee", "Chen", "Nguyen", "Patel", "Kim", "Tanaka", "Khan", "Cohen", "Murphy", "Rossi")
+STREETS = ("Main St", "Oak Ave", "Maple Dr", "Cedar Ln", "Pine St", "Elm St", "Washington Ave", "Lake Rd",
+           "Hill St", "Park Ave", "Sunset Blvd", "River Rd", "Church St", "Highland Ave", "Mill Rd")
+
+
+@dataclass(frozen=True)
+class Customer:
+    email: str
+    first_name: str
+    last_name: str
+    street: str
+    city: str
+    region_id: str
+    region: str
+    zip_code: str
+    country_id: str
+    phone: str
+
+    def shipping(self) -> Dict[str, str]:
+        """Keyword arguments for CheckoutPage.fill_shipping_information"""
+        return {
+            "email": self.email,
+            "first_name": self.first_name,
+            "last_name": self.last_name,
+            "street": self.street,
+            "city": self.city,
+            "region_id": self.region_id,
+            "zip_code": self.zip_code,
+            "country_id": self.country_id,
+            "phone": self.phone,
+        }
+
+    def address(self) -> Dict:
+        """The address as Magento's REST checkout takes it (shipping-information, payment-information)"""
+        return {
+            "email": self.email,
+            "firstname": self.first_name,
+            "lastname": self.last_name,
+            "street": [self.street],
+            "city": self.city,
+            "region_id": self.region_id,
+            "region": self.region,
+            "postcode": self.zip_code,
+            "country_id": self.country_id,
+            "telephone": self.phone,
+        }
+
+
+def default_namespace(purpose: str = "") -> str:
+    """Run id plus xdist worker, e.g. "3f9c2a1bgw2": unique per worker, shared by its tests
+
+    Factories of one worker that number their customers independently each pass their own
+    `purpose` ("pool", "orders"), e.g. "3f9c2a1bgw2-pool", so they never hand out the same one.
+    """
+    run = os.getenv("PYTEST_XDIST_TESTRUNUID") or uuid.uuid4().hex
+    namespace = f"{run[:8]}{os.getenv('PYTEST_XDIST_WORKER', 'main')}".lower()
+    return f"{namespace}-{purpose}" if purpose else namespace
+
+
+class CustomerFactory:
+    """Customer number `n` of a namespace; the same namespace and number always give the same customer"""
+
+    def __init__(self, namespace: Optional[str] = None, domain: str = "example.com"):
+        self.namespace = namespace or default_namespace()
+        self.domain = domain
+        self._seed = zlib.crc32(self.namespace.encode("utf-8"))
+        self._sequence = itertools.count()
+
+    def customer(self, number: int) -> Customer:
+        rng = random.Random((self._seed << 32) | number)
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        region_id, region, city, zip_low, zip_high, area_code = rng.choice(US_ADDRESSES)
+        return Customer(
+            # The namespace and number make it unique; the name only makes it readable
+            email=f"{first}.{last}.{self.namespace}.{number:x}@{self.domain}".lower(),
+            first_name=first,
+            last_name=last,
+            street=f"{rng.randint(1, 9999)} {rng.choice(STREETS)}",
+            city=city,
+            region_id=region_id,
+            region=region,
+            zip_code=f"{rng.randint(zip_low, zip_high):05d}",
+            country_id="US",
+            phone=f"{area_code}555{rng.randint(100, 199):04d}",
+        )
+
+    def batch(self, start: int, count: int) -> List[Customer]:
+        return [self.customer(n) for n in range(start, start + count)]
+
+    def next(self) -> Customer:
+        """The next unused customer of this factory; safe to call from several threads"""
+        return self.customer(next(self._sequence))
+
+
+def _encode(customer: Customer) -> bytes:
+    data = json.dumps(asdict(customer), separators=(",", ":")).encode("utf-8")
+    if len(data) >= RECORD_SIZE:
+        raise ValueError(f"Customer record of {len(data)} bytes does not fit RECORD_SIZE={RECORD_SIZE}")
+    return data.ljust(RECORD_SIZE - 1) + b"\n"
+
+
+class CustomerPool:
+    """Customers generated `batch` at a time into a file of fixed-size records, read through mmap"""
+
+    def __init__(self, path: Path, factory: Optional[CustomerFactory] = None, batch: int = DEFAULT_BATCH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.factory = factory or CustomerFactory(default_namespace("pool"))
+        self.batch = batch
+        self.generated = 0
+        self.taken = 0
+        self._map: Optional[mmap.mmap] = None
+        self._lock = threading.Lock()
+        self.path.write_bytes(b"")
+        self._extend()
+
+    def _extend(self):
+        records = self.factory.batch(self.generated, self.batch)
+        with open(self.path, "ab") as f:
+            f.write(b"".join(_encode(c) for c in records))
+        self.generated += len(records)
+        if self._map is not None:
+            self._map.close()
+        with open(self.path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def take(self) -> Customer:
+        """A customer no other test of this run has had"""
+        with self._lock:
+            if self.taken >= self.generated:
+                self._extend()
+            offset = self.taken * RECORD_SIZE
+            self.taken += 1
+            record = self._map[offset:offset + RECORD_SIZE]
+        return Customer(**json.loads(record))
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
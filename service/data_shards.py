@@ -0,0 +1,150 @@
+"""
+Lazy, sharded parametrization over CSV data sets.
+
+A test marked with `@pytest.mark.data_rows("file.csv", id_column="search_term")`
+and taking the `data_row` fixture is parametrized from a `RowIndex` of the file:
+one pass over its raw bytes that keeps the byte offset and test id of each
+record, not the record itself. The row is parsed from its offset only when its
+test runs, so collection costs one sequential read and a few bytes per row.
+
+Rows are assigned to shards by a hash of their id, so the split is the same on
+every machine and does not move when rows are added elsewhere in the file:
+
+- across machines, `--data-shard 2/4` (PLAYWRIGHT_DATA_SHARD) collects only
+  the rows of shard 2 of 4, so CI nodes split a data set without overlap;
+- within a machine, each row is marked `xdist_group("<file>:<n>")` for one of
+  `--data-groups` groups, so `-n 4 --dist loadgroup` keeps a group on one
+  worker. Every worker still collects the same items, as xdist requires.
+"""
+import csv
+import zlib
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from service.csv_service import DATA_PATH
+
+_BOM = b"\xef\xbb\xbf"
+
+
+def parse_shard(value: Optional[str]) -> Optional[Tuple[int, int]]:
+    """"2/4" -> (2, 4); None or "" -> None (no sharding)"""
+    if not value:
+        return None
+    index, _, count = str(value).partition("/")
+    shard = (int(index), int(count))
+    if not 1 <= shard[0] <= shard[1]:
+        raise ValueError(f"Data shard must look like 1/4 .. 4/4, got {value!r}")
+    return shard
+
+
+def row_hash(row_id: str) -> int:
+    return zlib.crc32(row_id.encode("utf-8"))
+
+
+def _records(handle) -> Iterator[Tuple[int, bytes]]:
+    """(offset, raw bytes) of every CSV record; a quoted field may span lines"""
+    offset = handle.tell()
+    record = b""
+    start = offset
+    for line in handle:
+        if not record:
+            start = offset
+        record += line
+        offset += len(line)
+        # An odd number of quotes so far means a quoted field is still open
+        if record.count(b'"') % 2 == 0:
+            yield start, record
+            record = b""
+    if record:
+        yield start, record
+
+
+def _parse(record: bytes) -> List[str]:
+    return next(csv.reader([record.decode("utf-8")]), [])
+
+
+class LazyRow:
+    """One record of a RowIndex: its test id and where to read it from"""
+    __slots__ = ("index", "id", "offset", "group")
+
+    def __init__(self, index: "RowIndex", row_id: str, offset: int, group: Optional[int]):
+        self.index = index
+        self.id = row_id
+        self.offset = offset
+        self.group = group
+
+    def load(self) -> Dict[str, str]:
+        """Parse this record from the file; {column: value} like csv.DictReader"""
+        return self.index.load(self.offset)
+
+    def __repr__(self) -> str:
+        return f"LazyRow({self.index.path.name}:{self.id})"
+
+
+class RowIndex:
+    """Test ids and byte offsets of a CSV's records, limited to one shard"""
+
+    def __init__(self, path: Path, id_column: Optional[str] = None,
+                 shard: Optional[Tuple[int, int]] = None, groups: int = 0):
+        self.path = Path(path)
+        if not self.path.exists():
+            raise FileNotFoundError(f"CSV file not found: {self.path}")
+        self.id_column = id_column
+        self.shard = shard
+        self.groups = groups
+        self.columns: List[str] = []
+        self.total = 0
+        self.rows: List[LazyRow] = []
+        self._build()
+
+    def _build(self):
+        with open(self.path, "rb") as handle:
+            records = _records(handle)
+            header = next(records, None)
+            if header is None:
+                return
+            self.columns = _parse(header[1].lstrip(_BOM).rstrip(b"\r\n"))
+            column = self.columns.index(self.id_column) if self.id_column else None
+            for number, (offset, record) in enumerate(records, start=1):
+                if not record.strip():
+                    continue
+                if column is None:
+                    row_id = f"row{number}"
+                else:
+                    values = _parse(record)
+                    row_id = values[column].strip() if column < len(values) else ""
+                    # No id, no test: the same rows search_terms() leaves out
+                    if not row_id:
+                        continue
+                self.total += 1
+                digest = row_hash(row_id)
+                if self.shard is not None and digest % self.shard[1] != self.shard[0] - 1:
+                    continue
+                # Bits above the shard's so groups stay even within a shard
+                group = (digest >> 16) % self.groups if self.groups else None
+                self.rows.append(LazyRow(self, row_id, offset, group))
+
+    def load(self, offset: int) -> Dict[str, str]:
+        with open(self.path, "rb") as handle:
+            handle.seek(offset)
+            _, record = next(_records(handle))
+        values = _parse(record)
+        return dict(zip(self.columns, values + [""] * (len(self.columns) - len(values))))
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+
+_indexes: Dict[Tuple, RowIndex] = {}
+
+
+def row_index(file_path: str, id_column: Optional[str] = None,
+              shard: Optional[Tuple[int, int]] = None, groups: int = 0) -> RowIndex:
+    """RowIndex of data/<file_path>, shared by every test parametrized over the same file and shard"""
+    path = DATA_PATH / file_path
+    stat = path.stat() if path.exists() else None
+    key = (path, stat and (stat.st_mtime_ns, stat.st_size), id_column, shard, groups)
+    index = _indexes.get(key)
+    if index is None:
+        index = _indexes[key] = RowIndex(path, id_column, shard, groups)
+    return index
@@ -0,0 +1,280 @@
+"""
+Indexed SQLite store of the project's CSV test data (data/*.csv, tests/*.csv).
+
+Each CSV is compiled into its own table, one column per CSV column under a
+snake_case name ("Test Case ID" -> test_case_id) and an index on every column,
+so lookups by category, priority, expected result or case id are index seeks
+instead of file scans:
+
+    store = DataStore.default()
+    store.query("tests/tests.csv", category="Home Page Search", priority="High")
+    store.query("tests/bugs.csv", severity=["High", "Critical"])
+
+Rows come back as dicts keyed by the original CSV headers, the way
+csv.DictReader returns them. The store is rebuilt incrementally: a file whose
+size and mtime are unchanged is not read, one whose content hash is unchanged
+only has its stat updated, and only a file that really changed is re-imported.
+CSVService reads through it.
+
+Rebuild everything with `python -m service.data_store`.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from filelock import FileLock
+
+ROOT_DIR = Path(__file__).parent.parent
+DEFAULT_STORE_PATH = ROOT_DIR / "data" / "test_data.sqlite"
+DEFAULT_SOURCES = ("data/*.csv", "tests/*.csv")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    name TEXT PRIMARY KEY,
+    table_name TEXT NOT NULL,
+    headers TEXT NOT NULL,
+    columns TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    sha1 TEXT NOT NULL,
+    row_count INTEGER NOT NULL
+);
+"""
+
+
+def column_name(header: str) -> str:
+    """SQL column for a CSV header: "Test Case ID" -> "test_case_id" """
+    name = re.sub(r"[^0-9a-zA-Z]+", "_", header).strip("_").lower()
+    return name or "column"
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _sha1(path: Path) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read(path: Path) -> Tuple[List[str], Iterator[List[str]]]:
+    """(headers, rows) of a CSV; blank lines before the header are skipped (tests/bugs.csv has one)"""
+    handle = open(path, newline="", encoding="utf-8-sig")
+    reader = csv.reader(handle)
+    headers: List[str] = []
+    for row in reader:
+        if any(cell.strip() for cell in row):
+            headers = row
+            break
+
+    def rows():
+        with handle:
+            for row in reader:
+                if any(cell.strip() for cell in row):
+                    yield row
+    return headers, rows()
+
+
+class SourceInfo:
+    """What the store knows about one imported CSV"""
+    __slots__ = ("name", "table", "headers", "columns", "key", "sha1", "row_count")
+
+    def __init__(self, row: sqlite3.Row):
+        self.name = row["name"]
+        self.table = row["table_name"]
+        self.headers: List[str] = json.loads(row["headers"])
+        self.columns: List[str] = json.loads(row["columns"])
+        self.key = (row["mtime_ns"], row["size"])
+        self.sha1 = row["sha1"]
+        self.row_count = row["row_count"]
+
+
+class DataStore:
+    """SQLite tables compiled from CSV files, refreshed per file when the file changes"""
+
+    _default: Optional["DataStore"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, path: Path = DEFAULT_STORE_PATH, root: Path = ROOT_DIR):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.root = Path(root)
+        self.lock = FileLock(str(self.path) + ".lock")
+        self._local = threading.local()
+        with self.lock, self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(SCHEMA)
+
+    @classmethod
+    def default(cls) -> "DataStore":
+        """The process-wide store at data/test_data.sqlite"""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, timeout=30)
+        db.row_factory = sqlite3.Row
+        return db
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        # One connection per thread; async_read_csv reads on worker threads
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = self._connect()
+        return db
+
+    def _name(self, path: Path) -> str:
+        path = Path(path).resolve()
+        try:
+            return path.relative_to(self.root.resolve()).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+    def _source(self, name: str) -> Optional[SourceInfo]:
+        row = self.db.execute("SELECT * FROM sources WHERE name = ?", (name,)).fetchone()
+        return SourceInfo(row) if row else None
+
+    def source(self, path) -> SourceInfo:
+        """Up-to-date SourceInfo of a CSV (relative to the project root or absolute), importing it if needed"""
+        path = Path(path) if Path(path).is_absolute() else self.root / path
+        if not path.exists():
+            raise FileNotFoundError(f"CSV file not found: {path}")
+        name = self._name(path)
+        stat = path.stat()
+        key = (stat.st_mtime_ns, stat.st_size)
+        info = self._source(name)
+        if info is not None and info.key == key:
+            return info
+        with self.lock:
+            # Another worker may have imported it while this one waited
+            info = self._source(name)
+            if info is not None and info.key == key:
+                return info
+            sha1 = _sha1(path)
+            if info is not None and info.sha1 == sha1:
+                with self.db:
+                    self.db.execute("UPDATE sources SET mtime_ns = ?, size = ? WHERE name = ?",
+                                    (key[0], key[1], name))
+            else:
+                self._import(name, path, key, sha1)
+            return self._source(name)
+
+    def _import(self, name: str, path: Path, key: Tuple[int, int], sha1: str):
+        headers, rows = _read(path)
+        columns: List[str] = []
+        for header in headers:
+            column = column_name(header)
+            while column in columns or column == "row_number":
+                column += "_"
+            columns.append(column)
+        raw_table = "csv_" + re.sub(r"[^0-9a-zA-Z]+", "_", name).strip("_").lower()
+        table = _quote(raw_table)
+        width = len(columns)
+        placeholders = ", ".join("?" * (width + 1))
+
+        def values():
+            for number, row in enumerate(rows, start=1):
+                # Short rows get NULLs, like csv.DictReader's restval; extra cells are dropped
+                yield [number] + row[:width] + [None] * (width - len(row))
+
+        with self.db as db:
+            # One transaction, so readers see the old rows or the new ones, never an empty table
+            db.execute("BEGIN IMMEDIATE")
+            db.execute(f"DROP TABLE IF EXISTS {table}")
+            db.execute(f"CREATE TABLE {table} (row_number INTEGER PRIMARY KEY, "
+                       + ", ".join(f"{_quote(c)} TEXT" for c in columns) + ")")
+            db.executemany(f"INSERT INTO {table} VALUES ({placeholders})", values())
+            for column in columns:
+                index = _quote(f"{raw_table}__{column}")
+                db.execute(f"CREATE INDEX {index} ON {table} ({_quote(column)})")
+            count = db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            db.execute("INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                       (name, table, json.dumps(headers), json.dumps(columns), key[0], key[1], sha1, count))
+        print(f"Data store: imported {count} rows of {name}")
+
+    def sync(self, patterns: Iterable[str] = DEFAULT_SOURCES) -> Dict[str, int]:
+        """Bring every CSV matching `patterns` up to date and drop files that are gone; {name: rows}"""
+        paths = sorted({p for pattern in patterns for p in self.root.glob(pattern)})
+        counts = {self._name(p): self.source(p).row_count for p in paths}
+        with self.lock:
+            for row in self.db.execute("SELECT name, table_name FROM sources").fetchall():
+                if row["name"] not in counts and not (self.root / row["name"]).exists():
+                    with self.db as db:
+                        db.execute(f"DROP TABLE IF EXISTS {row['table_name']}")
+                        db.execute("DELETE FROM sources WHERE name = ?", (row["name"],))
+        return counts
+
+    def _where(self, info: SourceInfo, conditions: Dict[str, object]) -> Tuple[str, List]:
+        clauses, args = [], []
+        for key, expected in conditions.items():
+            column = column_name(key)
+            if column not in info.columns:
+                raise KeyError(f"{info.name} has no column {key!r}; columns: {', '.join(info.columns)}")
+            if isinstance(expected, (list, tuple, set, frozenset)):
+                expected = list(expected)
+                clauses.append(f"{_quote(column)} IN ({', '.join('?' * len(expected))})")
+                args += expected
+            elif expected is None:
+                clauses.append(f"{_quote(column)} IS NULL")
+            else:
+                clauses.append(f"{_quote(column)} = ?")
+                args.append(str(expected))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", args
+
+    def iter_query(self, path, limit: Optional[int] = None, **conditions) -> Iterator[Dict[str, str]]:
+        """Rows of `path` whose columns equal `conditions` (a list means any of), in file order, from a cursor
+
+        Column names may be given as in the CSV header or in snake_case: priority="High".
+        """
+        info = self.source(path)
+        where, args = self._where(info, conditions)
+        columns = ", ".join(_quote(c) for c in info.columns) or "NULL"
+        sql = f"SELECT {columns} FROM {info.table}{where} ORDER BY row_number"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(limit)
+        headers = info.headers
+        return (dict(zip(headers, row)) for row in self.db.execute(sql, args))
+
+    def query(self, path, limit: Optional[int] = None, **conditions) -> List[Dict[str, str]]:
+        return list(self.iter_query(path, limit=limit, **conditions))
+
+    def get(self, path, **conditions) -> Optional[Dict[str, str]]:
+        """The first matching row, e.g. get("tests/tests.csv", test_case_id="HP-004")"""
+        return next(self.iter_query(path, limit=1, **conditions), None)
+
+    def distinct(self, path, column: str) -> List[str]:
+        """Distinct non-empty values of one column, e.g. the categories of tests.csv"""
+        info = self.source(path)
+        column = column_name(column)
+        if column not in info.columns:
+            raise KeyError(f"{info.name} has no column {column!r}")
+        rows = self.db.execute(f"SELECT DISTINCT {_quote(column)} FROM {info.table} "
+                               f"WHERE {_quote(column)} <> '' ORDER BY {_quote(column)}").fetchall()
+        return [r[0] for r in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile the CSV test data into the SQLite store")
+    parser.add_argument("--store", default=str(DEFAULT_STORE_PATH))
+    parser.add_argument("patterns", nargs="*", default=list(DEFAULT_SOURCES),
+                        help=f"Globs relative to the project root (default: {' '.join(DEFAULT_SOURCES)})")
+    args = parser.parse_args()
+    for name, count in DataStore(Path(args.store)).sync(args.patterns).items():
+        print(f"{name}: {count} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import gzip
+import json
+import os
+import re
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+RECORD = "record"
+REPLAY = "replay"
+
+
+class HarStore:
+    """
+    Per-test HAR archives, compressed and deduplicated by content hash.
+
+    Contexts record with `record_har_content="attach"`, so Playwright writes every
+    response body to its own file named after the body's SHA-1. `save()` gzips the
+    HAR into `tests/<test>.har.gz` and each body into `blobs/<sha[:2]>/<name>.gz`
+    unless a blob with that hash already exists, so a body shared by thousands of
+    recordings (the same JS bundle, the same logo) is stored once.
+
+    `materialize()` rebuilds a test's HAR next to its decompressed bodies in one
+    shared `.replay` directory for `context.route_from_har`.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.tests_dir = self.root / "tests"
+        self.blobs_dir = self.root / "blobs"
+        self.replay_dir = self.root / ".replay"
+
+    @staticmethod
+    def _slug(test_id: str) -> str:
+        return re.sub(r"[^\w.-]+", "_", test_id)[:200]
+
+    def archive_path(self, test_id: str) -> Path:
+        return self.tests_dir / f"{self._slug(test_id)}.har.gz"
+
+    def has(self, test_id: str) -> bool:
+        return self.archive_path(test_id).exists()
+
+    def _blob_path(self, name: str) -> Path:
+        return self.blobs_dir / name[:2] / f"{name}.gz"
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes):
+        # Parallel workers may store the same blob; the rename makes the last writer win cleanly
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def new_recording_dir(self) -> Path:
+        """Scratch directory for one context's HAR and its attached bodies"""
+        return Path(tempfile.mkdtemp(prefix="har-"))
+
+    def save(self, test_id: str, har_path: Path) -> Dict[str, int]:
+        """Compress a recorded HAR and its bodies into the store; returns dedup stats"""
+        har_path = Path(har_path)
+        stats = {"entries": 0, "blobs_new": 0, "blobs_reused": 0}
+        try:
+            with open(har_path, "rb") as f:
+                har = json.load(f)
+            for entry in har["log"]["entries"]:
+                stats["entries"] += 1
+                name = entry.get("response", {}).get("content", {}).get("_file")
+                if not name:
+                    continue
+                blob = self._blob_path(name)
+                if blob.exists():
+                    stats["blobs_reused"] += 1
+                    continue
+                with open(har_path.parent / name, "rb") as f:
+                    self._write_atomic(blob, gzip.compress(f.read()))
+                stats["blobs_new"] += 1
+            self._write_atomic(self.archive_path(test_id), gzip.compress(json.dumps(har).encode("utf-8")))
+        finally:
+            shutil.rmtree(har_path.parent, ignore_errors=True)
+        return stats
+
+    def materialize(self, test_id: str) -> Optional[Path]:
+        """Path of a replayable HAR for `test_id`, or None if it was never recorded"""
+        archive = self.archive_path(test_id)
+        if not archive.exists():
+            return None
+        with gzip.open(archive, "rb") as f:
+            har_bytes = f.read()
+        har = json.loads(har_bytes)
+        for entry in har["log"]["entries"]:
+            name = entry.get("response", {}).get("content", {}).get("_file")
+            if not name or (self.replay_dir / name).exists():
+                continue
+            with gzip.open(self._blob_path(name), "rb") as f:
+                self._write_atomic(self.replay_dir / name, f.read())
+        har_path = self.replay_dir / f"{self._slug(test_id)}.har"
+        self._write_atomic(har_path, har_bytes)
+        return har_path
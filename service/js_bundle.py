@@ -0,0 +1,300 @@
+"""
+The page-side helper library every page object calls into, as `window.__taf`.
+
+Instead of shipping a full script with each `page.evaluate`, the helpers are
+injected once per context with `add_init_script` (see `install`) and page objects
+call them by name:
+
+    js_bundle.call(page, "minicart.state")
+    js_bundle.call(page, "cart.remove", 0)
+
+`call` sends only the name and the arguments. The bundle is versioned by a hash
+of its source; a document that has no bundle, or an older one (a page opened
+before `install`, or a context shared across a code change), gets it injected by
+the first call, so callers never need to know how the page was created.
+
+Namespaces:
+    minicart  state(), when(conditions, timeout)     MutationObserver-driven dropdown state
+    cart      remove(index), confirm()                minicart delete button and confirm modal
+    mutations arm(selector, key), fired(key)          one-shot DOM change flags
+    product   snapshot(selectors, timeout)            product view in one read
+    orders    details(selectors, itemRows)            guest order view in one read
+    forms     fill(fields, verify)                    batched, Knockout-verified field fill
+"""
+import hashlib
+from typing import Any
+
+_BUNDLE_SOURCE = """
+(() => {
+    const VERSION = '__TAF_VERSION__';
+    if (window.__taf && window.__taf.version === VERSION) return;
+
+    const visible = (el) => !!el && !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+    const text = (selector, root = document) => {
+        const el = root.querySelector(selector);
+        return el ? el.textContent.trim() : null;
+    };
+
+    // Minicart: a MutationObserver keeps the state (widget ready, dropdown open, items,
+    // subtotal, header counter) current from the first call on; when() resolves with it as
+    // soon as it matches, e.g. {open: true} or {count__lt: 3} (suffixes: __lt, __gt, __ne).
+    const readMinicart = () => {
+        const block = document.querySelector('#ui-id-1');
+        const wrapper = document.querySelector('#minicart-content-wrapper');
+        const style = block ? window.getComputedStyle(block) : null;
+        const counter = text('.counter-number');
+        return {
+            ready: !!block && !!wrapper && !!wrapper.querySelector('.block-content, .subtitle.empty'),
+            // getClientRects is empty when the dialog wrapper around #ui-id-1 is hidden too
+            open: !!style && style.display !== 'none' && style.visibility !== 'hidden'
+                && block.getClientRects().length > 0,
+            empty: !!(wrapper && wrapper.querySelector('.subtitle.empty')),
+            count: document.querySelectorAll('#mini-cart .item.product.product-item').length,
+            subtotal: wrapper ? text('.subtotal .price-container .price', wrapper) : null,
+            counter: counter ? (parseInt(counter, 10) || 0) : 0,
+        };
+    };
+    const matches = (state, conditions) => Object.entries(conditions).every(([key, expected]) => {
+        const [field, op] = key.split('__');
+        const actual = state[field];
+        if (op === 'lt') return actual < expected;
+        if (op === 'gt') return actual > expected;
+        if (op === 'ne') return actual !== expected;
+        return actual === expected;
+    });
+    let tracker = null;
+    const minicartTracker = () => {
+        if (tracker) return tracker;
+        tracker = {state: readMinicart(), changes: 0, waiters: []};
+        tracker.refresh = () => {
+            const state = readMinicart();
+            if (JSON.stringify(state) !== JSON.stringify(tracker.state)) {
+                tracker.state = state;
+                tracker.changes += 1;
+            }
+            tracker.waiters = tracker.waiters.filter((waiter) => {
+                if (!matches(tracker.state, waiter.conditions)) return true;
+                waiter.resolve(tracker.state);
+                return false;
+            });
+            return tracker.state;
+        };
+        // Mutation records arrive batched per task, so this is one read per DOM update
+        new MutationObserver(tracker.refresh).observe(document.documentElement,
+            {childList: true, subtree: true, attributes: true, characterData: true});
+        return tracker;
+    };
+    const minicart = {
+        state: () => minicartTracker().refresh(),
+        when: (conditions, timeout) => new Promise((resolve, reject) => {
+            const t = minicartTracker();
+            if (matches(t.refresh(), conditions)) return resolve(t.state);
+            const waiter = {conditions, resolve};
+            t.waiters.push(waiter);
+            setTimeout(() => {
+                if (!t.waiters.includes(waiter)) return;
+                t.waiters = t.waiters.filter((w) => w !== waiter);
+                reject(new Error(`minicart ${JSON.stringify(conditions)} not reached within ${timeout}ms, `
+                    + `state ${JSON.stringify(t.state)}`));
+            }, timeout);
+        }),
+    };
+
+    // Cart: clicks made in the page, which also works when the minicart item or the modal
+    // button sits outside the viewport. Both return whether there was something to click.
+    const cart = {
+        remove: (index) => {
+            const item = document.querySelectorAll('#mini-cart .item.product.product-item')[index];
+            const button = item && item.querySelector('.action.delete');
+            if (!button) return false;
+            button.click();
+            return true;
+        },
+        confirm: () => {
+            const button = document.querySelector('.action-primary.action-accept');
+            if (!button) return false;
+            button.scrollIntoView({block: 'center'});
+            button.click();
+            return true;
+        },
+    };
+
+    // Mutations: arm() sets a one-shot observer on `selector` (or <body> if it is not
+    // rendered yet), fired() tells whether the DOM under it has changed since
+    const flags = {};
+    const mutations = {
+        arm: (selector, key) => {
+            flags[key] = false;
+            const target = document.querySelector(selector) || document.body;
+            const observer = new MutationObserver(() => {
+                flags[key] = true;
+                observer.disconnect();
+            });
+            observer.observe(target, {childList: true, subtree: true, characterData: true, attributes: true});
+        },
+        fired: (key) => flags[key] === true,
+    };
+
+    // Product: on a product page waits in the page (not over the protocol) until the title is
+    // rendered and the swatch renderer has filled .swatch-opt, or `timeout` ms pass; `ready`
+    // says which. Other pages (the cart counter is read from any of them) are read as they are.
+    const product = {
+        snapshot: async (selectors, timeout) => {
+            const rendered = () => !!document.body && (!document.body.classList.contains('catalog-product-view')
+                || (!!document.querySelector(selectors.name) && !document.querySelector('.swatch-opt:empty')));
+            const deadline = Date.now() + timeout;
+            while (!rendered() && Date.now() < deadline) {
+                await new Promise((resolve) => setTimeout(resolve, 50));
+            }
+            const swatches = (selector) => Array.from(document.querySelectorAll(selector)).map((el, index) => ({
+                index,
+                option_id: el.getAttribute('data-option-id'),
+                label: el.getAttribute('data-option-label') || el.getAttribute('aria-label') || el.textContent.trim(),
+                enabled: !el.classList.contains('disabled') && !el.hasAttribute('disabled')
+                    && el.getAttribute('aria-disabled') !== 'true',
+                selected: el.classList.contains('selected') || el.getAttribute('aria-checked') === 'true',
+            }));
+            const qty = document.querySelector(selectors.quantity);
+            return {
+                url: location.href,
+                ready: rendered(),
+                name: text(selectors.name),
+                price: text(selectors.price),
+                sku: text(selectors.sku),
+                stock: text(selectors.stock),
+                sizes: swatches(selectors.sizes),
+                colors: swatches(selectors.colors),
+                quantity: qty ? parseInt(qty.value, 10) || null : null,
+                cart_count: parseInt(text(selectors.cart_count) || '', 10) || 0,
+            };
+        },
+    };
+
+    // Orders: every field of the guest order view (and the form's error message); a field is
+    // null when its element is missing or hidden, like the is_visible() checks it replaces
+    const orders = {
+        details: (selectors, itemRows) => {
+            const raw = (el) => el ? el.textContent : null;
+            const fields = {};
+            for (const [field, selector] of Object.entries(selectors)) {
+                const el = document.querySelector(selector);
+                fields[field] = visible(el) ? raw(el) : null;
+            }
+            const productNames = Array.from(document.querySelectorAll(selectors.product_names)).map(raw);
+            const items = Array.from(document.querySelectorAll(itemRows)).map((row) => ({
+                name: text('.product.name, .product-item-name', row),
+                sku: text('.col.sku', row),
+                price: text('.col.price .price', row),
+                qty: text('.col.qty', row),
+                subtotal: text('.col.subtotal .price', row),
+            }));
+            return {fields, productNames, items, url: location.href};
+        },
+    };
+
+    // Forms: native value setter plus bubbling input/change events (what Knockout's value and
+    // textInput bindings listen to), then, with `verify`, the bound model read back via ko.dataFor.
+    // Magento loads Knockout as an AMD module, so there is no window.ko: ask RequireJS for it
+    // (the synchronous form only returns modules that are already loaded).
+    const knockout = () => {
+        if (typeof window.requirejs === 'function') {
+            try {
+                return window.requirejs('knockout');
+            } catch (e) {
+                // not loaded on this page
+            }
+        }
+        return window.ko;
+    };
+    const boundValue = (ko, el) => {
+        if (!ko || typeof ko.dataFor !== 'function') return undefined;
+        const model = ko.dataFor(el);
+        if (!model) return undefined;
+        for (const key of ['value', 'checked', el.name]) {
+            if (key && ko.isObservable(model[key])) return model[key]();
+        }
+        return undefined;
+    };
+    const forms = {
+        fill: (fields, verify) => {
+            const ko = verify ? knockout() : undefined;
+            return fields.map(({name, selector, nth, value}) => {
+                const el = document.querySelectorAll(selector)[nth];
+                if (!el) return {name, kind: null, applied: false, bound: null, reason: 'missing'};
+                const kind = el.tagName === 'SELECT' ? 'select'
+                    : (el.type === 'checkbox' || el.type === 'radio') ? 'check' : 'text';
+                if (el.disabled || el.readOnly) return {name, kind, applied: false, bound: null, reason: 'disabled'};
+                if (!visible(el)) return {name, kind, applied: false, bound: null, reason: 'hidden'};
+                let applied;
+                if (kind === 'check') {
+                    // A click is what Knockout's checked binding listens to
+                    if (el.checked !== !!value) el.click();
+                    applied = el.checked === !!value;
+                } else {
+                    const wanted = String(value);
+                    // The prototype setter bypasses any instance-level value override a framework installed
+                    Object.getOwnPropertyDescriptor(Object.getPrototypeOf(el), 'value').set.call(el, wanted);
+                    el.dispatchEvent(new Event('input', {bubbles: true}));
+                    el.dispatchEvent(new Event('change', {bubbles: true}));
+                    applied = el.value === wanted;
+                }
+                if (!applied) return {name, kind, applied, bound: null, reason: 'rejected'};
+                if (!verify) return {name, kind, applied, bound: null, reason: null};
+                const model = boundValue(ko, el);
+                // Nothing to read back: the value is in the DOM, but not known to be in the form state
+                if (model === undefined) return {name, kind, applied, bound: null, reason: 'unverified'};
+                const bound = kind === 'check' ? !!model === !!value : String(model ?? '') === String(value);
+                return {name, kind, applied, bound, reason: bound ? null : 'unbound'};
+            });
+        },
+    };
+
+    window.__taf = {version: VERSION, minicart, cart, mutations, product, orders, forms};
+})();
+//# sourceURL=taf-bundle.js
+"""
+
+# Hash of the source, so an edited bundle replaces the one a long-lived page already has
+BUNDLE_VERSION = hashlib.sha1(_BUNDLE_SOURCE.encode()).hexdigest()[:12]
+BUNDLE_JS = _BUNDLE_SOURCE.replace("__TAF_VERSION__", BUNDLE_VERSION)
+# The same script as a function, for injecting into a document that is already loaded
+_INJECT_JS = "() => {\n" + BUNDLE_JS + "\n}"
+
+_MISSING = "__taf_missing__"
+# The whole payload of a call: `[version, "namespace.function", [args]]`
+CALL_JS = """
+    ([version, name, args]) => {
+        const taf = window.__taf;
+        if (!taf || taf.version !== version) return '__taf_missing__';
+        const [namespace, fn] = name.split('.');
+        return taf[namespace][fn](...args);
+    }
+"""
+
+
+def install(target):
+    """Inject the bundle into every document of a BrowserContext (or Page) before its own scripts
+
+    Works for sync and async targets alike; await the result for the latter.
+    """
+    return target.add_init_script(BUNDLE_JS)
+
+
+def call(page, name: str, *args) -> Any:
+    """Run `window.__taf.<name>(*args)` in the page, injecting the bundle first if it is missing"""
+    payload = [BUNDLE_VERSION, name, list(args)]
+    result = page.evaluate(CALL_JS, payload)
+    if isinstance(result, str) and result == _MISSING:
+        page.evaluate(_INJECT_JS)
+        result = page.evaluate(CALL_JS, payload)
+    return result
+
+
+async def async_call(page, name: str, *args) -> Any:
+    """playwright.async_api twin of `call`"""
+    payload = [BUNDLE_VERSION, name, list(args)]
+    result = await page.evaluate(CALL_JS, payload)
+    if isinstance(result, str) and result == _MISSING:
+        await page.evaluate(_INJECT_JS)
+        result = await page.evaluate(CALL_JS, payload)
+    return result
@@ -0,0 +1,1569 @@
+"""
+Local stand-in for the Magento Luma storefront.
+
+Serves the DOM structures and AJAX endpoints the page objects in components/ rely on:
+the header and minicart (HeaderContent, ProductPage), search results, configurable
+products with size/color swatches, the two-step checkout (CheckoutPage), customer
+login (LoginPage) and the guest Orders and Returns lookup (OrdersReturnsPage).
+State (carts, customers, orders) lives in memory per server process.
+
+Run it standalone:
+    uvicorn service.magento_stub:app --port 8080
+    pytest e2e/ --base-url http://127.0.0.1:8080/
+
+or let the fixtures start one per worker with `--magento-stub=on`.
+
+Artificial latency (ms) is read from MAGENTO_STUB_LATENCY_MS (documents),
+MAGENTO_STUB_AJAX_LATENCY_MS (XHR/REST, defaults to the document latency),
+MAGENTO_STUB_STATIC_LATENCY_MS (images) and MAGENTO_STUB_JITTER_MS, and can be
+changed at runtime with POST /__stub/latency.
+"""
+import asyncio
+import html
+import json
+import os
+import random
+import secrets
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, quote
+
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, Response
+
+app = FastAPI()
+
+SESSION_COOKIE = "PHPSESSID"
+VERSION_COOKIE = "private_content_version"
+MESSAGES_COOKIE = "mage-messages"
+GUEST_VIEW_COOKIE = "guest-view"
+
+LATENCY_MS = {
+    "page": float(os.getenv("MAGENTO_STUB_LATENCY_MS", "0")),
+    "ajax": float(os.getenv("MAGENTO_STUB_AJAX_LATENCY_MS", os.getenv("MAGENTO_STUB_LATENCY_MS", "0"))),
+    "static": float(os.getenv("MAGENTO_STUB_STATIC_LATENCY_MS", "0")),
+    "jitter": float(os.getenv("MAGENTO_STUB_JITTER_MS", "0")),
+}
+
+SIZE_ATTRIBUTE_ID = "144"
+COLOR_ATTRIBUTE_ID = "93"
+SIZES = [("166", "XS"), ("167", "S"), ("168", "M"), ("169", "L"), ("170", "XL")]
+COLORS = {"49": ("Black", "#000000"), "50": ("Blue", "#1857f7"), "53": ("Green", "#53a828"),
+          "56": ("Orange", "#eb6703"), "57": ("Purple", "#ef3dff"), "58": ("Red", "#ff0000"),
+          "59": ("White", "#ffffff"), "60": ("Yellow", "#ffd500")}
+
+PRODUCTS = [
+    {"id": "1", "sku": "MJ03", "name": "Montana Wind Jacket", "price": 49.00, "category": "men",
+     "keywords": ["jacket", "jackets", "wind"], "colors": ["49", "56", "53"]},
+    {"id": "2", "sku": "MJ06", "name": "Jupiter All-Weather Trainer", "price": 56.99, "category": "men",
+     "keywords": ["jacket", "jackets", "trainer"], "colors": ["50", "57", "56"]},
+    {"id": "3", "sku": "WJ12", "name": "Olivia 1/4 Zip Light Jacket", "price": 77.00, "category": "women",
+     "keywords": ["jacket", "jackets", "zip"], "colors": ["49", "50", "57"]},
+    {"id": "4", "sku": "MP01", "name": "Caesar Warm-Up Pant", "price": 35.00, "category": "men",
+     "keywords": ["pant", "pants", "warm-up"], "colors": ["49", "50", "57"]},
+    {"id": "5", "sku": "WP07", "name": "Karmen Yoga Pant", "price": 39.00, "category": "women",
+     "keywords": ["pant", "pants", "yoga"], "colors": ["49", "59", "60"]},
+    {"id": "6", "sku": "MH07", "name": "Hero Hoodie", "price": 54.00, "category": "men",
+     "keywords": ["hoodie", "hoodies", "sweatshirt"], "colors": ["49", "53", "58"]},
+    {"id": "7", "sku": "WH01", "name": "Mona Pullover Hoodlie", "price": 57.00, "category": "women",
+     "keywords": ["hoodie", "hoodies", "pullover"], "colors": ["56", "57", "60"]},
+]
+for _product in PRODUCTS:
+    _product["slug"] = _product["name"].lower().replace("/", "-").replace(" ", "-")
+PRODUCTS_BY_SLUG = {p["slug"]: p for p in PRODUCTS}
+PRODUCTS_BY_ID = {p["id"]: p for p in PRODUCTS}
+
+CATEGORIES = [("what-is-new", "What's New"), ("women", "Women"), ("men", "Men"),
+              ("gear", "Gear"), ("training", "Training"), ("sale", "Sale")]
+
+# Magento region ids for United States
+US_REGIONS = [("1", "Alabama"), ("2", "Alaska"), ("4", "Arizona"), ("5", "Arkansas"), ("12", "California"),
+              ("13", "Colorado"), ("18", "Florida"), ("19", "Georgia"), ("23", "Illinois"),
+              ("32", "Massachusetts"), ("43", "New York"), ("57", "Texas"), ("62", "Washington")]
+COUNTRIES = [("US", "United States"), ("CA", "Canada"), ("GB", "United Kingdom")]
+SHIPPING_METHODS = [("tablerate", "bestway", "Best Way", "Table Rate", 0.0),
+                    ("flatrate", "flatrate", "Fixed", "Flat Rate", 5.0)]
+
+SESSIONS: Dict[str, dict] = {}
+QUOTES: Dict[str, str] = {}  # masked quote id -> session id
+ORDERS: Dict[str, dict] = {}  # increment id -> order
+
+CSS = """
+body { font-family: sans-serif; margin: 0; }
+.panel.header, .header.content, .page-main { max-width: 1080px; margin: 0 auto; padding: 8px 20px; }
+.header.links { list-style: none; display: flex; gap: 16px; margin: 0; padding: 0; }
+.header.content { display: flex; align-items: center; gap: 24px; }
+.action.nav-toggle, .section-item-title, #store\\.links, .no-display { display: none; }
+.minicart-wrapper { position: relative; margin-left: auto; }
+.counter.qty { background: #ff5501; color: #fff; border-radius: 8px; padding: 0 6px; }
+.counter.qty.empty { display: none; }
+.mage-dropdown-dialog {
+    position: absolute; right: 0; top: 32px; z-index: 100;
+    background: #fff; border: 1px solid #bbb; width: 360px; padding: 12px;
+}
+.navigation ul { list-style: none; display: flex; gap: 20px; padding: 8px 20px; margin: 0; background: #f0f0f0; }
+.product-items { list-style: none; display: flex; flex-wrap: wrap; gap: 20px; padding: 0; }
+.product-item { width: 220px; }
+.minicart-items { list-style: none; padding: 0; }
+.minicart-items .product-item { width: auto; border-top: 1px solid #ddd; padding: 6px 0; }
+.swatch-attribute-options { display: flex; gap: 6px; }
+.swatch-option {
+    min-width: 30px; height: 30px; line-height: 30px; text-align: center; border: 1px solid #ccc; cursor: pointer;
+}
+.swatch-option.selected { outline: 2px solid #ff5501; }
+.mage-error { color: #e02b27; }
+.message { padding: 10px; margin: 8px 0; }
+.message-success { background: #e5efe5; }
+.message-error { background: #fae5e5; }
+.message.notice { background: #fdf0d5; }
+.modal-popup { position: fixed; inset: 0; background: rgba(0, 0, 0, .35); z-index: 900; }
+.modal-popup .modal-inner-wrap { background: #fff; width: 420px; margin: 120px auto; padding: 20px; }
+.checkout-container { display: flex; gap: 40px; }
+.opc-wrapper { flex: 1; }
+.opc { list-style: none; padding: 0; }
+.field { margin: 6px 0; }
+.payment-option-content { display: none; }
+.payment-option._active .payment-option-content { display: block; }
+"""
+
+STOREFRONT_JS = r"""
+(function () {
+    var formKey = document.body.getAttribute('data-form-key');
+    var STORAGE = 'mage-cache-storage';
+    var INVALIDATION = 'mage-cache-storage-section-invalidation';
+    var VERSION = 'private_content_version';
+
+    function readJson(key) {
+        try { return JSON.parse(localStorage.getItem(key)) || {}; } catch (e) { return {}; }
+    }
+    function cookie(name) {
+        var match = document.cookie.match(new RegExp('(?:^|; )' + name + '=([^;]*)'));
+        return match ? decodeURIComponent(match[1]) : null;
+    }
+    function escapeHtml(value) {
+        var div = document.createElement('div');
+        div.textContent = value == null ? '' : String(value);
+        return div.innerHTML;
+    }
+    function money(value) { return '$' + Number(value || 0).toFixed(2); }
+    function xhr(url, options) {
+        options = options || {};
+        options.credentials = 'same-origin';
+        options.headers = Object.assign({'X-Requested-With': 'XMLHttpRequest'}, options.headers || {});
+        return fetch(url, options);
+    }
+    function post(url, data) {
+        var params = new URLSearchParams(data || {});
+        params.set('form_key', formKey);
+        return xhr(url, {method: 'POST', body: params});
+    }
+
+    function renderCart(cart) {
+        var count = cart.summary_count || 0;
+        document.querySelectorAll('.minicart-wrapper .counter.qty').forEach(function (counter) {
+            counter.classList.toggle('empty', !count);
+            counter.querySelector('.counter-number').textContent = count ? String(count) : '';
+        });
+        var wrapper = document.getElementById('minicart-content-wrapper');
+        if (!wrapper) return;
+        var items = cart.items || [];
+        var content = '<div class="block-title"><strong><span class="text">My Cart</span></strong></div>' +
+            '<button type="button" id="btn-minicart-close" class="action close" title="Close">' +
+            '<span>Close</span></button>' +
+            '<div class="block-content">';
+        if (!items.length) {
+            content += '<strong class="subtitle empty">You have no items in your shopping cart.</strong>';
+        } else {
+            content += '<div class="items-total"><span class="count">' + count + '</span> ' +
+                '<span>Items in Cart</span></div>' +
+                '<div class="subtotal"><span class="label">Cart Subtotal</span><div class="amount price-container">' +
+                '<span class="price-wrapper"><span class="price">' + money(cart.subtotalAmount) +
+                '</span></span></div></div>' +
+                '<div class="actions"><div class="primary"><button id="top-cart-btn-checkout" type="button" ' +
+                'class="action primary checkout" title="Proceed to Checkout">Proceed to Checkout</button></div></div>' +
+                '<strong class="subtitle">Recently added item(s)</strong>' +
+                '<div class="minicart-items-wrapper"><ol id="mini-cart" class="minicart-items">';
+            items.forEach(function (item) {
+                var options = (item.options || []).map(function (option) {
+                    return '<dt class="label">' + escapeHtml(option.label) + '</dt>' +
+                        '<dd class="values">' + escapeHtml(option.value) + '</dd>';
+                }).join('');
+                content += '<li class="item product product-item" data-item-id="' + item.item_id + '">' +
+                    '<div class="product"><div class="product-item-details"><strong class="product-item-name">' +
+                    '<a href="' + item.product_url + '">' + escapeHtml(item.product_name) + '</a></strong>' +
+                    '<div class="product options"><dl class="product options list">' + options + '</dl></div>' +
+                    '<div class="product-item-pricing"><span class="price">' + money(item.product_price_value) +
+                    '</span><div class="details-qty qty"><label class="label">Qty</label>' +
+                    '<input class="item-qty cart-item-qty" ' +
+                    'data-cart-item="' + item.item_id + '" value="' + item.qty + '"></div></div>' +
+                    '<div class="product actions"><div class="secondary">' +
+                    '<a href="#" class="action delete" data-cart-item="' + item.item_id + '" title="Remove item">' +
+                    '<span>Remove</span></a></div></div></div></div></li>';
+            });
+            content += '</ol></div><div class="actions"><div class="secondary">' +
+                '<a class="action viewcart" href="/checkout/cart/"><span>View and Edit Cart</span></a></div></div>';
+        }
+        wrapper.innerHTML = content + '</div>';
+    }
+
+    function renderCustomer(customer) {
+        var greet = document.querySelector('.panel.header li.greet.welcome');
+        if (greet && customer.fullname) {
+            greet.innerHTML = '<span class="logged-in">Welcome, ' + escapeHtml(customer.fullname) + '!</span>';
+        }
+    }
+
+    function render(cache) {
+        renderCart(cache.cart || {});
+        renderCustomer(cache.customer || {});
+    }
+
+    function reload(sections) {
+        var url = '/customer/section/load/?sections=' + encodeURIComponent(sections.join(',')) +
+            '&force_new_section_timestamp=true&_=' + Date.now();
+        return xhr(url).then(function (response) { return response.json(); }).then(function (data) {
+            var cache = readJson(STORAGE);
+            var invalid = readJson(INVALIDATION);
+            Object.keys(data).forEach(function (name) {
+                cache[name] = data[name];
+                delete invalid[name];
+            });
+            localStorage.setItem(STORAGE, JSON.stringify(cache));
+            localStorage.setItem(INVALIDATION, JSON.stringify(invalid));
+            localStorage.setItem(VERSION, cookie(VERSION) || '');
+            render(cache);
+            return cache;
+        });
+    }
+    window.customerData = {
+        reload: reload,
+        get: function (name) { return readJson(STORAGE)[name]; }
+    };
+
+    function setMinicart(open) {
+        var dialog = document.querySelector('.mage-dropdown-dialog');
+        var block = document.getElementById('ui-id-1');
+        if (!dialog || !block) return;
+        dialog.style.display = open ? 'block' : 'none';
+        block.style.display = open ? 'block' : 'none';
+        document.querySelector('.action.showcart').classList.toggle('active', open);
+    }
+
+    function confirmModal(text, onAccept) {
+        var modal = document.createElement('aside');
+        modal.className = 'modal-popup confirm _show';
+        modal.innerHTML = '<div class="modal-inner-wrap"><div class="modal-content"><div>' + text + '</div></div>' +
+            '<footer class="modal-footer">' +
+            '<button class="action-secondary action-dismiss" type="button"><span>Cancel</span></button>' +
+            '<button class="action-primary action-accept" type="button"><span>OK</span></button></footer></div>';
+        document.body.appendChild(modal);
+        modal.querySelector('.action-accept').addEventListener('click', function () { modal.remove(); onAccept(); });
+        modal.querySelector('.action-dismiss').addEventListener('click', function () { modal.remove(); });
+    }
+
+    function showMessage(type, text) {
+        var container = document.querySelector('.page.messages');
+        if (!container) return;
+        container.innerHTML = '<div role="alert" class="message-' + type + ' ' + type + ' message">' +
+            '<div>' + text + '</div></div>';
+    }
+
+    document.addEventListener('click', function (event) {
+        var target = event.target;
+        var option = target.closest('.swatch-option');
+        if (option) {
+            var attribute = option.closest('.swatch-attribute');
+            attribute.querySelectorAll('.swatch-option').forEach(function (o) { o.classList.remove('selected'); });
+            option.classList.add('selected');
+            attribute.querySelector('.swatch-input').value = option.getAttribute('data-option-id');
+            attribute.querySelector('.swatch-attribute-selected-option').textContent =
+                option.getAttribute('data-option-label');
+            attribute.setAttribute('data-option-selected', option.getAttribute('data-option-id'));
+            var error = attribute.querySelector('.mage-error');
+            if (error) error.remove();
+            return;
+        }
+        if (target.closest('.action.showcart')) {
+            event.preventDefault();
+            var block = document.getElementById('ui-id-1');
+            setMinicart(!block || block.style.display === 'none');
+            return;
+        }
+        if (target.closest('#btn-minicart-close')) {
+            setMinicart(false);
+            return;
+        }
+        if (target.closest('#top-cart-btn-checkout')) {
+            window.location.href = '/checkout/';
+            return;
+        }
+        var remove = target.closest('#mini-cart .action.delete');
+        if (remove) {
+            event.preventDefault();
+            confirmModal('Are you sure you would like to remove this item from the shopping cart?', function () {
+                post('/checkout/sidebar/removeItem/', {item_id: remove.getAttribute('data-cart-item')})
+                    .then(function (response) { return response.json(); })
+                    .then(function () { return reload(['cart', 'messages']); });
+            });
+        }
+    });
+
+    document.addEventListener('submit', function (event) {
+        var form = event.target;
+        if (form.id !== 'product_addtocart_form') return;
+        event.preventDefault();
+        var missing = 0;
+        form.querySelectorAll('.swatch-attribute').forEach(function (attribute) {
+            if (attribute.querySelector('.swatch-input').value) return;
+            missing++;
+            if (!attribute.querySelector('.mage-error')) {
+                attribute.insertAdjacentHTML('beforeend', '<div class="mage-error">This is a required field.</div>');
+            }
+        });
+        if (missing) return;
+        var button = document.getElementById('product-addtocart-button');
+        button.disabled = true;
+        button.querySelector('span').textContent = 'Adding...';
+        xhr(form.action, {method: 'POST', body: new URLSearchParams(new FormData(form))})
+            .then(function (response) { return response.json(); })
+            .then(function (result) {
+                button.disabled = false;
+                button.querySelector('span').textContent = 'Add to Cart';
+                showMessage(result.error ? 'error' : 'success', result.message);
+                return reload(['cart', 'messages']);
+            });
+    });
+
+    document.querySelectorAll('nav.navigation > ul').forEach(function (menu) { menu.classList.add('ui-menu'); });
+
+    // Like Magento_Theme/js/view/messages: messages set before a redirect come in the
+    // mage-messages cookie and are rendered, then cleared, once the page has loaded
+    setTimeout(function () {
+        var raw = cookie('mage-messages');
+        if (!raw) return;
+        var flashed;
+        try { flashed = JSON.parse(raw); } catch (e) { flashed = []; }
+        document.cookie = 'mage-messages=; path=/; max-age=0';
+        flashed.forEach(function (message) { showMessage(message.type, escapeHtml(message.text)); });
+    }, 0);
+
+    // Same rules as Magento's customer-data: a changed private_content_version cookie or an
+    // invalidated/missing section triggers a reload, otherwise the cached sections are rendered
+    var cache = readJson(STORAGE);
+    render(cache);
+    var stale = Object.keys(readJson(INVALIDATION));
+    if ((cookie(VERSION) || '') !== (localStorage.getItem(VERSION) || '')) {
+        stale = ['cart', 'customer', 'messages'];
+    }
+    ['cart', 'customer'].forEach(function (name) {
+        if (!cache[name] && stale.indexOf(name) < 0) stale.push(name);
+    });
+    if (stale.length) reload(stale);
+})();
+"""
+
+CHECKOUT_JS = r"""
+(function () {
+    // Just enough of Knockout for form-state checks: each field has a model whose value
+    // observable follows the element on "change", like the value binding; a value set
+    // without events never reaches the model. As in Magento it is an AMD module reached
+    // through RequireJS, not a window.ko global.
+    if (typeof window.requirejs === 'function') return;
+    var models = new WeakMap();
+    function observable(value) {
+        function read() { return read.current; }
+        read.current = value;
+        read.isObservable = true;
+        return read;
+    }
+    var fields = '#checkout-step-shipping input, #checkout-step-shipping select, .block-authentication input';
+    document.querySelectorAll(fields).forEach(function (element) {
+        var model = {value: observable(element.value)};
+        models.set(element, model);
+        element.addEventListener('change', function () { model.value.current = element.value; });
+    });
+    var modules = {
+        knockout: {
+            dataFor: function (element) { return models.get(element); },
+            isObservable: function (value) { return typeof value === 'function' && value.isObservable === true; }
+        }
+    };
+    window.requirejs = window.require = function (name) {
+        if (!(name in modules)) throw new Error('Module name "' + name + '" has not been loaded yet');
+        return modules[name];
+    };
+})();
+(function () {
+    var config = window.checkoutConfig;
+    var base = '/rest/default/V1/guest-carts/' + config.quoteData.entity_id;
+
+    function api(method, path, payload) {
+        return fetch(base + path, {
+            method: method,
+            credentials: 'same-origin',
+            headers: {'Content-Type': 'application/json', 'X-Requested-With': 'XMLHttpRequest'},
+            body: payload ? JSON.stringify(payload) : undefined
+        }).then(function (response) {
+            return response.json().then(function (data) { return {ok: response.ok, data: data}; });
+        });
+    }
+    function field(name) {
+        var element = document.querySelector('#co-shipping-form [name="' + name + '"]');
+        return element ? element.value.trim() : '';
+    }
+    function email() {
+        var input = document.getElementById('customer-email');
+        return input ? input.value.trim() : config.customerData.email;
+    }
+    function address() {
+        return {
+            firstname: field('firstname'), lastname: field('lastname'), company: field('company'),
+            street: [field('street[0]'), field('street[1]'), field('street[2]')].filter(Boolean),
+            city: field('city'), region_id: field('region_id'), postcode: field('postcode'),
+            country_id: field('country_id'), telephone: field('telephone')
+        };
+    }
+    function money(value) { return '$' + Number(value || 0).toFixed(2); }
+    function setTotals(totals) {
+        document.querySelectorAll('[data-total]').forEach(function (element) {
+            element.textContent = money(totals[element.getAttribute('data-total')]);
+        });
+    }
+    function fieldError(element, text) {
+        var holder = element.closest('.field');
+        var error = holder.querySelector('.mage-error');
+        if (!text) { if (error) error.remove(); return; }
+        if (!error) holder.insertAdjacentHTML('beforeend', '<div class="mage-error">' + text + '</div>');
+    }
+
+    document.querySelector('.action-auth-toggle').addEventListener('click', function () {
+        document.querySelector('.block-authentication').style.display = 'block';
+    });
+    document.querySelector('.action.action-login').addEventListener('click', function (event) {
+        event.preventDefault();
+        fetch('/customer/ajax/login', {
+            method: 'POST',
+            credentials: 'same-origin',
+            headers: {'Content-Type': 'application/json', 'X-Requested-With': 'XMLHttpRequest'},
+            body: JSON.stringify({
+                username: document.getElementById('login-email').value,
+                password: document.getElementById('login-password').value
+            })
+        }).then(function (response) { return response.json(); }).then(function (result) {
+            if (result.errors) {
+                document.querySelector('.block-authentication .messages').textContent = result.message;
+            } else {
+                window.location.reload();
+            }
+        });
+    });
+
+    var continueButton = document.querySelector('#shipping-method-buttons-container .action.continue');
+    continueButton.addEventListener('click', function (event) {
+        event.preventDefault();
+        var valid = true;
+        var emailInput = document.getElementById('customer-email');
+        if (emailInput) {
+            var ok = /^[^@\s]+@[^@\s]+\.[^@\s]+$/.test(emailInput.value.trim());
+            fieldError(emailInput, ok ? null : 'Please enter a valid email address (Ex: johndoe@domain.com).');
+            valid = valid && ok;
+        }
+        ['firstname', 'lastname', 'street[0]', 'city', 'postcode', 'telephone'].forEach(function (name) {
+            var input = document.querySelector('#co-shipping-form [name="' + name + '"]');
+            var filled = !!input.value.trim();
+            fieldError(input, filled ? null : 'This is a required field.');
+            valid = valid && filled;
+        });
+        var method = document.querySelector('.table-checkout-shipping-method input[type="radio"]:checked');
+        var methodError = document.querySelector('#opc-shipping_method .message.error');
+        methodError.style.display = method ? 'none' : 'block';
+        if (!valid || !method) return;
+        var codes = method.value.split('_');
+        api('POST', '/shipping-information', {
+            addressInformation: {
+                shipping_address: Object.assign({email: email()}, address()),
+                shipping_carrier_code: codes[0],
+                shipping_method_code: codes[1]
+            }
+        }).then(function (result) {
+            if (!result.ok) {
+                methodError.textContent = result.data.message;
+                methodError.style.display = 'block';
+                return;
+            }
+            setTotals(result.data.totals);
+            document.getElementById('shipping').style.display = 'none';
+            document.getElementById('opc-shipping_method').style.display = 'none';
+            document.getElementById('payment').style.display = 'block';
+            var steps = document.querySelectorAll('.opc-progress-bar-item');
+            steps[0].classList.remove('_active');
+            steps[1].classList.add('_active');
+            window.location.hash = 'payment';
+        });
+    });
+
+    document.getElementById('block-discount-heading').addEventListener('click', function () {
+        this.closest('.payment-option').classList.toggle('_active');
+    });
+    document.querySelector('#discount-form .action.action-apply').addEventListener('click', function (event) {
+        event.preventDefault();
+        var code = document.getElementById('discount-code').value.trim();
+        api('PUT', '/coupons/' + encodeURIComponent(code)).then(function (result) {
+            var message = document.querySelector('#discount-form .messages');
+            message.className = 'messages message ' + (result.ok ? 'message-success success' : 'message-error error');
+            message.textContent = result.ok ? 'Your coupon was successfully applied.' : result.data.message;
+            if (result.ok) setTotals(result.data.totals);
+        });
+    });
+
+    document.querySelector('#payment .action.primary.checkout').addEventListener('click', function (event) {
+        event.preventDefault();
+        var button = this;
+        button.disabled = true;
+        api('POST', '/payment-information', {
+            cartId: config.quoteData.entity_id,
+            email: email(),
+            paymentMethod: {method: 'checkmo'},
+            billingAddress: address()
+        }).then(function (result) {
+            if (result.ok) { window.location.href = '/checkout/onepage/success/'; return; }
+            button.disabled = false;
+            document.querySelector('#payment .messages').textContent = result.data.message;
+        });
+    });
+})();
+"""
+
+ORDERS_FORM_JS = r"""
+(function () {
+    var select = document.getElementById('quick-search-type-id');
+    function toggle() {
+        var byZip = select.value === 'zip';
+        document.getElementById('oar-email').style.display = byZip ? 'none' : '';
+        document.getElementById('oar-zip').style.display = byZip ? '' : 'none';
+    }
+    select.addEventListener('change', toggle);
+    toggle();
+})();
+"""
+
+
+def _esc(value) -> str:
+    return html.escape(str(value), quote=True)
+
+
+def _money(value: float) -> str:
+    return f"${value:,.2f}"
+
+
+def _new_session() -> dict:
+    session = {
+        "id": secrets.token_hex(16),
+        "form_key": secrets.token_urlsafe(12)[:16],
+        "cart": [],
+        "next_item_id": 1,
+        "quote_mask": secrets.token_hex(16),
+        "customer": None,
+        "shipping": None,
+        "last_order": None,
+    }
+    SESSIONS[session["id"]] = session
+    QUOTES[session["quote_mask"]] = session["id"]
+    return session
+
+
+def _session(request: Request) -> dict:
+    return request.state.session
+
+
+async def _form(request: Request) -> Dict[str, str]:
+    """urlencoded body -> first value per field (no python-multipart needed)"""
+    body = (await request.body()).decode("utf-8")
+    return {key: values[0] for key, values in parse_qs(body, keep_blank_values=True).items()}
+
+
+def _bump_version(response: Response):
+    # Any change to private data rotates this cookie; the page JS then reloads its sections
+    response.set_cookie(VERSION_COOKIE, secrets.token_hex(8), path="/")
+
+
+def _flash(response: Response, kind: str, text: str):
+    response.set_cookie(MESSAGES_COOKIE, quote(json.dumps([{"type": kind, "text": text}])), path="/")
+
+
+def _is_ajax(request: Request) -> bool:
+    return request.headers.get("x-requested-with") == "XMLHttpRequest" or request.url.path.startswith("/rest/")
+
+
+@app.middleware("http")
+async def storefront_session(request: Request, call_next):
+    path = request.url.path
+    if path.startswith(("/media/", "/static/")):
+        kind = "static"
+    elif _is_ajax(request):
+        kind = "ajax"
+    else:
+        kind = "page"
+    delay = LATENCY_MS[kind] + random.uniform(0, LATENCY_MS["jitter"])
+    if delay > 0 and not path.startswith("/__stub/"):
+        await asyncio.sleep(delay / 1000)
+    session = SESSIONS.get(request.cookies.get(SESSION_COOKIE, ""))
+    created = session is None
+    if created:
+        session = _new_session()
+    # Like Magento's RegisterFormKeyFromCookie plugin: a form_key cookie set by the client wins
+    cookie_form_key = request.cookies.get("form_key")
+    if cookie_form_key:
+        session["form_key"] = cookie_form_key
+    request.state.session = session
+    response = await call_next(request)
+    if created:
+        response.set_cookie(SESSION_COOKIE, session["id"], path="/", httponly=True)
+    if not cookie_form_key:
+        response.set_cookie("form_key", session["form_key"], path="/")
+    return response
+
+
+def _cart_totals(session: dict, shipping_amount: Optional[float] = None) -> Dict[str, float]:
+    subtotal = sum(item["price"] * item["qty"] for item in session["cart"])
+    if shipping_amount is None:
+        shipping_amount = 0.0
+        if session["shipping"]:
+            shipping_amount = session["shipping"]["amount"]
+    return {"subtotal": round(subtotal, 2), "shipping_amount": round(shipping_amount, 2),
+            "grand_total": round(subtotal + shipping_amount, 2)}
+
+
+def _shipping_amount(carrier: str, session: dict) -> float:
+    qty = sum(item["qty"] for item in session["cart"])
+    for carrier_code, _method, _title, _carrier_title, per_item in SHIPPING_METHODS:
+        if carrier_code == carrier:
+            return per_item * qty
+    return 0.0
+
+
+def _sections(session: dict, base_url: str) -> Dict[str, dict]:
+    items = [{
+        "item_id": item["item_id"],
+        "product_id": item["product_id"],
+        "product_sku": item["sku"],
+        "product_name": item["name"],
+        "product_url": f"{base_url}{PRODUCTS_BY_ID[item['product_id']]['slug']}.html",
+        "product_price_value": item["price"],
+        "product_price": f'<span class="price">{_money(item["price"])}</span>',
+        "qty": item["qty"],
+        "options": [{"label": label, "value": value} for label, value in item["options"].items()],
+    } for item in reversed(session["cart"])]
+    totals = _cart_totals(session)
+    customer = session["customer"]
+    return {
+        "cart": {
+            "summary_count": sum(item["qty"] for item in session["cart"]),
+            "subtotalAmount": totals["subtotal"],
+            "subtotal": f'<span class="price">{_money(totals["subtotal"])}</span>',
+            "items": items,
+            "data_id": int(time.time()),
+        },
+        "customer": {"fullname": f"{customer['firstname']} {customer['lastname']}",
+                     "firstname": customer["firstname"], "data_id": int(time.time())} if customer else {},
+        "messages": {"messages": [], "data_id": int(time.time())},
+    }
+
+
+def _header(base: str, session: dict, query: str = "", checkout: bool = False) -> str:
+    customer = session["customer"]
+    if customer:
+        greet = f'<span class="logged-in">Welcome, {_esc(customer["firstname"])} {_esc(customer["lastname"])}!</span>'
+        auth = f'<a href="{base}customer/account/logout/">Sign Out</a>'
+        links = f'<li><a href="{base}customer/account/">My Account</a></li>'
+    else:
+        greet = '<span class="not-logged-in">Default welcome msg!</span>'
+        auth = f'<a href="{base}customer/account/login/">Sign In</a>'
+        links = f'<li><a href="{base}customer/account/create/">Create an Account</a></li>'
+    header_links = f'<li class="greet welcome">{greet}</li><li class="authorization-link">{auth}</li>{links}'
+    minicart = "" if checkout else f"""
+        <div data-block="minicart" class="minicart-wrapper">
+            <a class="action showcart" href="{base}checkout/cart/">
+                <span class="text">My Cart</span>
+                <span class="counter qty empty"><span class="counter-number"></span><span
+                    class="counter-label"></span></span>
+            </a>
+            <div class="ui-dialog ui-widget mage-dropdown-dialog" style="display: none;">
+                <div class="block block-minicart ui-dialog-content" id="ui-id-1" style="display: none;">
+                    <div id="minicart-content-wrapper"></div>
+                </div>
+            </div>
+        </div>
+        <div class="block block-search">
+            <form class="form minisearch" id="search_mini_form" action="{base}catalogsearch/result/" method="get">
+                <input id="search" type="text" name="q" value="{_esc(query)}"
+                       placeholder="Search entire store here..." maxlength="128">
+                <button type="submit" title="Search" class="action search"><span>Search</span></button>
+            </form>
+            <a class="action advanced" href="{base}catalogsearch/advanced/">Advanced Search</a>
+        </div>
+        <ul class="compare wrapper"><li class="item link compare">
+            <a class="action compare no-display" href="{base}catalog/product_compare/">Compare Products
+            <span class="counter qty"></span></a>
+        </li></ul>"""
+    menu = "".join(
+        f'<li class="level0 nav-{i} category-item level-top"><a href="{base}{slug}.html" class="level-top" '
+        f'role="menuitem"><span>{_esc(label)}</span></a></li>'
+        for i, (slug, label) in enumerate(CATEGORIES, start=1))
+    return f"""
+<header class="page-header">
+    <div class="panel wrapper"><div class="panel header">
+        <a class="action skip contentarea" href="#contentarea"><span>Skip to Content</span></a>
+        <ul class="header links">{header_links}</ul>
+    </div></div>
+    <div class="header content">
+        <span data-action="toggle-nav" class="action nav-toggle"><span>Toggle Nav</span></span>
+        <a class="logo" href="{base}" title="" aria-label="store logo">
+            <img src="{base}static/frontend/Magento/luma/en_US/images/logo.svg" title="" alt="" width="148" height="43">
+        </a>
+        {minicart}
+    </div>
+</header>
+<div class="sections nav-sections"><div class="section-items nav-sections-items">
+    <div class="section-item-title nav-sections-item-title">
+        <a class="nav-sections-item-switch" href="#store.menu">Menu</a>
+    </div>
+    <div class="section-item-content nav-sections-item-content" id="store.menu">
+        <nav class="navigation" data-action="navigation"><ul>{menu}</ul></nav>
+    </div>
+    <div class="section-item-title nav-sections-item-title">
+        <a class="nav-sections-item-switch" href="#store.links">Account</a>
+    </div>
+    <div class="section-item-content nav-sections-item-content" id="store.links">
+        <ul class="header links">{header_links}</ul>
+    </div>
+</div></div>"""
+
+
+def _render(request: Request, title: str, content: str, body_class: str = "", query: str = "",
+            checkout: bool = False, scripts: str = "", status_code: int = 200) -> HTMLResponse:
+    session = _session(request)
+    base = str(request.base_url)
+    page = f"""<!doctype html>
+<html lang="en"><head><meta charset="utf-8"><title>{_esc(title)}</title><style>{CSS}</style></head>
+<body class="{body_class}" data-form-key="{session['form_key']}">
+<div class="page-wrapper">
+{_header(base, session, query, checkout)}
+<main id="maincontent" class="page-main"><a id="contentarea" tabindex="-1"></a>
+<div class="page messages"></div>
+{content}
+</main>
+</div>
+<script>{STOREFRONT_JS}</script>
+{scripts}
+</body></html>"""
+    return HTMLResponse(page, status_code=status_code)
+
+
+def _page_title(title: str) -> str:
+    return (f'<div class="page-title-wrapper"><h1 class="page-title">'
+            f'<span class="base" data-ui-id="page-title-wrapper">{_esc(title)}</span></h1></div>')
+
+
+def _product_grid(base: str, products: List[dict]) -> str:
+    items = "".join(f"""
+        <li class="item product product-item"><div class="product-item-info">
+            <a href="{base}{p['slug']}.html" class="product photo product-item-photo">
+                <img class="product-image-photo" src="{base}media/catalog/product/{p['slug']}.svg"
+                     width="240" height="300" alt="{_esc(p['name'])}">
+            </a>
+            <div class="product details product-item-details">
+                <strong class="product name product-item-name"><a class="product-item-link"
+                    href="{base}{p['slug']}.html">{_esc(p['name'])}</a></strong>
+                <div class="price-box price-final_price"><span class="price">{_money(p['price'])}</span></div>
+            </div>
+        </div></li>""" for p in products)
+    return (f'<div class="products wrapper grid products-grid">'
+            f'<ol class="products list items product-items">{items}</ol></div>')
+
+
+def _search(query: str) -> List[dict]:
+    words = [w for w in query.lower().split() if w]
+    if not words:
+        return []
+    return [p for p in PRODUCTS if all(w in p["keywords"] or w in p["name"].lower() for w in words)]
+
+
+def _sp_config(product: dict) -> dict:
+    index = {}
+    for size_id, _ in SIZES:
+        for color_id in product["colors"]:
+            child_id = f"{product['id']}{size_id}{color_id}"
+            index[child_id] = {SIZE_ATTRIBUTE_ID: size_id, COLOR_ATTRIBUTE_ID: color_id}
+
+    def children(attribute_id, option_id):
+        return [child_id for child_id, combo in index.items() if combo[attribute_id] == option_id]
+
+    return {
+        "attributes": {
+            COLOR_ATTRIBUTE_ID: {"id": COLOR_ATTRIBUTE_ID, "code": "color", "label": "Color",
+                                 "options": [{"id": c, "label": COLORS[c][0],
+                                              "products": children(COLOR_ATTRIBUTE_ID, c)}
+                                             for c in product["colors"]]},
+            SIZE_ATTRIBUTE_ID: {"id": SIZE_ATTRIBUTE_ID, "code": "size", "label": "Size",
+                                "options": [{"id": s, "label": label, "products": children(SIZE_ATTRIBUTE_ID, s)}
+                                            for s, label in SIZES]},
+        },
+        "index": index,
+        "productId": product["id"],
+        "prices": {"finalPrice": {"amount": product["price"]}},
+    }
+
+
+def _product_page(request: Request, product: dict) -> HTMLResponse:
+    base = str(request.base_url)
+    session = _session(request)
+    sizes = "".join(f'<div class="swatch-option text" tabindex="0" data-option-id="{sid}" data-option-label="{label}" '
+                    f'role="option">{label}</div>' for sid, label in SIZES)
+    colors = "".join(f'<div class="swatch-option color" tabindex="0" data-option-id="{cid}" '
+                     f'data-option-label="{COLORS[cid][0]}" role="option" style="background: {COLORS[cid][1]};"></div>'
+                     for cid in product["colors"])
+    # Same init Luma's Magento_Swatches renderer.phtml emits for a swatch product
+    swatch_config = {
+        SIZE_ATTRIBUTE_ID: {sid: {"type": 0, "value": label, "label": label} for sid, label in SIZES},
+        COLOR_ATTRIBUTE_ID: {cid: {"type": 1, "value": COLORS[cid][1], "label": COLORS[cid][0]}
+                             for cid in product["colors"]},
+    }
+    init = json.dumps({"[data-role=swatch-options]": {"Magento_Swatches/js/swatch-renderer": {
+        "jsonConfig": _sp_config(product), "jsonSwatchConfig": swatch_config,
+        "mediaCallback": f"{base}swatches/ajax/media/", "gallerySwitchStrategy": "replace", "showTooltip": 1}}})
+    content = f"""
+<div class="product-info-main">
+    {_page_title(product['name'])}
+    <div class="product-reviews-summary">
+        <div class="rating-summary">
+            <div class="rating-result" title="80%"><span style="width:80%"><span>80%</span></span></div>
+        </div>
+        <div class="reviews-actions">
+            <a class="action view" href="#reviews"><span>3</span>&nbsp;<span>Reviews</span></a>
+        </div>
+    </div>
+    <div class="product-info-price">
+        <div class="price-box price-final_price" data-product-id="{product['id']}">
+            <span class="price-container"><span class="price-wrapper">
+                <span class="price">{_money(product['price'])}</span>
+            </span></span>
+        </div>
+        <div class="product-info-stock-sku">
+            <div class="stock available" title="Availability"><span>In stock</span></div>
+            <div class="product attribute sku">
+                <strong class="type">SKU</strong><div class="value">{product['sku']}</div>
+            </div>
+        </div>
+    </div>
+    <div class="product-add-form">
+        <form id="product_addtocart_form" method="post"
+              action="{base}checkout/cart/add/uenc/{product['id']}/product/{product['id']}/">
+            <input type="hidden" name="product" value="{product['id']}">
+            <input type="hidden" name="form_key" value="{session['form_key']}">
+            <div class="swatch-opt" data-role="swatch-options">
+                <div class="swatch-attribute size" data-attribute-code="size" data-attribute-id="{SIZE_ATTRIBUTE_ID}">
+                    <span class="swatch-attribute-label">Size</span><span
+                        class="swatch-attribute-selected-option"></span>
+                    <div class="swatch-attribute-options clearfix" role="listbox">{sizes}</div>
+                    <input class="swatch-input super-attribute-select" name="super_attribute[{SIZE_ATTRIBUTE_ID}]"
+                           type="hidden" value="">
+                </div>
+                <div class="swatch-attribute color" data-attribute-code="color"
+                     data-attribute-id="{COLOR_ATTRIBUTE_ID}">
+                    <span class="swatch-attribute-label">Color</span><span
+                        class="swatch-attribute-selected-option"></span>
+                    <div class="swatch-attribute-options clearfix" role="listbox">{colors}</div>
+                    <input class="swatch-input super-attribute-select" name="super_attribute[{COLOR_ATTRIBUTE_ID}]"
+                           type="hidden" value="">
+                </div>
+            </div>
+            <div class="box-tocart"><div class="field qty"><label class="label" for="qty"><span>Qty</span></label>
+                <div class="control">
+                    <input type="number" name="qty" id="qty" min="0" value="1" title="Qty" class="input-text qty">
+                </div></div>
+                <div class="actions">
+                    <button type="submit" title="Add to Cart" class="action primary tocart"
+                            id="product-addtocart-button"><span>Add to Cart</span></button>
+                </div>
+            </div>
+        </form>
+    </div>
+    <div class="product-social-links">
+        <a href="#" class="action towishlist"><span>Add to Wish List</span></a>
+        <a href="#" class="action tocompare"><span>Add to Compare</span></a>
+    </div>
+</div>
+<div class="product media">
+    <img class="gallery-placeholder__image" src="{base}media/catalog/product/{product['slug']}.svg"
+         width="480" height="600" alt="{_esc(product['name'])}">
+</div>
+<div class="product info detailed"><div class="product data items">
+    <div class="data item title active" id="tab-label-description">
+        <a class="data switch" href="#description">Details</a>
+    </div>
+    <div class="data item content" id="description"><div class="product attribute description">
+        <div class="value">The {_esc(product['name'])} is built for comfort and performance.</div>
+    </div></div>
+    <div class="data item title" id="tab-label-additional">
+        <a class="data switch" href="#additional">More Information</a>
+    </div>
+    <div class="data item title" id="tab-label-reviews">
+        <a class="data switch" href="#reviews">Reviews <span class="counter">3</span></a>
+    </div>
+</div></div>
+<script type="text/x-magento-init">{init}</script>"""
+    return _render(request, product["name"], content, body_class="catalog-product-view page-product-configurable")
+
+
+@app.get("/", response_class=HTMLResponse)
+async def home(request: Request):
+    base = str(request.base_url)
+    content = f"""
+<div class="blocks-promo">
+    <a class="block-promo home-main" href="{base}what-is-new.html"><span class="info">New Luma Yoga Collection</span>
+    <strong class="title">Get fit and look fab in new seasonal styles</strong>
+    <span class="action more button">Shop New Yoga</span></a>
+</div>"""
+    return _render(request, "Home Page", content, body_class="cms-home cms-index-index")
+
+
+@app.get("/catalogsearch/result/", response_class=HTMLResponse)
+async def search_results(request: Request, q: str = ""):
+    base = str(request.base_url)
+    products = _search(q)
+    if products:
+        listing = (f'<div class="toolbar toolbar-products"><p class="toolbar-amount">'
+                   f'<span class="toolbar-number">{len(products)}</span> items</p></div>')
+        listing += _product_grid(base, products)
+    else:
+        listing = '<div class="message notice"><div>Your search returned no results.</div></div>'
+    return _render(request, f"Search results for: '{q}'", _page_title(f"Search results for: '{q}'") + listing,
+                   body_class="catalogsearch-result-index", query=q)
+
+
+@app.get("/catalogsearch/advanced/", response_class=HTMLResponse)
+async def advanced_search(request: Request):
+    return _render(request, "Advanced Search", _page_title("Advanced Search"))
+
+
+@app.get("/{slug}.html", response_class=HTMLResponse)
+async def catalog_page(request: Request, slug: str):
+    product = PRODUCTS_BY_SLUG.get(slug)
+    if product is not None:
+        return _product_page(request, product)
+    labels = dict(CATEGORIES)
+    if slug not in labels:
+        return _render(request, "404 Not Found", _page_title("Whoops, our bad..."), status_code=404)
+    products = [p for p in PRODUCTS if p["category"] == slug] if slug in ("men", "women") else PRODUCTS
+    return _render(request, labels[slug], _page_title(labels[slug]) + _product_grid(str(request.base_url), products),
+                   body_class="catalog-category-view")
+
+
+@app.post("/checkout/cart/add/{path:path}")
+async def cart_add(request: Request, path: str = ""):
+    session = _session(request)
+    form = await _form(request)
+    product = PRODUCTS_BY_ID.get(form.get("product", ""))
+    error = None
+    if form.get("form_key") != session["form_key"]:
+        error = "Invalid Form Key. Please refresh the page."
+    elif product is None:
+        error = "The product that was requested doesn't exist. Verify the product and try again."
+    options = {}
+    if error is None:
+        colors = {c: COLORS[c][0] for c in product["colors"]}
+        for attribute_id, label, choices in ((SIZE_ATTRIBUTE_ID, "Size", dict(SIZES)),
+                                             (COLOR_ATTRIBUTE_ID, "Color", colors)):
+            value = form.get(f"super_attribute[{attribute_id}]", "")
+            if value not in choices:
+                error = "You need to choose options for your item."
+                break
+            options[label] = choices[value]
+    try:
+        qty = max(1, int(float(form.get("qty") or 1)))
+    except ValueError:
+        qty = 1
+    if error is None:
+        for item in session["cart"]:
+            if item["product_id"] == product["id"] and item["options"] == options:
+                item["qty"] += qty
+                break
+        else:
+            session["cart"].append({"item_id": str(session["next_item_id"]), "product_id": product["id"],
+                                    "sku": product["sku"], "name": product["name"], "price": product["price"],
+                                    "qty": qty, "options": options})
+            session["next_item_id"] += 1
+    message = error or f"You added {product['name']} to your shopping cart."
+    if _is_ajax(request):
+        response = JSONResponse({"error": bool(error), "message": message})
+    else:
+        back = f"{request.base_url}{product['slug']}.html" if product else str(request.base_url)
+        response = RedirectResponse(back if error else f"{request.base_url}checkout/cart/", status_code=302)
+        _flash(response, "error" if error else "success", message)
+    if error is None:
+        _bump_version(response)
+    return response
+
+
+@app.post("/checkout/sidebar/removeItem/")
+async def cart_remove_item(request: Request):
+    session = _session(request)
+    form = await _form(request)
+    if form.get("form_key") != session["form_key"]:
+        return JSONResponse({"success": False, "error_message": "Invalid Form Key. Please refresh the page."})
+    before = len(session["cart"])
+    session["cart"] = [item for item in session["cart"] if item["item_id"] != form.get("item_id")]
+    if len(session["cart"]) == before:
+        return JSONResponse({"success": False, "error_message": "We can't find the quote item."})
+    response = JSONResponse({"success": True})
+    _bump_version(response)
+    return response
+
+
+@app.post("/checkout/cart/updatePost/")
+async def cart_update_post(request: Request):
+    session = _session(request)
+    form = await _form(request)
+    response = RedirectResponse(f"{request.base_url}checkout/cart/", status_code=302)
+    if form.get("form_key") != session["form_key"]:
+        _flash(response, "error", "Invalid Form Key. Please refresh the page.")
+        return response
+    if form.get("update_cart_action") == "empty_cart":
+        session["cart"] = []
+        session["shipping"] = None
+        _bump_version(response)
+    return response
+
+
+@app.get("/customer/section/load/")
+async def section_load(request: Request, sections: str = ""):
+    data = _sections(_session(request), str(request.base_url))
+    wanted = [name for name in sections.split(",") if name]
+    return {name: data[name] for name in wanted if name in data} if wanted else data
+
+
+@app.get("/checkout/cart/", response_class=HTMLResponse)
+async def cart_page(request: Request):
+    session = _session(request)
+    if not session["cart"]:
+        body = '<div class="cart-empty"><p>You have no items in your shopping cart.</p></div>'
+    else:
+        rows = "".join(f'<tr class="item-info"><td class="col item">'
+                       f'<strong class="product-item-name">{_esc(i["name"])}</strong></td>'
+                       f'<td class="col price"><span class="price">{_money(i["price"])}</span></td>'
+                       f'<td class="col qty">{i["qty"]}</td></tr>'
+                       for i in session["cart"])
+        body = (f'<table id="shopping-cart-table" class="cart items data table"><tbody>{rows}</tbody></table>'
+                f'<ul class="checkout methods items checkout-methods-items"><li class="item">'
+                f'<a href="{request.base_url}checkout/" class="action primary checkout">'
+                f'<span>Proceed to Checkout</span></a></li></ul>')
+    return _render(request, "Shopping Cart", _page_title("Shopping Cart") + body, body_class="checkout-cart-index")
+
+
+@app.get("/checkout/", response_class=HTMLResponse)
+async def checkout(request: Request):
+    session = _session(request)
+    base = str(request.base_url)
+    if not session["cart"]:
+        return RedirectResponse(f"{base}checkout/cart/", status_code=302)
+    totals = _cart_totals(session)
+    customer = session["customer"]
+    config = {"quoteData": {"entity_id": session["quote_mask"]}, "formKey": session["form_key"],
+              "isCustomerLoggedIn": bool(customer), "customerData": {"email": customer["email"]} if customer else {}}
+    email_block = "" if customer else """
+            <form class="form form-login" id="customer-email-fieldset" onsubmit="return false;">
+                <div class="field required"><label class="label" for="customer-email">Email Address</label>
+                    <div class="control _with-tooltip">
+                        <input class="input-text" type="email" name="username" id="customer-email">
+                        <div class="field-tooltip">
+                            <div class="field-tooltip-content">We'll send your order confirmation here.</div>
+                        </div>
+                    </div>
+                </div>
+            </form>"""
+    regions = "".join(f'<option value="{rid}">{name}</option>' for rid, name in US_REGIONS)
+    countries = "".join(f'<option value="{code}">{name}</option>' for code, name in COUNTRIES)
+    item_count = sum(i['qty'] for i in session['cart'])
+    methods = "".join(f"""
+                <tr class="row"><td class="col col-method">
+                    <input type="radio" class="radio" value="{carrier}_{method}" name="ko_unique_shipping"></td>
+                    <td class="col col-price"><span class="price"><span
+                        class="price">{_money(per_item * item_count)}</span></span></td>
+                    <td class="col col-method">{title}</td><td class="col col-carrier">{carrier_title}</td></tr>"""
+                      for carrier, method, title, carrier_title, per_item in SHIPPING_METHODS)
+    items = "".join(f"""
+            <li class="product-item"><div class="product"><div class="product-item-details">
+                <strong class="product-item-name">{_esc(i['name'])}</strong>
+                <div class="details-qty"><span class="value">{i['qty']}</span></div>
+                <div class="subtotal"><span class="price">{_money(i['price'] * i['qty'])}</span></div>
+                <div class="product options"><span class="toggle">View Details</span></div>
+            </div></div></li>""" for i in session["cart"])
+
+    def text_field(name, label, required=True):
+        return (f'<div class="field{" _required" if required else ""}" name="shippingAddress.{name}">'
+                f'<label class="label">{label}</label>'
+                f'<div class="control"><input class="input-text" type="text" name="{name}"></div></div>')
+
+    content = f"""
+<div class="authentication-wrapper">
+    <button type="button" class="action action-auth-toggle"><span>Sign In</span></button>
+    <div class="block-authentication" style="display: none;">
+        <div class="messages"></div>
+        <div class="field"><input type="email" id="login-email" name="username"></div>
+        <div class="field"><input type="password" id="login-password" name="password"></div>
+        <button type="submit" class="action action-login secondary"><span>Sign In</span></button>
+        <a class="action action-remind"
+           href="{base}customer/account/forgotpassword/"><span>Forgot Your Password?</span></a>
+    </div>
+</div>
+<ul class="opc-progress-bar">
+    <li class="opc-progress-bar-item _active"><span>Shipping</span></li>
+    <li class="opc-progress-bar-item"><span>Review &amp; Payments</span></li>
+</ul>
+<div class="opc-estimated-wrapper"><div class="estimated-block"><span class="estimated-label">Estimated Total</span>
+    <span class="estimated-price" data-total="grand_total">{_money(totals['grand_total'])}</span></div></div>
+<div class="checkout-container">
+<div class="opc-wrapper"><ol class="opc" id="checkoutSteps">
+    <li id="shipping" class="checkout-shipping-address">
+        <div class="step-title">Shipping Address</div>
+        <div id="checkout-step-shipping" class="step-content">
+            {email_block}
+            <form class="form form-shipping-address" id="co-shipping-form" onsubmit="return false;">
+                {text_field('firstname', 'First Name')}{text_field('lastname', 'Last Name')}
+                {text_field('company', 'Company', False)}
+                <fieldset class="field street"><legend class="label">Street Address</legend>
+                    <div class="field _required"><input class="input-text" type="text" name="street[0]"></div>
+                    <div class="field"><input class="input-text" type="text" name="street[1]"></div>
+                    <div class="field"><input class="input-text" type="text" name="street[2]"></div>
+                </fieldset>
+                {text_field('city', 'City')}
+                <div class="field _required" name="shippingAddress.region_id">
+                    <label class="label">State/Province</label>
+                    <div class="control"><select class="select" name="region_id">
+                        <option value="">Please select a region, state or province.</option>{regions}</select>
+                    <input class="input-text" type="text" name="region" style="display: none;"></div></div>
+                {text_field('postcode', 'Zip/Postal Code')}
+                <div class="field _required" name="shippingAddress.country_id"><label class="label">Country</label>
+                    <div class="control"><select class="select" name="country_id">{countries}</select></div></div>
+                <div class="field _required" name="shippingAddress.telephone"><label class="label">Phone Number</label>
+                    <div class="control _with-tooltip"><input class="input-text" type="text" name="telephone">
+                    <div class="field-tooltip">
+                        <div class="field-tooltip-content">For delivery questions.</div>
+                    </div></div></div>
+            </form>
+        </div>
+    </li>
+    <li id="opc-shipping_method" class="checkout-shipping-method">
+        <div class="step-title">Shipping Methods</div>
+        <div id="checkout-step-shipping_method" class="step-content">
+            <table class="table-checkout-shipping-method"><thead><tr class="row">
+                <th class="col col-method">Select Method</th><th class="col col-price">Price</th>
+                <th class="col col-method">Method Title</th><th class="col col-carrier">Carrier Title</th></tr></thead>
+                <tbody>{methods}</tbody></table>
+            <div class="message error"
+                 style="display: none;">The shipping method is missing. Select the shipping method and try again.</div>
+            <div id="shipping-method-buttons-container" class="actions-toolbar"><div class="primary">
+                <button data-role="opc-continue" type="submit" class="button action continue primary">
+                    <span>Next</span></button></div></div>
+        </div>
+    </li>
+    <li id="payment" class="checkout-payment-method" style="display: none;">
+        <div class="step-title">Payment Method</div>
+        <div class="messages"></div>
+        <div id="checkout-payment-method-load"><div class="payment-methods"><div class="payment-group">
+            <div class="payment-method _active">
+                <div class="payment-method-title field choice">
+                    <input type="radio" name="payment[method]" class="radio" id="checkmo" value="checkmo" checked>
+                    <label class="label" for="checkmo"><span>Check / Money order</span></label></div>
+                <div class="payment-method-content">
+                    <div class="checkout-billing-address">
+                        <div class="billing-address-same-as-shipping-block field choice">
+                            <input type="checkbox" name="billing-address-same-as-shipping"
+                                   id="billing-address-same-as-shipping-checkmo" checked>
+                            <label for="billing-address-same-as-shipping-checkmo">
+                                <span>My billing and shipping address are the same</span></label>
+                        </div>
+                        <div class="billing-address-details">Same as shipping address</div>
+                        <button type="button" class="action action-edit-address"><span>Edit</span></button>
+                    </div>
+                    <div class="actions-toolbar"><div class="primary">
+                        <button class="action primary checkout" type="submit" title="Place Order">
+                            <span>Place Order</span></button></div></div>
+                </div>
+            </div>
+        </div></div></div>
+        <div class="payment-option discount-code">
+            <div class="payment-option-title field choice" id="block-discount-heading" role="heading">
+                <span class="action action-toggle">Apply Discount Code</span></div>
+            <div class="payment-option-content">
+                <form class="form form-discount" id="discount-form" onsubmit="return false;">
+                <div class="payment-option-inner"><div class="field">
+                    <input class="input-text" type="text" id="discount-code" name="discount_code"
+                           placeholder="Enter discount code"></div></div>
+                <div class="actions-toolbar"><div class="primary">
+                    <button class="action action-apply" type="submit"><span>Apply Discount</span></button></div></div>
+                <div class="messages"></div>
+            </form></div>
+        </div>
+    </li>
+</ol></div>
+<aside class="opc-sidebar"><div class="opc-block-summary">
+    <span class="title">Order Summary</span>
+    <table class="data table table-totals"><tbody>
+        <tr class="totals sub"><th class="mark">Cart Subtotal</th><td class="amount">
+            <span class="price" data-total="subtotal">{_money(totals['subtotal'])}</span></td></tr>
+        <tr class="totals shipping excl"><th class="mark">Shipping</th><td class="amount">
+            <span class="price" data-total="shipping_amount">{_money(totals['shipping_amount'])}</span></td></tr>
+        <tr class="grand totals"><th class="mark"><strong>Order Total</strong></th><td class="amount"><strong>
+            <span class="price" data-total="grand_total">{_money(totals['grand_total'])}</span></strong></td></tr>
+    </tbody></table>
+    <div class="block items-in-cart"><div class="title"><strong>{item_count} Items in Cart</strong></div>
+        <ol class="minicart-items">{items}</ol></div>
+</div></aside>
+</div>
+<script>window.checkoutConfig = {json.dumps(config)};</script>"""
+    return _render(request, "Checkout", content, body_class="checkout-index-index", checkout=True,
+                   scripts=f"<script>{CHECKOUT_JS}</script>")
+
+
+def _quote_session(cart_id: str) -> Optional[dict]:
+    sid = QUOTES.get(cart_id)
+    return SESSIONS.get(sid) if sid else None
+
+
+def _no_quote(cart_id: str) -> JSONResponse:
+    return JSONResponse(status_code=404, content={
+        "message": 'No such entity with %fieldName = %fieldValue',
+        "parameters": {"fieldName": "cartId", "fieldValue": cart_id}})
+
+
+@app.post("/rest/default/V1/guest-carts/{cart_id}/shipping-information")
+async def shipping_information(request: Request, cart_id: str):
+    session = _quote_session(cart_id)
+    if session is None:
+        return _no_quote(cart_id)
+    info = (await request.json()).get("addressInformation", {})
+    carrier = info.get("shipping_carrier_code", "")
+    if not any(carrier == code and info.get("shipping_method_code") == method for code, method, *_ in SHIPPING_METHODS):
+        return JSONResponse(status_code=400, content={
+            "message": "The shipping method is missing. Select the shipping method and try again."})
+    session["shipping"] = {"address": info.get("shipping_address", {}), "carrier": carrier,
+                           "amount": _shipping_amount(carrier, session)}
+    totals = _cart_totals(session)
+    return {"payment_methods": [{"code": "checkmo", "title": "Check / Money order"}], "totals": totals}
+
+
+@app.put("/rest/default/V1/guest-carts/{cart_id}/coupons/{code}")
+async def apply_coupon(cart_id: str, code: str):
+    if _quote_session(cart_id) is None:
+        return _no_quote(cart_id)
+    return JSONResponse(status_code=404, content={
+        "message": "The coupon code isn't valid. Verify the code and try again."})
+
+
+@app.post("/rest/default/V1/guest-carts/{cart_id}/payment-information")
+async def payment_information(request: Request, cart_id: str):
+    session = _quote_session(cart_id)
+    if session is None:
+        return _no_quote(cart_id)
+    payload = await request.json()
+    if not session["cart"]:
+        return JSONResponse(status_code=400, content={"message": "The cart is empty. Add items and try again."})
+    if not session["shipping"]:
+        return JSONResponse(status_code=400, content={
+            "message": "The shipping address is missing. Set the address and try again."})
+    address = session["shipping"]["address"]
+    email = payload.get("email") or address.get("email", "")
+    entity_id = len(ORDERS) + 1
+    increment_id = f"{entity_id:09d}"
+    ORDERS[increment_id] = {
+        "increment_id": increment_id,
+        "email": email.lower(),
+        "lastname": address.get("lastname", ""),
+        "postcode": address.get("postcode", ""),
+        "address": address,
+        "billing": payload.get("billingAddress") or address,
+        "items": [dict(item) for item in session["cart"]],
+        "totals": _cart_totals(session),
+        "status": "Pending",
+        "created_at": datetime.now().strftime("%B %-d, %Y"),
+    }
+    # Magento starts a fresh quote once the order is placed
+    session["cart"] = []
+    session["shipping"] = None
+    session["last_order"] = increment_id
+    del QUOTES[cart_id]
+    session["quote_mask"] = secrets.token_hex(16)
+    QUOTES[session["quote_mask"]] = session["id"]
+    response = JSONResponse(str(entity_id))
+    _bump_version(response)
+    return response
+
+
+@app.get("/checkout/onepage/success/", response_class=HTMLResponse)
+async def checkout_success(request: Request):
+    session = _session(request)
+    order_id = session.get("last_order")
+    if not order_id:
+        return RedirectResponse(f"{request.base_url}checkout/cart/", status_code=302)
+    content = _page_title("Thank you for your purchase!") + f"""
+<div class="checkout-success">
+    <p>Your order # is: <span>{order_id}</span>.</p>
+    <p>We'll email you an order confirmation with details and tracking info.</p>
+    <div class="actions-toolbar"><div class="primary">
+        <a class="action primary continue" href="{request.base_url}"><span>Continue Shopping</span></a>
+    </div></div>
+</div>"""
+    return _render(request, "Success Page", content, body_class="checkout-onepage-success")
+
+
+def _sign_in(session: dict, email: str):
+    local = email.split("@")[0] or "Customer"
+    session["customer"] = {"email": email.lower(), "firstname": local.split(".")[0].title(), "lastname": "Customer"}
+
+
+@app.get("/customer/account/login/", response_class=HTMLResponse)
+async def login_page(request: Request):
+    session = _session(request)
+    content = _page_title("Customer Login") + f"""
+<div class="block block-customer-login">
+<form class="form form-login" action="{request.base_url}customer/account/loginPost/" method="post" id="login-form">
+    <input name="form_key" type="hidden" value="{session['form_key']}">
+    <div class="field email required"><label class="label" for="email">Email</label>
+        <input name="login[username]" type="email" id="email" class="input-text"></div>
+    <div class="field password required"><label for="pass" class="label">Password</label>
+        <input name="login[password]" type="password" id="pass" class="input-text"></div>
+    <div class="actions-toolbar"><div class="primary">
+        <button type="submit" class="action login primary" name="send" id="send2"><span>Sign In</span></button>
+    </div></div>
+</form></div>"""
+    return _render(request, "Customer Login", content, body_class="customer-account-login")
+
+
+@app.post("/customer/account/loginPost/")
+async def login_post(request: Request):
+    session = _session(request)
+    form = await _form(request)
+    email = form.get("login[username]", "").strip()
+    if not email or not form.get("login[password]") or form.get("form_key") != session["form_key"]:
+        response = RedirectResponse(f"{request.base_url}customer/account/login/", status_code=302)
+        _flash(response, "error", "The account sign-in was incorrect or your account is disabled temporarily. "
+                                  "Please wait and try again later.")
+        return response
+    _sign_in(session, email)
+    response = RedirectResponse(f"{request.base_url}customer/account/", status_code=302)
+    _bump_version(response)
+    return response
+
+
+@app.post("/customer/ajax/login")
+async def ajax_login(request: Request):
+    payload = await request.json()
+    if not payload.get("username") or not payload.get("password"):
+        return {"errors": True, "message": "Invalid login or password."}
+    _sign_in(_session(request), payload["username"].strip())
+    response = JSONResponse({"errors": False, "message": "Login successful."})
+    _bump_version(response)
+    return response
+
+
+@app.get("/customer/account/", response_class=HTMLResponse)
+async def account_page(request: Request):
+    session = _session(request)
+    if not session["customer"]:
+        return RedirectResponse(f"{request.base_url}customer/account/login/", status_code=302)
+    content = _page_title("My Account") + (f'<div class="block block-dashboard-info">'
+                                           f'<p>{_esc(session["customer"]["email"])}</p></div>')
+    return _render(request, "My Account", content, body_class="customer-account-index")
+
+
+@app.get("/customer/account/logout/")
+async def logout(request: Request):
+    _session(request)["customer"] = None
+    response = RedirectResponse(str(request.base_url), status_code=302)
+    _bump_version(response)
+    return response
+
+
+@app.get("/customer/account/create/", response_class=HTMLResponse)
+async def create_account(request: Request):
+    return _render(request, "Create New Customer Account", _page_title("Create New Customer Account"))
+
+
+@app.get("/sales/guest/form/", response_class=HTMLResponse)
+async def orders_form(request: Request):
+    session = _session(request)
+    content = _page_title("Orders and Returns") + f"""
+<form class="form form-orders-search" id="oar-widget-orders-and-returns-form"
+      action="{request.base_url}sales/guest/view/" method="post" name="guest_post">
+    <input name="form_key" type="hidden" value="{session['form_key']}">
+    <fieldset class="fieldset"><legend class="legend"><span>Order Information</span></legend>
+        <div class="field id required"><label class="label" for="oar-order-id"><span>Order ID</span></label>
+            <div class="control">
+                <input type="text" class="input-text" id="oar-order-id" name="oar_order_id"></div></div>
+        <div class="field lastname required">
+            <label class="label" for="oar-billing-lastname"><span>Billing Last Name</span></label>
+            <div class="control">
+                <input type="text" class="input-text" id="oar-billing-lastname" name="oar_billing_lastname"></div></div>
+        <div class="field find required">
+            <label class="label" for="quick-search-type-id"><span>Find Order By</span></label>
+            <div class="control"><select name="oar_type" id="quick-search-type-id">
+                <option value="email">Email</option><option value="zip">ZIP Code</option></select></div></div>
+        <div id="oar-email" class="field email required"><label class="label" for="oar_email"><span>Email</span></label>
+            <div class="control"><input type="email" class="input-text" id="oar_email" name="oar_email"></div></div>
+        <div id="oar-zip" class="field zip required" style="display: none;">
+            <label class="label" for="oar_zip"><span>Billing ZIP Code</span></label>
+            <div class="control"><input type="text" class="input-text" id="oar_zip" name="oar_zip"></div></div>
+    </fieldset>
+    <div class="actions-toolbar"><div class="primary">
+        <button type="submit" title="Continue" class="action submit primary"><span>Continue</span></button>
+    </div></div>
+</form>"""
+    return _render(request, "Orders and Returns", content, body_class="sales-guest-form",
+                   scripts=f"<script>{ORDERS_FORM_JS}</script>")
+
+
+@app.post("/sales/guest/view/")
+async def orders_lookup(request: Request):
+    form = await _form(request)
+    order = ORDERS.get(form.get("oar_order_id", "").strip())
+    found = order is not None and order["lastname"].lower() == form.get("oar_billing_lastname", "").strip().lower()
+    if found:
+        if form.get("oar_type") == "zip":
+            found = order["postcode"] == form.get("oar_zip", "").strip()
+        else:
+            found = order["email"] == form.get("oar_email", "").strip().lower()
+    if not found:
+        response = RedirectResponse(f"{request.base_url}sales/guest/form/", status_code=302)
+        _flash(response, "error", "You entered incorrect data. Please try again.")
+        return response
+    response = RedirectResponse(f"{request.base_url}sales/guest/view/", status_code=302)
+    response.set_cookie(GUEST_VIEW_COOKIE, order["increment_id"], path="/")
+    return response
+
+
+@app.get("/sales/guest/view/", response_class=HTMLResponse)
+async def order_view(request: Request):
+    order = ORDERS.get(request.cookies.get(GUEST_VIEW_COOKIE, ""))
+    if order is None:
+        return RedirectResponse(f"{request.base_url}sales/guest/form/", status_code=302)
+    rows = "".join(f"""
+        <tr id="order-item-row-{i['item_id']}"><td class="col name">
+            <strong class="product name product-item-name">{_esc(i['name'])}</strong>
+            <dl class="item-options">{''.join(f'<dt>{k}</dt><dd>{v}</dd>' for k, v in i['options'].items())}</dl></td>
+            <td class="col sku">{i['sku']}</td>
+            <td class="col price"><span class="price">{_money(i['price'])}</span></td>
+            <td class="col qty">Ordered: {i['qty']}</td>
+            <td class="col subtotal"><span class="price">{_money(i['price'] * i['qty'])}</span></td></tr>"""
+                   for i in order["items"])
+    address = order["address"]
+    address_html = (f"{_esc(address.get('firstname', ''))} {_esc(address.get('lastname', ''))}<br>"
+                    f"{_esc(', '.join(address.get('street', [])))}<br>{_esc(address.get('city', ''))}, "
+                    f"{_esc(address.get('postcode', ''))}<br>{_esc(address.get('country_id', ''))}<br>"
+                    f"T: {_esc(address.get('telephone', ''))}")
+    totals = order["totals"]
+    content = _page_title(f"Order # {order['increment_id']}") + f"""
+<span class="order-status">{order['status']}</span>
+<div class="order-date">
+    <span class="label">Order Date:</span> <date>{order['created_at']}</date> <span>{order['created_at']}</span>
+</div>
+<div class="actions-toolbar order-actions-toolbar"><div class="actions">
+    <a href="#" class="action order"><span>Reorder</span></a>
+    <a href="#" class="action print"><span>Print Order</span></a></div></div>
+<div class="order-details-items ordered"><div class="table-wrapper order-items">
+<table class="data table table-order-items" id="my-orders-table"><tbody>{rows}</tbody>
+<tfoot>
+    <tr class="subtotal"><th class="mark">Subtotal</th>
+        <td class="amount"><span class="price">{_money(totals['subtotal'])}</span></td></tr>
+    <tr class="shipping"><th class="mark">Shipping &amp; Handling</th>
+        <td class="amount"><span class="price">{_money(totals['shipping_amount'])}</span></td></tr>
+    <tr class="grand_total"><th class="mark"><strong>Grand Total</strong></th>
+        <td class="amount"><strong><span class="price">{_money(totals['grand_total'])}</span></strong></td></tr>
+</tfoot></table></div></div>
+<div class="block block-order-details-view"><div class="block-content">
+    <div class="box box-order-shipping-address"><strong class="box-title"><span>Shipping Address</span></strong>
+        <div class="box-content"><address>{address_html}</address></div></div>
+    <div class="box box-order-shipping-method"><strong class="box-title"><span>Shipping Method</span></strong>
+        <div class="box-content">{_esc(order.get('shipping_title', 'Shipping'))}</div></div>
+    <div class="box box-order-billing-address"><strong class="box-title"><span>Billing Address</span></strong>
+        <div class="box-content"><address>{address_html}</address></div></div>
+    <div class="box box-order-billing-method"><strong class="box-title"><span>Payment Method</span></strong>
+        <div class="box-content"><dl class="payment-method"><dt class="title">Check / Money order</dt></dl></div></div>
+</div></div>"""
+    return _render(request, f"Order # {order['increment_id']}", content, body_class="sales-guest-view")
+
+
+@app.get("/media/catalog/product/{slug}.svg")
+async def product_image(slug: str):
+    product = PRODUCTS_BY_SLUG.get(slug)
+    label = _esc(product["name"] if product else slug)
+    svg = (f'<svg xmlns="http://www.w3.org/2000/svg" width="480" height="600" viewBox="0 0 480 600">'
+           f'<rect width="480" height="600" fill="#e8e8e8"/>'
+           f'<text x="240" y="300" font-size="24" text-anchor="middle">{label}</text></svg>')
+    return Response(svg, media_type="image/svg+xml", headers={"Cache-Control": "max-age=3600"})
+
+
+@app.get("/static/frontend/Magento/luma/en_US/images/logo.svg")
+async def logo():
+    svg = ('<svg xmlns="http://www.w3.org/2000/svg" width="148" height="43" viewBox="0 0 148 43">'
+           '<rect width="148" height="43" fill="#fff"/>'
+           '<text x="74" y="30" font-size="26" text-anchor="middle" fill="#1979c3">LUMA</text></svg>')
+    return Response(svg, media_type="image/svg+xml", headers={"Cache-Control": "max-age=3600"})
+
+
+@app.post("/__stub/latency")
+async def set_latency(request: Request):
+    """Change the artificial latency at runtime, e.g. {"page": 300, "ajax": 800, "jitter": 50}"""
+    for key, value in (await request.json()).items():
+        if key in LATENCY_MS:
+            LATENCY_MS[key] = float(value)
+    return LATENCY_MS
+
+
+@app.post("/__stub/reset")
+async def reset():
+    """Forget every session, quote and order"""
+    SESSIONS.clear()
+    QUOTES.clear()
+    ORDERS.clear()
+    return {"status": "reset"}
+
+
+class MagentoStubServer:
+    """Runs the stand-in with uvicorn on a background thread (one per xdist worker)"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/"
+
+    def start(self, timeout: float = 10.0) -> str:
+        import socket
+        import threading
+        import uvicorn
+        if not self.port:
+            with socket.socket() as sock:
+                sock.bind((self.host, 0))
+                self.port = sock.getsockname()[1]
+        config = uvicorn.Config(app, host=self.host, port=self.port, log_level="warning", access_log=False)
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, name="magento-stub", daemon=True)
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError(f"Magento stub did not start on {self.url}")
+            time.sleep(0.05)
+        return self.url
+
+    def stop(self):
+        if self._server is not None:
+            self._server.should_exit = True
+            self._thread.join(timeout=10)
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+
+import requests
+from filelock import FileLock
+
+from service.cart_service import AJAX_HEADERS, ProductForm
+from service.customer_factory import CustomerFactory, default_namespace
+
+# window.checkoutConfig carries the masked quote id the guest REST endpoints take
+_QUOTE_MASK_RE = re.compile(r'"quoteData"\s*:\s*\{\s*"entity_id"\s*:\s*"([^"]+)"')
+_SUCCESS_ORDER_RE = re.compile(r'class="checkout-success".*?<span>\s*(\d+)\s*</span>', re.S)
+
+
+class OrderFactoryError(Exception):
+    """A step of the HTTP checkout was rejected by the storefront"""
+
+
+class GuestOrderFactory:
+    """
+    Places guest orders over plain HTTP: cart add, shipping-information and
+    payment-information, the same calls the checkout page makes. Each order gets
+    its own requests.Session (its own quote), so orders can be placed in parallel.
+    """
+
+    def __init__(self, base_url: str, products: List[Dict[str, str]], timeout: float = 30,
+                 customers: Optional[CustomerFactory] = None):
+        self.base_url = base_url
+        self.products = products
+        self.timeout = timeout
+        # Every order gets its own customer, so parallel orders never share an email or address;
+        # its own namespace keeps them apart from the checkout customers of the same worker
+        self.customers = customers or CustomerFactory(default_namespace("orders"))
+
+    def _check(self, response: requests.Response, step: str) -> requests.Response:
+        if not response.ok:
+            raise OrderFactoryError(f"{step} returned {response.status_code}: {response.text[:200]}")
+        return response
+
+    def create(self, product: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """Place one order and return what the Orders and Returns form needs to find it"""
+        product = product or self.products[0]
+        address = self.customers.next().address()
+        email = address["email"]
+        with requests.Session() as session:
+            url = urljoin(self.base_url, product["product_path"])
+            form = ProductForm.parse(url, self._check(session.get(url, timeout=self.timeout), "product page").text)
+            data = {"product": form.product_id, "qty": product.get("qty") or "1",
+                    "form_key": session.cookies.get("form_key") or form.form_key}
+            size_index, color_index = int(product.get("size_index") or 0), int(product.get("color_index") or 0)
+            data.update(form.super_attributes(size_index, color_index))
+            self._check(session.post(form.action, data=data, headers=AJAX_HEADERS, timeout=self.timeout), "cart add")
+
+            checkout = self._check(session.get(urljoin(self.base_url, "checkout/"), timeout=self.timeout), "checkout")
+            match = _QUOTE_MASK_RE.search(checkout.text)
+            if match is None:
+                raise OrderFactoryError("No quote id on the checkout page (was the cart add accepted?)")
+            rest = urljoin(self.base_url, f"rest/default/V1/guest-carts/{match.group(1)}/")
+
+            self._check(session.post(rest + "shipping-information", timeout=self.timeout, json={
+                "addressInformation": {
+                    "shipping_address": address,
+                    "billing_address": address,
+                    "shipping_carrier_code": "flatrate",
+                    "shipping_method_code": "flatrate",
+                }
+            }), "shipping-information")
+            self._check(session.post(rest + "payment-information", timeout=self.timeout, json={
+                "email": email,
+                "paymentMethod": {"method": "checkmo"},
+                "billingAddress": address,
+            }), "payment-information")
+
+            success = self._check(session.get(urljoin(self.base_url, "checkout/onepage/success/"),
+                                              timeout=self.timeout), "success page")
+            match = _SUCCESS_ORDER_RE.search(success.text)
+            if match is None:
+                raise OrderFactoryError("No order number on the success page")
+        return {"order_id": match.group(1), "lastname": address["lastname"], "email": email,
+                "zip": address["postcode"]}
+
+    def create_many(self, count: int, workers: int = 4) -> List[Dict[str, str]]:
+        """Place `count` orders concurrently, cycling through the configured products"""
+        products = [self.products[i % len(self.products)] for i in range(count)]
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, count))) as pool:
+            return list(pool.map(self.create, products))
+
+
+class GuestOrderPool:
+    """
+    Shared file of ready-made guest orders, one per storefront URL. Each order is
+    handed out once; xdist workers take orders under a file lock. When the pool runs
+    dry, `refill` tops it up in one parallel batch while other workers wait on the
+    lock, the same way StorageStateCache shares a login.
+    """
+
+    def __init__(self, pool_dir: Path, base_url: str):
+        self.pool_dir = Path(pool_dir)
+        self.pool_dir.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha1(base_url.encode("utf-8")).hexdigest()[:16]
+        self.path = self.pool_dir / f"{digest}.json"
+        self.lock = FileLock(str(self.path) + ".lock")
+
+    def _read(self) -> List[Dict[str, str]]:
+        if not self.path.exists():
+            return []
+        with open(self.path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write(self, orders: List[Dict[str, str]]):
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(orders, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def available(self) -> int:
+        with self.lock:
+            return len(self._read())
+
+    def refill(self, factory: GuestOrderFactory, size: int, workers: int = 4) -> int:
+        """Top the pool up to `size` orders; returns how many were created"""
+        with self.lock:
+            orders = self._read()
+            missing = size - len(orders)
+            if missing <= 0:
+                return 0
+            orders.extend(factory.create_many(missing, workers))
+            self._write(orders)
+        print(f"Order pool: created {missing} guest orders in {self.path}")
+        return missing
+
+    def take(self, factory: GuestOrderFactory, refill_size: int = 1, workers: int = 4) -> Dict[str, str]:
+        """Check one order out of the pool, refilling it first if it is empty"""
+        with self.lock:
+            orders = self._read()
+            if not orders:
+                orders = factory.create_many(max(1, refill_size), workers)
+            order = orders.pop(0)
+            self._write(orders)
+        return order
@@ -0,0 +1,170 @@
+import re
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+# Third-party analytics/ad hosts the assertions never depend on (subdomains included)
+ANALYTICS_DOMAINS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googleadservices.com",
+    "googlesyndication.com",
+    "doubleclick.net",
+    "adservice.google.com",
+    "facebook.net",
+    "connect.facebook.net",
+    "hotjar.com",
+    "clarity.ms",
+    "bing.com",
+    "adnxs.com",
+    "criteo.com",
+    "taboola.com",
+]
+
+# Resource types dropped for tests carrying the marker; tests marked `visual` keep everything
+MARKER_POLICIES: Dict[str, List[str]] = {
+    "cart": ["image", "media", "font"],
+    "cart_management": ["image", "media", "font"],
+    "checkout": ["image", "media", "font"],
+    "orders": ["image", "media", "font"],
+    "search": ["image", "media"],
+}
+UNBLOCKED_MARKER = "visual"
+
+BLOCK = "block"
+STUB = "stub"
+
+
+class RouteStats:
+    """Requests blocked/stubbed in one context, and how many bytes that saved"""
+
+    def __init__(self):
+        self.blocked_requests = 0
+        self.stubbed_requests = 0
+        self.blocked_bytes = 0
+        # Blocked URLs never seen loading before, so their size is unknown
+        self.blocked_unknown_size = 0
+        self.loaded_requests = 0
+        self.loaded_bytes = 0
+        self.by_type: Dict[str, int] = {}
+
+    def to_dict(self) -> Dict:
+        return {
+            "blocked_requests": self.blocked_requests,
+            "stubbed_requests": self.stubbed_requests,
+            "blocked_bytes_estimated": self.blocked_bytes,
+            "blocked_unknown_size": self.blocked_unknown_size,
+            "loaded_requests": self.loaded_requests,
+            "loaded_bytes": self.loaded_bytes,
+            "blocked_by_type": dict(self.by_type),
+        }
+
+
+class RoutePolicy:
+    """
+    Blocks resource types and domains for a context through one `context.route`
+    handler. Requests to `stub_domains` are answered with an empty 200 so page
+    scripts that expect them keep working; everything else matched is aborted.
+
+    Blocked bytes are estimated from the Content-Length seen the last time the same
+    URL loaded in this worker (e.g. in a `visual` test), so the estimate improves
+    as the session goes on.
+    """
+
+    # url -> last Content-Length seen, shared by every policy in the worker
+    known_sizes: Dict[str, int] = {}
+
+    def __init__(self, block_resource_types: Iterable[str] = (), block_domains: Iterable[str] = (),
+                 stub_domains: Iterable[str] = ()):
+        self.block_resource_types = set(block_resource_types)
+        self.block_domains = list(block_domains)
+        self.stub_domains = list(stub_domains)
+        self._block_host = self._host_pattern(self.block_domains)
+        self._stub_host = self._host_pattern(self.stub_domains)
+
+    @staticmethod
+    def _host_pattern(domains: List[str]) -> Optional["re.Pattern"]:
+        if not domains:
+            return None
+        return re.compile(r"(^|\.)(" + "|".join(re.escape(d) for d in domains) + r")$")
+
+    @classmethod
+    def for_markers(cls, markers: Iterable[str], extra_block_domains: Iterable[str] = ()) -> Optional["RoutePolicy"]:
+        """Policy for a test with `markers`, or None when nothing should be blocked"""
+        markers = set(markers)
+        if UNBLOCKED_MARKER in markers:
+            return None
+        resource_types = set()
+        for marker in markers:
+            resource_types.update(MARKER_POLICIES.get(marker, []))
+        # Analytics scripts are stubbed rather than aborted so inline gtag/fbq calls don't throw
+        return cls(resource_types, block_domains=list(extra_block_domains), stub_domains=ANALYTICS_DOMAINS)
+
+    def decide(self, url: str, resource_type: str) -> Optional[str]:
+        """BLOCK, STUB or None (let it through)"""
+        host = urlsplit(url).hostname or ""
+        if self._stub_host is not None and self._stub_host.search(host):
+            return STUB
+        if self._block_host is not None and self._block_host.search(host):
+            return BLOCK
+        if resource_type in self.block_resource_types:
+            return BLOCK
+        return None
+
+    def _count(self, stats: RouteStats, decision: str, url: str, resource_type: str):
+        if decision == STUB:
+            stats.stubbed_requests += 1
+        else:
+            stats.blocked_requests += 1
+        stats.by_type[resource_type] = stats.by_type.get(resource_type, 0) + 1
+        size = self.known_sizes.get(url)
+        if size is None:
+            stats.blocked_unknown_size += 1
+        else:
+            stats.blocked_bytes += size
+
+    def _record_response(self, stats: RouteStats, response):
+        length = response.headers.get("content-length")
+        stats.loaded_requests += 1
+        if length and length.isdigit():
+            stats.loaded_bytes += int(length)
+            self.known_sizes[response.url] = int(length)
+
+    def apply(self, context) -> RouteStats:
+        """Install the policy on a sync BrowserContext and return its live stats"""
+        stats = RouteStats()
+        context.on("response", lambda response: self._record_response(stats, response))
+
+        def handle(route):
+            request = route.request
+            decision = self.decide(request.url, request.resource_type)
+            if decision is None:
+                route.fallback()
+                return
+            self._count(stats, decision, request.url, request.resource_type)
+            if decision == STUB:
+                route.fulfill(status=200, content_type="application/javascript", body="")
+            else:
+                route.abort("blockedbyclient")
+
+        context.route("**/*", handle)
+        return stats
+
+    async def apply_async(self, context) -> RouteStats:
+        """Install the policy on an async_api BrowserContext and return its live stats"""
+        stats = RouteStats()
+        context.on("response", lambda response: self._record_response(stats, response))
+
+        async def handle(route):
+            request = route.request
+            decision = self.decide(request.url, request.resource_type)
+            if decision is None:
+                await route.fallback()
+                return
+            self._count(stats, decision, request.url, request.resource_type)
+            if decision == STUB:
+                await route.fulfill(status=200, content_type="application/javascript", body="")
+            else:
+                await route.abort("blockedbyclient")
+
+        await context.route("**/*", handle)
+        return stats
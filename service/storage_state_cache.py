@@ -0,0 +1,67 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict
+from urllib.parse import urlsplit
+from filelock import FileLock
+
+
+def account_key(email: str, url: str) -> str:
+    """Cache key of an account on the storefront serving `url` (any page of it will do)"""
+    parts = urlsplit(url)
+    return f"{email.lower()}@{parts.scheme}://{parts.netloc}"
+
+
+class StorageStateCache:
+    """
+    Disk cache of Playwright storage states (cookies + localStorage), one file per account.
+    A state is reused until it is `ttl_seconds` old. Creation is guarded by a per-account
+    file lock, so when several xdist workers ask for the same account only one of them
+    logs in and the others wait for and reuse its file.
+    """
+
+    def __init__(self, cache_dir: Path, ttl_seconds: int = 3600):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+
+    def path_for(self, account: str) -> Path:
+        digest = hashlib.sha1(account.encode("utf-8")).hexdigest()[:16]
+        return self.cache_dir / f"{digest}.json"
+
+    def is_fresh(self, account: str) -> bool:
+        path = self.path_for(account)
+        return path.exists() and time.time() - path.stat().st_mtime < self.ttl_seconds
+
+    def get(self, account: str, login: Callable[[str], None]) -> str:
+        """
+        Return the storage state file for `account`, calling `login(path)` to create it
+        when missing or expired. `login` must write a storage state to the given path.
+        """
+        path = self.path_for(account)
+        if self.is_fresh(account):
+            return str(path)
+        with FileLock(str(path) + ".lock"):
+            # Another worker may have logged in while we were waiting for the lock
+            if self.is_fresh(account):
+                return str(path)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            login(str(tmp_path))
+            os.replace(tmp_path, path)
+        return str(path)
+
+    def put(self, account: str, state: Dict) -> str:
+        """Store a storage state taken elsewhere, e.g. right after a login the test did anyway"""
+        path = self.path_for(account)
+        with FileLock(str(path) + ".lock"):
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(state))
+            os.replace(tmp_path, path)
+        return str(path)
+
+    def invalidate(self, account: str):
+        """Drop a cached state, e.g. after the server rejected the session"""
+        with FileLock(str(self.path_for(account)) + ".lock"):
+            self.path_for(account).unlink(missing_ok=True)
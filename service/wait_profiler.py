@@ -0,0 +1,214 @@
+import functools
+import inspect
+import re
+import sys
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+COMPONENTS_DIR = str(Path(__file__).parent.parent / "components")
+
+SLEEP = "sleep"
+NETWORK = "network"
+SELECTOR = "selector"
+ACT = "act"
+
+CATEGORY_BY_API = {
+    "wait_for_timeout": SLEEP,
+    "wait_for_load_state": NETWORK,
+    "wait_for_url": NETWORK,
+    "wait_for_event": NETWORK,
+    "goto": NETWORK,
+    "reload": NETWORK,
+    "go_back": NETWORK,
+    "go_forward": NETWORK,
+    "wait_for_selector": SELECTOR,
+    "wait_for": SELECTOR,
+    "wait_for_function": SELECTOR,
+}
+
+# Locator builders and event plumbing do no browser round trip, so they are not timed
+_SKIPPED_APIS = {"locator", "nth", "filter", "and_", "or_", "frame_locator", "content_frame",
+                 "on", "once", "remove_listener", "set_default_timeout", "set_default_navigation_timeout"}
+
+_ACTIVE: Optional["WaitProfiler"] = None
+# Set while a wrapped call runs so nested public calls are not counted twice
+_IN_CALL: ContextVar[bool] = ContextVar("taf_profiler_in_call", default=False)
+
+
+def _component_stack() -> List[str]:
+    """Class.method frames from components/*, outermost first"""
+    stack = []
+    frame = sys._getframe(2)
+    while frame is not None:
+        if frame.f_code.co_filename.startswith(COMPONENTS_DIR):
+            owner = frame.f_locals.get("self")
+            prefix = type(owner).__name__ if owner is not None else Path(frame.f_code.co_filename).stem
+            stack.append(f"{prefix}.{frame.f_code.co_name}")
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def _wrap(api: str, func):
+    category = CATEGORY_BY_API.get(api, ACT)
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            profiler = _ACTIVE
+            if profiler is None or _IN_CALL.get():
+                return await func(*args, **kwargs)
+            stack = _component_stack()
+            token = _IN_CALL.set(True)
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                _IN_CALL.reset(token)
+                profiler.record(category, api, stack, time.perf_counter() - start)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profiler = _ACTIVE
+        if profiler is None or _IN_CALL.get():
+            return func(*args, **kwargs)
+        stack = _component_stack()
+        token = _IN_CALL.set(True)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _IN_CALL.reset(token)
+            profiler.record(category, api, stack, time.perf_counter() - start)
+    return wrapper
+
+
+class _TimedEventContext:
+    """expect_* context manager whose exit, where the event is actually awaited, is timed as a span"""
+
+    def __init__(self, manager, api: str, stack: List[str]):
+        self._manager = manager
+        self._api = api
+        self._stack = stack
+
+    def __enter__(self):
+        return self._manager.__enter__()
+
+    def __exit__(self, *exc_info):
+        profiler = _ACTIVE
+        if profiler is None or _IN_CALL.get():
+            return self._manager.__exit__(*exc_info)
+        token = _IN_CALL.set(True)
+        start = time.perf_counter()
+        try:
+            return self._manager.__exit__(*exc_info)
+        finally:
+            _IN_CALL.reset(token)
+            profiler.record(NETWORK, self._api, self._stack, time.perf_counter() - start)
+
+    async def __aenter__(self):
+        return await self._manager.__aenter__()
+
+    async def __aexit__(self, *exc_info):
+        profiler = _ACTIVE
+        if profiler is None or _IN_CALL.get():
+            return await self._manager.__aexit__(*exc_info)
+        token = _IN_CALL.set(True)
+        start = time.perf_counter()
+        try:
+            return await self._manager.__aexit__(*exc_info)
+        finally:
+            _IN_CALL.reset(token)
+            profiler.record(NETWORK, self._api, self._stack, time.perf_counter() - start)
+
+
+def _wrap_expect(api: str, func):
+    # expect_* returns a context manager in both APIs; the block's own calls are timed separately
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        manager = func(*args, **kwargs)
+        if _ACTIVE is None:
+            return manager
+        return _TimedEventContext(manager, api, _component_stack())
+    return wrapper
+
+
+class WaitProfiler:
+    """
+    Splits a test's wall time into sleeping, waiting on the network, waiting on a
+    selector/condition and acting, per page object method. Page and Locator methods
+    of both the sync and async APIs are wrapped once per process; while a test is
+    being profiled every call is attributed to the components/* frames that made it.
+    """
+
+    _installed = False
+
+    def __init__(self, output_dir: Path):
+        self.output_dir = Path(output_dir)
+        self.test_id: Optional[str] = None
+        self._started = 0.0
+        self._spans: List[Tuple[str, str, Tuple[str, ...], float]] = []
+
+    @classmethod
+    def install(cls):
+        """Wrap the public Page/Locator methods (idempotent)"""
+        if cls._installed:
+            return
+        from playwright.sync_api import Page, Locator
+        from playwright.async_api import Page as AsyncPage, Locator as AsyncLocator
+        for klass in (Page, Locator, AsyncPage, AsyncLocator):
+            for api, attr in list(vars(klass).items()):
+                if api.startswith("_") or api in _SKIPPED_APIS or api.startswith("get_by_"):
+                    continue
+                if inspect.isfunction(attr):
+                    wrap = _wrap_expect if api.startswith("expect_") else _wrap
+                    setattr(klass, api, wrap(api, attr))
+        cls._installed = True
+
+    def start(self, test_id: str):
+        global _ACTIVE
+        self.test_id = test_id
+        self._spans = []
+        self._started = time.perf_counter()
+        _ACTIVE = self
+
+    def record(self, category: str, api: str, stack: List[str], seconds: float):
+        self._spans.append((category, api, tuple(stack), seconds))
+
+    def stop(self) -> Dict:
+        """Stop profiling the current test and return its summary"""
+        global _ACTIVE
+        _ACTIVE = None
+        wall_ms = (time.perf_counter() - self._started) * 1000
+        categories = {SLEEP: 0.0, NETWORK: 0.0, SELECTOR: 0.0, ACT: 0.0}
+        methods: Dict[str, Dict[str, float]] = {}
+        for category, api, stack, seconds in self._spans:
+            ms = seconds * 1000
+            categories[category] += ms
+            owner = stack[-1] if stack else "<test>"
+            per_method = methods.setdefault(owner, {SLEEP: 0.0, NETWORK: 0.0, SELECTOR: 0.0, ACT: 0.0})
+            per_method[category] += ms
+        ranked = sorted(methods.items(), key=lambda item: sum(item[1].values()), reverse=True)
+        return {
+            "wall_ms": round(wall_ms, 1),
+            "categories_ms": {k: round(v, 1) for k, v in categories.items()},
+            "unaccounted_ms": round(max(0.0, wall_ms - sum(categories.values())), 1),
+            "methods_ms": {name: {k: round(v, 1) for k, v in cats.items() if v} for name, cats in ranked},
+        }
+
+    def write_folded(self) -> Path:
+        """Write the spans in collapsed-stack format (flamegraph.pl, speedscope), values in microseconds"""
+        totals: Dict[str, int] = {}
+        root = re.sub(r"[;\s]", "_", self.test_id or "test")
+        for category, api, stack, seconds in self._spans:
+            line = ";".join((root,) + stack + (f"{category}:{api}",))
+            totals[line] = totals.get(line, 0) + int(seconds * 1_000_000)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path = self.output_dir / (re.sub(r"[^\w.-]+", "_", self.test_id or "test")[:200] + ".folded")
+        with open(path, "w", encoding="utf-8") as f:
+            for line, micros in totals.items():
+                f.write(f"{line} {micros}\n")
+        return path
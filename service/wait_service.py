@@ -0,0 +1,284 @@
+import time
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Dict, List, Optional
+from weakref import WeakKeyDictionary
+from playwright.sync_api import Page, Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+from service import js_bundle
+
+XHR = "xhr"
+PAGE = "page"
+
+# What each storefront action really waits on: an AJAX response (XHR) or the
+# DOMContentLoaded of the document it navigates to (PAGE), matched by URL part
+MAGENTO_ENDPOINTS = {
+    "customer_data": ("customer/section/load", XHR),
+    "cart_add": ("checkout/cart/add", XHR),
+    "cart_remove": ("checkout/sidebar/removeItem", XHR),
+    "cart_update_qty": ("checkout/sidebar/updateItemQty", XHR),
+    "checkout_login": ("customer/ajax/login", XHR),
+    "checkout_reload": ("checkout", PAGE),
+    "search": ("catalogsearch/result", PAGE),
+    # Found orders render sales/guest/view, failed lookups redirect back to sales/guest/form
+    "orders_lookup": ("sales/guest/", PAGE),
+}
+
+# True once knockout has rendered the minicart from the cart customer-data section
+CART_RENDERED_JS = """
+    () => !!document.querySelector(
+        '#minicart-content-wrapper .block-content, #minicart-content-wrapper .subtitle.empty')
+"""
+
+# Polled by dom_mutation() after js_bundle's mutations.arm; a navigation in between drops the flag
+_MUTATION_FIRED_JS = "key => !!window.__taf && window.__taf.mutations.fired(key)"
+
+
+class WaitRecord:
+    """How long one wait took and whether its signal arrived before the timeout"""
+
+    def __init__(self, name: str, signal: str, timeout_ms: float):
+        self.name = name
+        self.signal = signal
+        self.timeout_ms = timeout_ms
+        self.duration_ms = 0.0
+        self.ok = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "signal": self.signal,
+            "timeout_ms": self.timeout_ms,
+            "duration_ms": round(self.duration_ms, 1),
+            "ok": self.ok,
+        }
+
+
+class WaitService:
+    """
+    Waits that resolve on concrete signals (responses, DOM mutations, JS conditions)
+    instead of fixed sleeps. Every wait takes its own timeout and is recorded, so the
+    time spent waiting can be reported per test. Use `WaitService.for_page(page)` so
+    all page objects sharing a page also share one record list.
+
+    With `networkidle_fallback` on, an `endpoint()` wait that times out falls back to
+    waiting for networkidle instead of failing the test.
+    """
+
+    _instances: "WeakKeyDictionary[Page, WaitService]" = WeakKeyDictionary()
+
+    def __init__(self, page: Page, default_timeout: float = 10000, networkidle_fallback: bool = False):
+        self.page = page
+        self.default_timeout = default_timeout
+        self.networkidle_fallback = networkidle_fallback
+        self.records: List[WaitRecord] = []
+
+    @classmethod
+    def for_page(cls, page: Page) -> "WaitService":
+        service = cls._instances.get(page)
+        if service is None:
+            service = cls(page)
+            cls._instances[page] = service
+        return service
+
+    @contextmanager
+    def _timed(self, name: str, signal: str, timeout: Optional[float]):
+        record = WaitRecord(name, signal, self.default_timeout if timeout is None else timeout)
+        self.records.append(record)
+        start = time.perf_counter()
+        try:
+            yield record.timeout_ms
+            record.ok = True
+        finally:
+            record.duration_ms = (time.perf_counter() - start) * 1000
+
+    @contextmanager
+    def response(self, url_part: str, name: Optional[str] = None, timeout: Optional[float] = None):
+        """Wait for the first response whose URL contains `url_part`, triggered inside the block
+
+        Usage:
+            with waits.response('checkout/sidebar/removeItem'):
+                delete_button.click()
+        """
+        with self._timed(name or url_part, "response", timeout) as timeout_ms:
+            with self.page.expect_response(lambda r: url_part in r.url, timeout=timeout_ms) as info:
+                yield info
+
+    @contextmanager
+    def customer_data(self, section: Optional[str] = None, name: Optional[str] = None,
+                      timeout: Optional[float] = None):
+        """Wait for Magento's customer-data reload (customer/section/load), optionally of one section"""
+        def is_reload(response):
+            if 'customer/section/load' not in response.url:
+                return False
+            # sections=cart%2Cmessages or no filter at all (full reload) both refresh `section`
+            return section is None or 'sections=' not in response.url or section in response.url
+        with self._timed(name or f"customer-data:{section or '*'}", "response", timeout) as timeout_ms:
+            with self.page.expect_response(is_reload, timeout=timeout_ms) as info:
+                yield info
+
+    @contextmanager
+    def endpoint(self, action: str, name: Optional[str] = None, timeout: Optional[float] = None):
+        """Wait for the response (or page load) that `action` in MAGENTO_ENDPOINTS depends on
+
+        Usage:
+            with waits.endpoint('search'):
+                search_button.click()
+        """
+        url_part, kind = MAGENTO_ENDPOINTS[action]
+        label = name or f"endpoint:{action}"
+        body_done = False
+        try:
+            if kind == PAGE:
+                with self._timed(label, "navigation", timeout) as timeout_ms:
+                    with self.page.expect_navigation(url=lambda url: url_part in url,
+                                                     wait_until='domcontentloaded', timeout=timeout_ms) as info:
+                        yield info
+                        body_done = True
+            else:
+                with self._timed(label, "response", timeout) as timeout_ms:
+                    with self.page.expect_response(lambda r: url_part in r.url, timeout=timeout_ms) as info:
+                        yield info
+                        body_done = True
+        except PlaywrightTimeoutError:
+            # Only the wait itself falls back; a timeout raised by the block is the caller's
+            if not body_done or not self.networkidle_fallback:
+                raise
+            print(f"[WaitService] {url_part} not seen within the timeout, falling back to networkidle")
+            self.network_idle(name=f"{label}:networkidle")
+
+    def network_idle(self, name: Optional[str] = None, timeout: Optional[float] = None):
+        """Wait for networkidle; slow on the storefront, prefer `endpoint()`"""
+        with self._timed(name or "networkidle", "networkidle", timeout) as timeout_ms:
+            self.page.wait_for_load_state('networkidle', timeout=timeout_ms)
+
+    @contextmanager
+    def dom_mutation(self, selector: str, name: Optional[str] = None, timeout: Optional[float] = None):
+        """Wait until the DOM under `selector` changes after the block has run"""
+        key = uuid.uuid4().hex
+        js_bundle.call(self.page, "mutations.arm", selector, key)
+        yield
+        with self._timed(name or f"mutation:{selector}", "dom", timeout) as timeout_ms:
+            self.page.wait_for_function(
+                _MUTATION_FIRED_JS, arg=key, timeout=timeout_ms)
+
+    def until(self, expression: str, arg: Any = None, name: Optional[str] = None,
+              timeout: Optional[float] = None):
+        """Wait until a JS predicate returns a truthy value; returns that value"""
+        with self._timed(name or "condition", "condition", timeout) as timeout_ms:
+            return self.page.wait_for_function(expression, arg=arg, timeout=timeout_ms).json_value()
+
+    def minicart_state(self) -> Dict[str, Any]:
+        """Current minicart state from the tracker: ready, open, empty, count, subtotal, counter"""
+        return js_bundle.call(self.page, "minicart.state")
+
+    def minicart(self, name: Optional[str] = None, timeout: Optional[float] = None, **conditions) -> Dict[str, Any]:
+        """Wait until the minicart state matches `conditions` and return it
+
+        Usage:
+            waits.minicart(open=True)
+            waits.minicart(count__lt=items_before, timeout=5000)
+        """
+        label = name or "minicart:" + ",".join(f"{k}={v}" for k, v in conditions.items())
+        with self._timed(label, "minicart", timeout) as timeout_ms:
+            try:
+                return js_bundle.call(self.page, "minicart.when", conditions, timeout_ms)
+            except PlaywrightError as e:
+                if "not reached within" not in str(e):
+                    raise
+                raise PlaywrightTimeoutError(str(e)) from None
+
+    def selector(self, selector: str, state: str = 'visible', name: Optional[str] = None,
+                 timeout: Optional[float] = None):
+        """Wait for `selector` to reach `state`"""
+        with self._timed(name or f"selector:{selector}", "selector", timeout) as timeout_ms:
+            return self.page.wait_for_selector(selector, state=state, timeout=timeout_ms)
+
+    def report(self) -> List[Dict[str, Any]]:
+        return [record.to_dict() for record in self.records]
+
+    def total_ms(self) -> float:
+        return sum(record.duration_ms for record in self.records)
+
+
+class AsyncWaitService(WaitService):
+    """WaitService for playwright.async_api pages; same signals, same records"""
+
+    _instances: "WeakKeyDictionary[Any, AsyncWaitService]" = WeakKeyDictionary()
+
+    @asynccontextmanager
+    async def response(self, url_part: str, name: Optional[str] = None, timeout: Optional[float] = None):
+        with self._timed(name or url_part, "response", timeout) as timeout_ms:
+            async with self.page.expect_response(lambda r: url_part in r.url, timeout=timeout_ms) as info:
+                yield info
+
+    @asynccontextmanager
+    async def customer_data(self, section: Optional[str] = None, name: Optional[str] = None,
+                            timeout: Optional[float] = None):
+        def is_reload(response):
+            if 'customer/section/load' not in response.url:
+                return False
+            return section is None or 'sections=' not in response.url or section in response.url
+        with self._timed(name or f"customer-data:{section or '*'}", "response", timeout) as timeout_ms:
+            async with self.page.expect_response(is_reload, timeout=timeout_ms) as info:
+                yield info
+
+    @asynccontextmanager
+    async def endpoint(self, action: str, name: Optional[str] = None, timeout: Optional[float] = None):
+        url_part, kind = MAGENTO_ENDPOINTS[action]
+        label = name or f"endpoint:{action}"
+        body_done = False
+        try:
+            if kind == PAGE:
+                with self._timed(label, "navigation", timeout) as timeout_ms:
+                    async with self.page.expect_navigation(url=lambda url: url_part in url,
+                                                           wait_until='domcontentloaded', timeout=timeout_ms) as info:
+                        yield info
+                        body_done = True
+            else:
+                with self._timed(label, "response", timeout) as timeout_ms:
+                    async with self.page.expect_response(lambda r: url_part in r.url, timeout=timeout_ms) as info:
+                        yield info
+                        body_done = True
+        except PlaywrightTimeoutError:
+            if not body_done or not self.networkidle_fallback:
+                raise
+            print(f"[AsyncWaitService] {url_part} not seen within the timeout, falling back to networkidle")
+            await self.network_idle(name=f"{label}:networkidle")
+
+    async def network_idle(self, name: Optional[str] = None, timeout: Optional[float] = None):
+        with self._timed(name or "networkidle", "networkidle", timeout) as timeout_ms:
+            await self.page.wait_for_load_state('networkidle', timeout=timeout_ms)
+
+    @asynccontextmanager
+    async def dom_mutation(self, selector: str, name: Optional[str] = None, timeout: Optional[float] = None):
+        key = uuid.uuid4().hex
+        await js_bundle.async_call(self.page, "mutations.arm", selector, key)
+        yield
+        with self._timed(name or f"mutation:{selector}", "dom", timeout) as timeout_ms:
+            await self.page.wait_for_function(
+                _MUTATION_FIRED_JS, arg=key, timeout=timeout_ms)
+
+    async def until(self, expression: str, arg: Any = None, name: Optional[str] = None,
+                    timeout: Optional[float] = None):
+        with self._timed(name or "condition", "condition", timeout) as timeout_ms:
+            handle = await self.page.wait_for_function(expression, arg=arg, timeout=timeout_ms)
+            return await handle.json_value()
+
+    async def minicart_state(self) -> Dict[str, Any]:
+        return await js_bundle.async_call(self.page, "minicart.state")
+
+    async def minicart(self, name: Optional[str] = None, timeout: Optional[float] = None,
+                       **conditions) -> Dict[str, Any]:
+        label = name or "minicart:" + ",".join(f"{k}={v}" for k, v in conditions.items())
+        with self._timed(label, "minicart", timeout) as timeout_ms:
+            try:
+                return await js_bundle.async_call(self.page, "minicart.when", conditions, timeout_ms)
+            except PlaywrightError as e:
+                if "not reached within" not in str(e):
+                    raise
+                raise PlaywrightTimeoutError(str(e)) from None
+
+    async def selector(self, selector: str, state: str = 'visible', name: Optional[str] = None,
+                       timeout: Optional[float] = None):
+        with self._timed(name or f"selector:{selector}", "selector", timeout) as timeout_ms:
+            return await self.page.wait_for_selector(selector, state=state, timeout=timeout_ms)
@@ -1,10 +1,12 @@
-from fastapi import FastAPI, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, BackgroundTasks, Header
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel
 from pathlib import Path
+import hashlib
 import json
+import threading
 import requests
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 app = FastAPI()
 
@@ -16,11 +18,52 @@ class WebhookPayload(BaseModel):
     only_failures: bool = False
 
 
-def load_report():
-    if not REPORT_PATH.exists():
+class CachedReport:
+    """The parsed report plus its full and failures-only views, serialized once with an ETag each"""
+    __slots__ = ("key", "report", "views", "bodies", "etags")
+
+    def __init__(self, key: Tuple[int, int], report: dict):
+        self.key = key
+        self.report = report
+        self.views: Dict[bool, dict] = {only: format_report(report, only) for only in (False, True)}
+        self.bodies: Dict[bool, bytes] = {only: json.dumps(view).encode("utf-8") for only, view in self.views.items()}
+        self.etags: Dict[bool, str] = {only: '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+                                       for only, body in self.bodies.items()}
+
+
+_cached: Optional[CachedReport] = None
+_cache_lock = threading.Lock()
+
+
+def cached_report() -> Optional[CachedReport]:
+    """The report as of its current mtime and size; re-read only when pytest has rewritten it"""
+    global _cached
+    try:
+        stat = REPORT_PATH.stat()
+    except FileNotFoundError:
         return None
-    with open(REPORT_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _cached
+    if cached is not None and cached.key == key:
+        return cached
+    with _cache_lock:
+        if _cached is not None and _cached.key == key:
+            return _cached
+        try:
+            with open(REPORT_PATH, "r", encoding="utf-8") as f:
+                report = json.load(f)
+        except (OSError, ValueError) as e:
+            # Caught mid-write: keep serving the previous report and read again next time
+            print(f"[webhook_reporter] could not read {REPORT_PATH}: {e}")
+            return _cached
+        _cached = CachedReport(key, report)
+        return _cached
+
+
+def load_report():
+    """The parsed report, shared between requests: do not modify it"""
+    cached = cached_report()
+    return cached.report if cached else None
 
 
 def format_report(report, only_failures=False):
@@ -34,6 +77,14 @@ def format_report(report, only_failures=False):
     }
 
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    # Weak comparison, as RFC 9110 has If-None-Match use: W/"x" matches "x"
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+
 def send_webhook(webhook_url, payload):
     headers = {"Content-Type": "application/json"}
     resp = requests.post(webhook_url, json=payload, headers=headers, timeout=10)
@@ -42,11 +93,12 @@ def send_webhook(webhook_url, payload):
 
 @app.post("/send-report")
 def send_report(payload: WebhookPayload, background_tasks: BackgroundTasks):
-    report = load_report()
-    if not report:
+    cached = cached_report()
+    if not cached or not cached.report:
         return JSONResponse(status_code=404, content={"error": "Report not found"})
-    formatted = format_report(report, only_failures=payload.only_failures)
-    message = payload.message or ("Playwright Test Report" if not payload.only_failures else "Playwright Test Failure Report")
+    formatted = cached.views[payload.only_failures]
+    default_message = "Playwright Test Report" if not payload.only_failures else "Playwright Test Failure Report"
+    message = payload.message or default_message
     data = {
         "text": message,
         "report": formatted
@@ -56,8 +108,13 @@ def send_report(payload: WebhookPayload, background_tasks: BackgroundTasks):
 
 
 @app.get("/report")
-def get_report(only_failures: bool = False):
-    report = load_report()
-    if not report:
+def get_report(only_failures: bool = False, if_none_match: Optional[str] = Header(None)):
+    """The report (or its failures), with an ETag; a matching If-None-Match gets an empty 304"""
+    cached = cached_report()
+    if not cached or not cached.report:
         return JSONResponse(status_code=404, content={"error": "Report not found"})
-    return format_report(report, only_failures=only_failures)
+    etag = cached.etags[only_failures]
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.bodies[only_failures], media_type="application/json", headers=headers)